@@ -0,0 +1,53 @@
+# Benchmark - classification flattening
+# Compares the single-pass flattener against the former append-per-block loop for 10, 100 and 1000 classification blocks.
+#
+# Usage (from the repository root):
+#   python -m benchmarks.bench_classifications
+
+import timeit
+
+import pandas as pd
+
+from pam.core.frames import flatten_classifications
+
+# Rows within each classification block
+ROWS_PER_BLOCK = 20
+
+def generate_blocks(count, rows=ROWS_PER_BLOCK):
+    # Synthetic 'classifications' section shaped like the profiles/performance-attribution responses
+    return [
+        {
+            'classificationCode': f'CLASS_{i}',
+            'classificationData': [
+                {'sectorCode': f'S{j}', 'sectorName': f'Sector {j}', 'weight': j / rows,
+                 'returns': {'portfolio': 0.01 * j, 'benchmark': 0.008 * j}}
+                for j in range(rows)
+            ]
+        }
+        for i in range(count)
+    ]
+
+def append_loop(records):
+    # The former implementation - the whole frame is copied for every block (DataFrame.append no longer 
+    # exists in pandas 2, pd.concat reproduces its cost)
+    df = pd.DataFrame()
+    for d in records:
+        temp_df = pd.json_normalize(d['classificationData'])
+        temp_df['classificationCode'] = d['classificationCode']
+        df = pd.concat([df, temp_df], ignore_index=True)
+
+    df.set_index('classificationCode', inplace=True)
+    return df
+
+def main():
+    print(f"{'blocks':>8} {'append loop (ms)':>18} {'single pass (ms)':>18} {'speed-up':>10}")
+    for count in (10, 100, 1000):
+        records = generate_blocks(count)
+        number = max(1, 1000 // count)
+
+        legacy = min(timeit.repeat(lambda: append_loop(records), number=number, repeat=3)) / number
+        current = min(timeit.repeat(lambda: flatten_classifications(records), number=number, repeat=3)) / number
+        print(f"{count:>8} {legacy * 1000:>18.2f} {current * 1000:>18.2f} {legacy / current:>9.1f}x")
+
+if __name__ == '__main__':
+    main()
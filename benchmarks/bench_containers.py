@@ -0,0 +1,155 @@
+# Benchmark - result containers
+# Parse and materialization time, and peak memory, of every section of Holdings, Profiles, Returns, Performance and
+# Portfolios, on synthetic responses from the stand-in payload generator.  Results can be saved as a baseline and
+# later runs compared against it.
+#
+# Usage (from the repository root):
+#   python -m benchmarks.bench_containers
+#   python -m benchmarks.bench_containers --portfolios 20 --securities 500 --dates 12 --classifications 5
+#   python -m benchmarks.bench_containers --save benchmarks/baseline.json
+#   python -m benchmarks.bench_containers --compare benchmarks/baseline.json
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+from pam.analytics.holdings import Holdings
+from pam.analytics.performance import Performance
+from pam.analytics.profiles import Profiles
+from pam.analytics.returns import Returns
+from pam.core import merge_payloads
+from pam.portfolios.portfolios import Portfolios
+from pam.standin import PayloadGenerator
+
+# Default payload sizes - portfolios x securities x dates x classifications
+SIZES = {'portfolios': 10, 'securities': 200, 'dates': 6, 'days': 250, 'classifications': 3}
+
+# Timed runs of each measurement - the median is reported
+REPEAT = 5
+
+# Size of the chunks a response body is read in
+CHUNK_SIZE = 64 * 1024
+
+# A section slower than the baseline by more than this factor is reported as a regression - measurements
+# shorter than MIN_SECONDS are too noisy to judge
+THRESHOLD = 1.5
+MIN_SECONDS = 0.001
+
+def generate(sizes, seed=0):
+    """Raw responses of every container, as JSON bytes."""
+    generator = PayloadGenerator(seed, **sizes)
+    ids = [f'PORT{i + 1:05d}' for i in range(sizes['portfolios'])]
+    request = {'portfolios': [{'portfolioId': id} for id in ids]}
+
+    payloads = {
+        Holdings: merge_payloads([generator.holdings_statements(id) for id in ids], ids),
+        Profiles: generator.profiles(request),
+        Returns: generator.return_statistics(request),
+        Performance: generator.performance_attribution(request),
+        Portfolios: generator.portfolios(ids)
+    }
+    return {cls: json.dumps(payload).encode('utf-8') for cls, payload in payloads.items()}
+
+def _chunks(body):
+    # The body as it would arrive off a connection - copies of CHUNK_SIZE bytes
+    for i in range(0, len(body), CHUNK_SIZE):
+        yield bytes(body[i:i + CHUNK_SIZE])
+
+def measure(function, repeat=REPEAT):
+    """Median seconds and peak traced bytes of a call - memory is traced in a separate run so it does not skew timings."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return statistics.median(times), peak
+
+def run(sizes, repeat=REPEAT):
+    """Measure every container and section.  Returns a mapping of 'Container.section' -> measurements."""
+    results = {}
+    for cls, body in generate(sizes).items():
+        name = cls.__name__
+        data = json.loads(body)
+
+        # The whole response off the connection: read in full and decoded, or parsed chunk by chunk as it arrives
+        seconds, peak = measure(lambda: cls(json.loads(b''.join(_chunks(body)))).materialize_all(), repeat)
+        results[f'{name}.<decoded>'] = {'seconds': seconds, 'peak_bytes': peak, 'bytes': len(body)}
+
+        seconds, peak = measure(lambda: cls.from_stream(_chunks(body)).materialize_all(), repeat)
+        results[f'{name}.<from_stream>'] = {'seconds': seconds, 'peak_bytes': peak, 'bytes': len(body)}
+
+        # Containers don't modify the raw data unless asked to release it - one decoded payload serves every run
+        for section in cls._sections:
+            rows = len(cls(data)._get(section))
+            seconds, peak = measure(lambda: cls(data)._get(section), repeat)
+            results[f'{name}.{section}'] = {'seconds': seconds, 'peak_bytes': peak, 'rows': rows}
+
+    return results
+
+def report(results, baseline=None, threshold=THRESHOLD):
+    """Print the results, compared to a baseline when given.  Returns the names of the regressed measurements."""
+    regressions = []
+    print(f"{'measurement':<56} {'rows':>8} {'time (ms)':>10} {'peak (MB)':>10}" + (f" {'vs base':>8}" if baseline else ''))
+    for name, result in results.items():
+        line = f"{name:<56} {result.get('rows', ''):>8} {result['seconds'] * 1000:>10.2f} {result['peak_bytes'] / 2**20:>10.2f}"
+        base = (baseline or {}).get(name)
+        if base:
+            ratio = result['seconds'] / base['seconds'] if base['seconds'] else float('inf')
+            line += f" {ratio:>7.2f}x"
+            if ratio > threshold and result['seconds'] >= MIN_SECONDS:
+                line += '  REGRESSION'
+                regressions.append(name)
+        print(line)
+
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.bench_containers', description='Benchmark the result containers on synthetic payloads.')
+    for name, value in SIZES.items():
+        parser.add_argument(f'--{name}', type=int, default=value, help=f'payload size (default {value})')
+    parser.add_argument('--repeat', type=int, default=REPEAT, help=f'timed runs per measurement (default {REPEAT})')
+    parser.add_argument('--save', metavar='PATH', help='save the results as a baseline')
+    parser.add_argument('--compare', metavar='PATH', help='compare against a saved baseline, failing on regressions')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD, help=f'slow-down factor reported as a regression (default {THRESHOLD})')
+    args = parser.parse_args(argv)
+
+    sizes = {name: getattr(args, name) for name in SIZES}
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            saved = json.load(f)
+        if saved['sizes'] != sizes:
+            print(f"Baseline sizes {saved['sizes']} differ from {sizes} - comparing anyway", file=sys.stderr)
+        baseline = saved['results']
+
+    results = run(sizes, args.repeat)
+    regressions = report(results, baseline, args.threshold)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'sizes': sizes, 'repeat': args.repeat, 'python': platform.python_version(), 'pandas': pd.__version__,
+                       'platform': platform.platform(), 'results': results}, f, indent=2)
+        print(f"Baseline saved to {args.save}")
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold}x", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
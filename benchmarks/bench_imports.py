@@ -0,0 +1,132 @@
+# Benchmark - import time
+# Cold-start cost of the pam package: each scenario runs in a fresh interpreter, timing the import (and, for the
+# single-function scenarios, the first call against a local stand-in server) and listing the heavy dependencies
+# it loaded.
+#
+# Usage (from the repository root):
+#   python -m benchmarks.bench_imports
+#   python -m benchmarks.bench_imports --repeat 20
+#   python -m benchmarks.bench_imports --save benchmarks/imports.json
+#   python -m benchmarks.bench_imports --compare benchmarks/imports.json
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+
+from pam.standin import StandInServer
+
+# Scenarios - name -> statement run in a fresh interpreter.  The stand-in server's URL is in PAM_BASE_URL.
+SCENARIOS = {
+    'import pam': 'import pam',
+    'import pam.core': 'import pam.core',
+    'import pam.analytics': 'import pam.analytics',
+    'import pam.metadata': 'import pam.metadata',
+    'import pam.portfolios': 'import pam.portfolios',
+    'from pam.portfolios import search': 'from pam.portfolios import search',
+    'from pam.analytics import get_profiles': 'from pam.analytics import get_profiles',
+    'search() first call': 'from pam.portfolios import search; search(maxCount=10)',
+    'get_profiles() first call': "from pam.analytics import get_profiles; get_profiles({'portfolios': [{'portfolioId': 'PORT00001'}]}).portfolios",
+    'import pandas (reference)': 'import pandas'
+}
+
+# Dependencies reported when a scenario loaded them
+HEAVY_MODULES = ('numpy', 'pandas', 'pyarrow', 'ijson', 'httpx', 'refinitiv.data', 'urllib.request', 'ssl')
+
+# Fresh interpreters started per scenario - the median is reported
+REPEAT = 10
+
+# A scenario slower than the baseline by more than this factor is reported as a regression
+THRESHOLD = 1.5
+
+_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+seconds = time.perf_counter() - start
+print(json.dumps({{'seconds': seconds, 'modules': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+def measure(statement, env, repeat=REPEAT):
+    """Median seconds of a statement over fresh interpreters, and the heavy modules it loaded."""
+    script = _SCRIPT.format(statement=statement, heavy=HEAVY_MODULES)
+    times, modules = [], []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', script], env=env, capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        times.append(result['seconds'])
+        modules = result['modules']
+
+    return statistics.median(times), modules
+
+def run(repeat=REPEAT, scenarios=SCENARIOS):
+    """Measure every scenario.  Returns a mapping of scenario name -> measurements."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with StandInServer() as server:
+        env = dict(os.environ, PAM_BASE_URL=server.url)
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [root, env.get('PYTHONPATH')]))
+
+        # Byte-compile once, so the first timed run doesn't pay for it
+        subprocess.run([sys.executable, '-c', 'import pam.analytics, pam.metadata, pam.portfolios, pam.core.container'],
+                       env=env, check=True)
+
+        results = {}
+        for name, statement in scenarios.items():
+            seconds, modules = measure(statement, env, repeat)
+            results[name] = {'seconds': seconds, 'modules': modules}
+
+    return results
+
+def report(results, baseline=None, threshold=THRESHOLD):
+    """Print the results, compared to a baseline when given.  Returns the names of the regressed scenarios."""
+    regressions = []
+    print(f"{'scenario':<40} {'time (ms)':>10}" + (f" {'vs base':>8}" if baseline else '') + "  heavy modules loaded")
+    for name, result in results.items():
+        line = f"{name:<40} {result['seconds'] * 1000:>10.2f}"
+        base = (baseline or {}).get(name)
+        if baseline:
+            if base:
+                ratio = result['seconds'] / base['seconds'] if base['seconds'] else float('inf')
+                line += f" {ratio:>7.2f}x"
+            else:
+                line += f" {'':>8}"
+        line += '  ' + (', '.join(result['modules']) or '-')
+        if base and ratio > threshold and not name.endswith('(reference)'):
+            line += '  REGRESSION'
+            regressions.append(name)
+        print(line)
+
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.bench_imports', description='Benchmark the import time of the pam package.')
+    parser.add_argument('--repeat', type=int, default=REPEAT, help=f'fresh interpreters per scenario (default {REPEAT})')
+    parser.add_argument('--save', metavar='PATH', help='save the results as a baseline')
+    parser.add_argument('--compare', metavar='PATH', help='compare against a saved baseline, failing on regressions')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD, help=f'slow-down factor reported as a regression (default {THRESHOLD})')
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+
+    results = run(args.repeat)
+    regressions = report(results, baseline, args.threshold)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'repeat': args.repeat, 'python': platform.python_version(), 'platform': platform.platform(),
+                       'results': results}, f, indent=2)
+        print(f"Baseline saved to {args.save}")
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.threshold}x", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,9 @@
+# PAM - Refinitiv Portfolio Analytics and Management API operations
+# Subpackages are imported on first access: 'import pam' loads nothing else, and pam.portfolios.search(...) only
+# loads what the search needs.
+from .core import lazy_members
+
+_MEMBERS = {name: (f'.{name}', None) for name in ('analytics', 'metadata', 'portfolios', 'core', 'aio', 'standin')}
+
+__all__ = list(_MEMBERS)
+__getattr__, __dir__ = lazy_members(__name__, _MEMBERS)
@@ -0,0 +1,109 @@
+# Asyncio
+# Async twins of every PAM API operation, plus a fan-out helper to run many requests with bounded concurrency.
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import functools
+
+from . import analytics, metadata, portfolios
+
+# Default number of requests allowed in flight at once
+DEFAULT_LIMIT = 8
+
+# Executor of the calls made within gather() / fan_out() - sized to their 'limit', where the event loop's
+# default executor (min(32, CPUs + 4) threads) would silently cap it.  None elsewhere: the default executor.
+_executor = contextvars.ContextVar('pam.aio.executor', default=None)
+
+def _twin(function):
+    # The underlying API operations are blocking - run them in an executor so the event loop stays free
+    @functools.wraps(function)
+    async def wrapper(*args, **kwargs):
+        loop = asyncio.get_running_loop()
+        call = functools.partial(contextvars.copy_context().run, function, *args, **kwargs)
+        return await loop.run_in_executor(_executor.get(), call)
+
+    return wrapper
+
+# Portfolios
+get_portfolios = _twin(portfolios.get_portfolios)
+search = _twin(portfolios.search)
+
+# Analytics
+get_holdings_statements = _twin(analytics.get_holdings_statements)
+get_performance_attribution = _twin(analytics.get_performance_attribution)
+get_profiles = _twin(analytics.get_profiles)
+get_return_statistics = _twin(analytics.get_return_statistics)
+
+# Metadata
+get_attributes = _twin(metadata.get_attributes)
+get_classification_sectors = _twin(metadata.get_classification_sectors)
+get_currencies = _twin(metadata.get_currencies)
+get_data_columns = _twin(metadata.get_data_columns)
+get_identifiers = _twin(metadata.get_identifiers)
+
+async def gather(*aws, limit=DEFAULT_LIMIT, return_exceptions=False):
+    """
+    Await the supplied coroutines with at most 'limit' of them running at once.  The API operations they
+    call run on a thread pool of 'limit' threads of their own.
+
+    Args:
+        aws — Coroutines to await, e.g. pam.aio.get_profiles(request).
+        limit — Maximum number of requests in flight. Defaults to DEFAULT_LIMIT.
+        return_exceptions — Return failures in the result list instead of raising the first one.
+
+    Returns:
+        list of results, in the same order as the supplied coroutines
+    """
+
+    semaphore = asyncio.Semaphore(limit)
+
+    async def bounded(aw):
+        async with semaphore:
+            return await aw
+
+    # Tasks created by asyncio.gather() copy the context, executor included
+    executor = ThreadPoolExecutor(max_workers=limit, thread_name_prefix='pam.aio')
+    token = _executor.set(executor)
+    try:
+        return await asyncio.gather(*(bounded(aw) for aw in aws), return_exceptions=return_exceptions)
+    finally:
+        _executor.reset(token)
+        # Never block the event loop - calls still running after a failure finish on their own
+        executor.shutdown(wait=False)
+
+async def fan_out(function, items, *args, limit=DEFAULT_LIMIT, return_exceptions=False, **kwargs):
+    """
+    Call an async API operation once per item with bounded concurrency.
+
+        holdings = await pam.aio.fan_out(pam.aio.get_holdings_statements, ids, request, limit=16)
+
+    Args:
+        function — Async API operation, called as function(item, *args, **kwargs).
+        items — Iterable of first arguments, e.g. portfolio IDs or request dictionaries.
+        limit — Maximum number of requests in flight. Defaults to DEFAULT_LIMIT.
+        return_exceptions — Return failures in the result list instead of raising the first one.
+
+    Returns:
+        list of results, in the same order as 'items'
+    """
+
+    return await gather(*(function(item, *args, **kwargs) for item in items),
+                        limit=limit, return_exceptions=return_exceptions)
+
+async def search_iter(*args, **kwargs):
+    """
+    Async twin of pam.portfolios.search_iter() - an async generator of the pages of portfolio headers,
+    each page fetched in the default executor.
+
+        async for headers in pam.aio.search_iter(page_size=200):
+            ...
+    """
+
+    pages = portfolios.search_iter(*args, **kwargs)
+    done = object()
+    try:
+        while (page := await asyncio.to_thread(next, pages, done)) is not done:
+            yield page
+    finally:
+        pages.close()
@@ -1,5 +1,18 @@
-# Metadata functions
-from .performance import get_performance_attribution
-from .profiles import get_profiles
-from .returns import get_return_statistics
-from .holdings import get_holdings_statements
+# Metadata functions - imported on first access, so that using one operation only loads its own module
+from ..core import lazy_members
+
+_MEMBERS = {
+    'get_performance_attribution': '.performance',
+    'get_profiles': '.profiles',
+    'get_return_statistics': '.returns',
+    'get_holdings_statements': '.holdings', 'get_holdings_statements_many': '.holdings',
+    'ResponseCache': '.cache',
+    'HoldingsStore': '.store',
+    'mpt_statistics': '.mpt', 'rolling_mpt_statistics': '.mpt', 'returns_from_cumulative': '.mpt',
+    'RollingStatistics': '.rolling',
+    'brinson_attribution': '.brinson',
+    'RequestCoalescer': '.coalescer'
+}
+
+__all__ = list(_MEMBERS)
+__getattr__, __dir__ = lazy_members(__name__, _MEMBERS)
@@ -0,0 +1,146 @@
+# Brinson attribution - local engine
+# Vectorized Brinson allocation / selection / interaction effects computed from holdings weights and security returns already at hand.
+
+import numpy as np
+import pandas as pd
+
+# Default fields of the input frames
+PORTFOLIO_FIELD = 'portfolioId'
+SECURITY_FIELD = 'securityId'
+WEIGHT_FIELD = 'weight'
+RETURN_FIELD = 'return'
+
+# Column holding the sector in the results
+SECTOR_FIELD = 'sector'
+
+# Effect columns, in the column order of the results (their names link through link_contributions())
+EFFECTS = ['allocationEffect', 'selectionEffect', 'interactionEffect', 'totalEffect']
+
+def brinson_attribution(holdings, benchmark, returns, sectors, classification_code=None, method='BF',
+                        portfolio_field=PORTFOLIO_FIELD, security_field=SECURITY_FIELD, weight_field=WEIGHT_FIELD,
+                        return_field=RETURN_FIELD, normalize=True):
+    """
+    Single-period Brinson attribution of many portfolios against a benchmark, by sector.
+
+    Weights and weighted returns are aggregated per (portfolio, sector) with one grouped pass over all
+    holdings, and the effects are evaluated on the resulting portfolios x sectors arrays:
+
+        allocation  = (wp - wb) * (Rb,s - Rb)      ('BF', Brinson-Fachler)  or  (wp - wb) * Rb,s  ('BHB')
+        selection   = wb * (Rp,s - Rb,s)
+        interaction = (wp - wb) * (Rp,s - Rb,s)
+
+    Args:
+        holdings — Long frame of portfolio holdings: portfolio_field, security_field, weight_field,
+                   e.g. Holdings.holdingsDetails.
+        benchmark — Long frame of benchmark holdings: security_field, weight_field, and optionally portfolio_field
+                    for a different benchmark per portfolio.
+        returns — Frame of security returns: security_field, return_field (and optionally portfolio_field),
+                  e.g. Performance.securities.
+        sectors — Sector of every security: a column name of 'holdings' / 'benchmark', a mapping or Series of
+                  security -> sector, or a frame with security_field and SECTOR_FIELD columns.
+        classification_code — Value of the 'classificationCode' index of the results. Defaults to the sector column name.
+        method — 'BF' (Brinson-Fachler) or 'BHB' (Brinson-Hood-Beebower) allocation effect.
+        portfolio_field, security_field, weight_field, return_field — Fields of the input frames.
+        normalize — Rescale weights to sum to 1 per portfolio (e.g. when given as market values or percent).
+
+    Returns:
+        pd.DataFrame — indexed by 'classificationCode', like Performance.classifications: one row per
+                       portfolio and sector with 'portfolioWeight', 'benchmarkWeight', 'portfolioReturn',
+                       'benchmarkReturn' and EFFECTS, in the units of the returns
+    """
+
+    if method not in ('BF', 'BHB'):
+        raise ValueError(f"Unknown method '{method}'. Expected 'BF' or 'BHB'")
+
+    sector_column = sectors if isinstance(sectors, str) else SECTOR_FIELD
+    if classification_code is None:
+        classification_code = sector_column
+
+    holdings = _prepare(holdings, returns, sectors, sector_column, portfolio_field, security_field, weight_field, return_field)
+    benchmark = _prepare(benchmark, returns, sectors, sector_column, portfolio_field, security_field, weight_field, return_field)
+
+    # Shared codes for portfolios and sectors
+    portfolio_ids, portfolio_codes = _factorize(holdings[portfolio_field])
+    sector_ids, sector_codes = _factorize(pd.concat([holdings[sector_column], benchmark[sector_column]], ignore_index=True))
+    P, S = len(portfolio_ids), len(sector_ids)
+
+    wp, wrp = _aggregate(portfolio_codes, sector_codes[:len(holdings)], holdings, weight_field, return_field, P, S, normalize)
+
+    bench_sectors = sector_codes[len(holdings):]
+    if portfolio_field in benchmark:
+        bench_portfolios = pd.Index(portfolio_ids).get_indexer(benchmark[portfolio_field])
+        keep = bench_portfolios >= 0
+        wb, wrb = _aggregate(bench_portfolios[keep], bench_sectors[keep], benchmark[keep], weight_field, return_field, P, S, normalize)
+    else:
+        wb, wrb = _aggregate(np.zeros(len(benchmark), dtype=int), bench_sectors, benchmark, weight_field, return_field, 1, S, normalize)
+        wb, wrb = np.broadcast_to(wb, (P, S)), np.broadcast_to(wrb, (P, S))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rp = np.where(wp != 0, wrp / wp, 0.0)
+        rb = np.where(wb != 0, wrb / wb, 0.0)
+        total_b = wrb.sum(axis=1, keepdims=True) / wb.sum(axis=1, keepdims=True)
+
+    active = wp - wb
+    allocation = active * (rb - total_b) if method == 'BF' else active * rb
+    selection = wb * (rp - rb)
+    interaction = active * (rp - rb)
+
+    # Sectors neither held by the portfolio nor by its benchmark are left out
+    p, s = np.nonzero((wp != 0) | (wb != 0))
+    result = pd.DataFrame({
+        portfolio_field: portfolio_ids[p],
+        sector_column: sector_ids[s],
+        'portfolioWeight': wp[p, s],
+        'benchmarkWeight': wb[p, s],
+        'portfolioReturn': rp[p, s],
+        'benchmarkReturn': rb[p, s],
+        'allocationEffect': allocation[p, s],
+        'selectionEffect': selection[p, s],
+        'interactionEffect': interaction[p, s],
+        'totalEffect': allocation[p, s] + selection[p, s] + interaction[p, s]
+    }, index=pd.Index([classification_code] * len(p), name='classificationCode'))
+
+    return result
+
+def _prepare(frame, returns, sectors, sector_column, portfolio_field, security_field, weight_field, return_field):
+    # Holdings with their sector and security return attached
+    if any(name is not None for name in frame.index.names):
+        frame = frame.reset_index()
+
+    if not isinstance(sectors, str):
+        if isinstance(sectors, pd.DataFrame):
+            sectors = sectors.set_index(security_field)[SECTOR_FIELD]
+        frame = frame.assign(**{sector_column: frame[security_field].map(sectors)})
+
+    if return_field not in frame:
+        keys = [security_field]
+        if portfolio_field in returns and portfolio_field in frame:
+            keys.insert(0, portfolio_field)
+        rates = returns[keys + [return_field]].drop_duplicates(keys, keep='last')
+        frame = frame.merge(rates, how='left', on=keys)
+
+    # Unclassified holdings are grouped together rather than dropped, so weights still add up
+    # (assign() leaves the caller's frame - possibly a cached Holdings section - untouched)
+    frame = frame.assign(**{sector_column: frame[sector_column].astype(object).where(frame[sector_column].notna(), 'Unclassified')})
+    return frame
+
+def _factorize(values):
+    codes, uniques = pd.factorize(values, sort=True)
+    return np.asarray(uniques, dtype=object), codes
+
+def _aggregate(portfolio_codes, sector_codes, frame, weight_field, return_field, P, S, normalize):
+    # Sum of weights and of weighted returns per (portfolio, sector), as P x S arrays
+    weights = np.nan_to_num(frame[weight_field].to_numpy(dtype=float))
+    rates = np.nan_to_num(frame[return_field].to_numpy(dtype=float))
+    cells = portfolio_codes * S + sector_codes
+
+    w = np.bincount(cells, weights=weights, minlength=P * S).reshape(P, S)
+    wr = np.bincount(cells, weights=weights * rates, minlength=P * S).reshape(P, S)
+
+    if normalize:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            totals = w.sum(axis=1, keepdims=True)
+            totals = np.where(totals != 0, totals, 1.0)
+        w, wr = w / totals, wr / totals
+
+    return w, wr
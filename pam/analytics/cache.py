@@ -0,0 +1,120 @@
+# Analytics response cache
+# Opt-in, content-addressed cache of raw JSON responses for the read-only analytics operations.
+
+from collections import OrderedDict
+import hashlib
+import json
+import threading
+
+# Default bound on the total size of the cached JSON text
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+class ResponseCache:
+    """
+    Least recently used cache of raw analytics responses, keyed by a canonical hash of the endpoint
+    and request body.  Pass an instance as 'cache=' to get_profiles, get_return_statistics or
+    get_performance_attribution.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self.__entries = OrderedDict()      # key -> (JSON text, portfolio IDs), least recently used first
+        self.__index = {}                   # portfolio ID -> keys of the entries referencing it
+        self.__bytes = 0
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def key(endpoint, request):
+        """Canonical hash of a request - equivalent dictionaries produce the same key regardless of ordering."""
+        text = json.dumps([endpoint, request], sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Return a fresh copy of the cached raw response, or None on a miss."""
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.__entries.move_to_end(key)
+            text = entry[0]
+
+        return json.loads(text)
+
+    def put(self, key, raw, request=None):
+        """
+        Store a raw response - a decoded dictionary or the JSON body as text/bytes.  Portfolio IDs referenced 
+        by the request are recorded for invalidate().  A response larger than 'max_bytes' is not cached.
+        """
+        if isinstance(raw, (bytes, bytearray)):
+            text = raw.decode('utf-8')
+        elif isinstance(raw, str):
+            text = raw
+        else:
+            text = json.dumps(raw, separators=(',', ':'))
+        ids = frozenset(_portfolio_ids(request))
+
+        with self.__lock:
+            self.__remove(key)
+            if len(text) > self.max_bytes:
+                return
+
+            self.__entries[key] = (text, ids)
+            self.__bytes += len(text)
+            for id in ids:
+                self.__index.setdefault(id, set()).add(key)
+
+            # Evict least recently used entries - the newest one fits on its own
+            while self.__bytes > self.max_bytes:
+                self.__remove(next(iter(self.__entries)))
+
+    def invalidate(self, portfolio_id):
+        """Drop every cached response whose request references the portfolio ID.  Returns the number dropped."""
+        with self.__lock:
+            keys = self.__index.pop(portfolio_id, set())
+            for key in list(keys):
+                self.__remove(key)
+            return len(keys)
+
+    def clear(self):
+        """Drop all entries and reset the counters."""
+        with self.__lock:
+            self.__entries.clear()
+            self.__index.clear()
+            self.__bytes = 0
+            self.hits = self.misses = 0
+
+    @property
+    def stats(self):
+        with self.__lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.__entries), 'bytes': self.__bytes}
+
+    def __remove(self, key):
+        entry = self.__entries.pop(key, None)
+        if entry is None:
+            return
+
+        self.__bytes -= len(entry[0])
+        for id in entry[1]:
+            keys = self.__index.get(id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.__index[id]
+
+def _portfolio_ids(request):
+    # Walk the request body collecting every 'portfolioId' value
+    if isinstance(request, dict):
+        for name, value in request.items():
+            if name == 'portfolioId' and isinstance(value, str):
+                yield value
+            else:
+                yield from _portfolio_ids(value)
+    elif isinstance(request, list):
+        for value in request:
+            yield from _portfolio_ids(value)
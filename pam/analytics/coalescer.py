@@ -0,0 +1,200 @@
+# Request coalescer
+# Concurrent single-portfolio analytics calls collected over a short window and sent as one multi-portfolio request.
+
+from concurrent.futures import Future
+import json
+import threading
+
+# Request key listing the portfolios of an analytics request, and the field identifying each portfolio
+PORTFOLIOS_KEY = 'portfolios'
+ID_FIELD = 'portfolioId'
+
+# How long the first call of a batch waits for others to join, in seconds
+DEFAULT_WINDOW = 0.02
+
+# Largest number of portfolios sent in one request
+MAX_PORTFOLIOS = 100
+
+class RequestCoalescer:
+    """
+    Wraps get_profiles or get_return_statistics so that concurrent calls whose requests differ only by
+    their 'portfolios' (same dates, attributes, benchmark...) are merged into one multi-portfolio request.
+    Each caller gets back a container holding only its own portfolios' records of every section.
+
+    The first call of a batch waits up to 'window' seconds for others to join, or until 'max_portfolios'
+    are collected, then sends the merged request.  Calls sending different entries for the same portfolio ID
+    go out in separate requests.  A failure of a merged request is raised to every caller in it.
+
+    Args:
+        function — Analytics operation, e.g. get_profiles or get_return_statistics.
+        window — Seconds to collect calls before sending. Defaults to DEFAULT_WINDOW.
+        max_portfolios — Largest number of portfolios per request. Defaults to MAX_PORTFOLIOS.
+        cache — Optional ResponseCache passed on to 'function'.
+
+    Example:
+        profiles = RequestCoalescer(get_profiles)
+        result = profiles(request)      # from many threads at once
+    """
+
+    def __init__(self, function, window=DEFAULT_WINDOW, max_portfolios=MAX_PORTFOLIOS, cache=None):
+        self.function = function
+        self.window = window
+        self.max_portfolios = max_portfolios
+        self.cache = cache
+
+        self.__batches = {}         # request without its portfolios -> open _Batch
+        self.__lock = threading.Lock()
+
+    def __call__(self, request, sections=None, columns=None):
+        """
+        Run an analytics request, possibly merged with concurrent ones.
+
+        Args:
+            request — Request body, as for 'function'.
+            sections, columns — As for 'function', applied to this caller's result only.
+        """
+
+        portfolios = request.get(PORTFOLIOS_KEY) if isinstance(request, dict) else None
+        if not isinstance(portfolios, list) or not portfolios:
+            return self.function(request, cache=self.cache, sections=sections, columns=columns)
+
+        key = json.dumps({name: value for name, value in request.items() if name != PORTFOLIOS_KEY},
+                         sort_keys=True, separators=(',', ':'), default=str)
+        call = _Call(portfolios, sections, columns)
+
+        with self.__lock:
+            batch = self.__batches.get(key)
+            if batch is not None and batch.size + len(portfolios) > self.max_portfolios:
+                # Full - send it as it is and start another
+                del self.__batches[key]
+                batch.full.set()
+                batch = None
+
+            leader = batch is None
+            if leader:
+                batch = self.__batches[key] = _Batch(request)
+            batch.calls.append(call)
+            batch.size += len(portfolios)
+            if batch.size >= self.max_portfolios:
+                self.__batches.pop(key, None)
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.window)
+            with self.__lock:
+                if self.__batches.get(key) is batch:
+                    del self.__batches[key]
+            self.__send(batch)
+
+        return call.future.result()
+
+    def __send(self, batch):
+        # Calls sending different entries for the same portfolio ID (e.g. another benchmark) can't share a
+        # request - their records couldn't be told apart - so they go out in separate requests
+        for calls in _groups(batch.calls):
+            self.__send_calls(batch.request, calls)
+
+    def __send_calls(self, request, calls):
+        if len(calls) == 1:
+            # Nobody joined - a plain request
+            call = calls[0]
+            try:
+                call.future.set_result(self.function({**request, PORTFOLIOS_KEY: call.portfolios}, cache=self.cache,
+                                                     sections=call.sections, columns=call.columns))
+            except BaseException as e:
+                call.future.set_exception(e)
+            return
+
+        # One entry per distinct portfolio entry, in the order requested
+        merged = {}
+        for call in calls:
+            for portfolio in call.portfolios:
+                merged.setdefault(_canonical(portfolio), portfolio)
+
+        try:
+            result = self.function({**request, PORTFOLIOS_KEY: list(merged.values())}, cache=self.cache)
+            raw = result.data
+        except BaseException as e:
+            for call in calls:
+                call.future.set_exception(e)
+            return
+
+        for call in calls:
+            try:
+                ids = {_portfolio_id(portfolio) for portfolio in call.portfolios}
+                call.future.set_result(type(result)(_slice(raw, ids), sections=call.sections, columns=call.columns))
+            except BaseException as e:
+                call.future.set_exception(e)
+
+class _Call:
+    __slots__ = ('portfolios', 'sections', 'columns', 'future')
+
+    def __init__(self, portfolios, sections, columns):
+        self.portfolios = portfolios
+        self.sections = sections
+        self.columns = columns
+        self.future = Future()
+
+class _Batch:
+    __slots__ = ('request', 'calls', 'size', 'full')
+
+    def __init__(self, request):
+        self.request = request
+        self.calls = []
+        self.size = 0
+        self.full = threading.Event()
+
+def _groups(calls):
+    # Calls split into groups, in order, where every portfolio ID has a single entry across the group's calls
+    groups = []         # (portfolio ID -> canonical entry, calls)
+    for call in calls:
+        entries = {}
+        for portfolio in call.portfolios:
+            entries.setdefault(_portfolio_id(portfolio), _canonical(portfolio))
+
+        for group_entries, group_calls in groups:
+            if all(group_entries.get(id, entry) == entry for id, entry in entries.items()):
+                group_entries.update(entries)
+                group_calls.append(call)
+                break
+        else:
+            groups.append((entries, [call]))
+
+    return [group_calls for _, group_calls in groups]
+
+def _canonical(portfolio):
+    return json.dumps(portfolio, sort_keys=True, separators=(',', ':'), default=str)
+
+def _portfolio_id(portfolio):
+    # A portfolio entry of a request - a dictionary with its ID, or the ID itself
+    if isinstance(portfolio, dict):
+        id = portfolio.get(ID_FIELD)
+        return id if id is not None else json.dumps(portfolio, sort_keys=True, default=str)
+    return portfolio
+
+def _slice(raw, ids):
+    # The list sections cut down to the records of 'ids'
+    return {name: _slice_records(value, ids) if isinstance(value, list) else value for name, value in raw.items()}
+
+def _slice_records(records, ids):
+    # Records of 'ids' - records not tied to a portfolio are shared by every caller, with their nested lists
+    # (e.g. the 'classificationData' rows of a classification block) cut down the same way
+    sliced = []
+    for record in records:
+        if not isinstance(record, dict):
+            sliced.append(record)
+            continue
+
+        id = record.get(ID_FIELD)
+        if id is not None:
+            if id in ids:
+                sliced.append(record)
+            continue
+
+        nested = {key: _slice_records(value, ids) for key, value in record.items() if isinstance(value, list) and value}
+        if nested and not any(nested.values()):
+            # Every nested row belongs to other portfolios
+            continue
+        sliced.append({**record, **nested} if nested else record)
+
+    return sliced
@@ -1,93 +1,144 @@
 # Holdings statements - Analytics
 # API operation for getting holdings statements by date for one portfolio ID.
 
-from refinitiv.data.delivery import endpoint_request
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+
+from ..core import Container, LazyModule, RequestError, from_records, merge_payloads, retry_failed, scheduler
+
+pd = LazyModule('pandas')
 
 # static endpoint
 ENDPOINT = 'https://api.refinitiv.com/user-data/portfolio-management/v1/portfolio-analytics/{portfolioId}/holdings-statements'
 
-class Holdings:
-    def __init__(self, data):
-        self.__data = data
-        self.__dataframes = {}
-
-        # Dispatch table mapping keys to processing functions
-        self.__dispatch_table = {
-            'holdingsSummaries': pd.DataFrame.from_records,
-            'holdingsDetails': pd.DataFrame.from_records,           
-            'bulkStatuses': pd.DataFrame.from_records,
-            'auditSecurityDetails': pd.DataFrame.from_records,
-            'auditSummaries': pd.DataFrame.from_records,            
-            'auditContributorRICDetails': pd.DataFrame.from_records
-        }
+class Holdings(Container):
+    __slots__ = ('_errors',)
+
+    # Frames mapped to their source section and processing function
+    _sections = {
+        'holdingsSummaries': ('holdingsSummaries', from_records),
+        'holdingsDetails': ('holdingsDetails', from_records),
+        'bulkStatuses': ('bulkStatuses', from_records),
+        'auditSecurityDetails': ('auditSecurityDetails', from_records),
+        'auditSummaries': ('auditSummaries', from_records),
+        'auditContributorRICDetails': ('auditContributorRICDetails', from_records)
+    }
+
+    def __init__(self, data, errors=None, **kwargs):
+        super().__init__(data, **kwargs)
+        self._errors = errors if errors is not None else {}
 
     @property
-    def data(self):
-        return self.__data
-        
+    def errors(self):
+        return self._errors
+
+    def _attributes(self):
+        return {'errors': self._errors}
+
     @property
     def holdingsSummaries(self):
-        return self.__get('holdingsSummaries')
+        return self._get('holdingsSummaries')
 
     @property
     def holdingsDetails(self):
-        return self.__get('holdingsDetails')
+        return self._get('holdingsDetails')
 
     @property
     def bulkStatuses(self):
-        return self.__get('bulkStatuses')
+        return self._get('bulkStatuses')
 
     @property
     def auditSecurityDetails(self):
-        return self.__get('auditSecurityDetails')
+        return self._get('auditSecurityDetails')
 
     @property
     def auditSummaries(self):
-        return self.__get('auditSummaries')    
+        return self._get('auditSummaries')
 
     @property
     def auditContributorRICDetails(self):
-        return self.__get('auditContributorRICDetails')     
-
-    def __get(self, key):
-        # Perform lazy-instantiation
-        if key not in self.__dataframes:
-            # Dispatch to the correct processing method
-            processing_function = self.__dispatch_table.get(key, self.__default_processing)
-            self.__dataframes[key] = processing_function(self.__data[key])
-            
-        return self.__dataframes[key]
-
-    # Default processing function
-    def __default_processing(self, data):
-        return pd.DataFrame()
-
-def get_holdings_statements(id, request) -> Holdings:
+        return self._get('auditContributorRICDetails')
+
+def get_holdings_statements(id, request, stream=False, sections=None, columns=None) -> Holdings:
     """API operation for getting holdings statements by date for one portfolio ID.
     
     Args:
         Request details required to calculate holdings for one portfolio ID.  Refer to the API documentation for more details.
+        stream — Parse the response as it arrives, building large sections in record batches.  Only transports
+                 handing over the unread body stream (see pam.core.transport) - otherwise the decoded response is used.
+        sections — Optional list of sections to keep, e.g. ['holdingsSummaries'].  Others are dropped as soon as the response arrives.
+        columns — Optional fields to extract - a list applied to every section, or a mapping of section name to list.
     
     Returns:
         pd.DataFrame    
     """    
-    
-    definition = endpoint_request.Definition(
-        method = endpoint_request.RequestMethod.POST,
-        url = ENDPOINT,
-        path_parameters = {"portfolioId": id},
-        body_parameters = request
-    )
-
-    # Submit request
+
+    # Submit request - rate limited and retried by the scheduler
     try:
-        response = definition.get_data()
-        if response.is_success:
-            return Holdings(response.data.raw)
-        
-        # Throw an exception
-        raise Exception(f"HTTP Error. Code: {response.raw.status_code}. Reason: {response.raw.reason_phrase}\n[{response.raw.text}")
-        
+        response = scheduler.request(ENDPOINT, method='POST', path_parameters={"portfolioId": id}, body_parameters=request, stream=stream)
+        if stream and getattr(response, 'stream', None) is not None:
+            # Parse the body as it arrives off the connection
+            with response:
+                return Holdings.from_stream(response.stream, sections=sections, columns=columns)
+
+        return Holdings(response.data.raw, sections=sections, columns=columns)
+
+    except RequestError:
+        raise
     except Exception as e:
         raise RuntimeError(f"An error occurred: {str(e)}") from None
+
+def get_holdings_statements_many(ids, request, max_workers=8, sections=None, retry=False, retries=3) -> Holdings:
+    """API operation for getting holdings statements by date for many portfolio IDs, one request per ID run in parallel.
+    
+    Args:
+        ids — The list of portfolio IDs of interest.
+        request — Request details applied to every portfolio ID.  Refer to the API documentation for more details.
+        max_workers — Maximum number of requests in flight. Defaults to 8.
+        sections — Optional list of sections to keep, e.g. ['holdingsSummaries'].
+        retry — Re-request only the portfolios reported as failed in 'bulkStatuses', replacing their records by the recovered ones.
+                A re-request that raises leaves the portfolio's original records and status, and its error in 'errors'.
+        retries — Maximum rounds of re-requests, with backoff between them. Defaults to 3.
+    
+    Returns:
+        Holdings — sections of all portfolios merged together, each record tagged with its 'portfolioId'.  
+                   Portfolios that failed are reported in 'errors' as a mapping of portfolio ID to error message.
+    """
+
+    if isinstance(ids, str):
+        ids = [ids]
+
+    # 'bulkStatuses' is needed to find the failed portfolios
+    if isinstance(sections, str):
+        sections = [sections]
+    requested = sections
+    if retry and sections is not None and 'bulkStatuses' not in sections:
+        requested = list(sections) + ['bulkStatuses']
+
+    errors = {}
+    payload = _fetch_many(ids, request, max_workers, requested, errors)
+    if retry:
+        def refetch(failed):
+            # 'errors' reports the outcome of the latest attempt of each portfolio
+            for id in failed:
+                errors.pop(id, None)
+            return _fetch_many(failed, request, max_workers, requested, errors)
+
+        payload = retry_failed(payload, refetch, retries, 'portfolioId')
+
+    return Holdings(payload, errors, sections=sections)
+
+def _fetch_many(ids, request, max_workers, sections, errors):
+    # Raw payloads of every portfolio merged together and tagged by ID - failures are recorded in 'errors'
+    payloads, tags = [], []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {id: executor.submit(get_holdings_statements, id, request, sections=sections) for id in dict.fromkeys(ids)}
+
+        # Collect in the order requested - a failed portfolio does not abort the rest
+        for id, future in futures.items():
+            try:
+                payloads.append(future.result().data)
+                tags.append(id)
+            except RuntimeError as e:
+                errors[id] = str(e)
+
+    return merge_payloads(payloads, tags)
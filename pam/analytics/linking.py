@@ -0,0 +1,189 @@
+# Linking
+# Splitting a date range into sub-periods and stitching per-period attribution results back into a full-period view.
+
+from ..core import LazyModule
+
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
+
+# Column name fragments identifying how a numeric column combines across periods (case-insensitive):
+#   contributions / effects are linked (summed after scaling by the growth of the preceding periods)
+#   returns are compounded geometrically
+#   anything else (weights, exposures) is averaged
+LINKED_FIELDS = ('contribution', 'effect', 'allocation', 'selection', 'interaction')
+COMPOUNDED_FIELDS = ('return',)
+
+# Cumulative return series chain-linked by chain_cumulative() unless told otherwise - active or difference
+# columns aren't returns and must not be compounded
+CUMULATIVE_RETURN_FIELDS = ('portfolioReturn', 'benchmarkReturn')
+
+def split_range(start, end, periods):
+    """
+    Split the date range [start, end] into contiguous sub-periods.
+
+    Args:
+        start, end — Dates of the full range.
+        periods — Number of sub-periods of (about) equal length, or a pandas frequency such as 'YE' or 'QE'
+                  whose period ends are used as boundaries.
+
+    Returns:
+        list of (start, end) 'YYYY-MM-DD' tuples
+    """
+
+    start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+    if isinstance(periods, int):
+        edges = pd.date_range(start, end, periods=max(periods, 1) + 1).normalize()[1:-1]
+    else:
+        edges = pd.date_range(start, end, freq=periods)
+
+    ranges, period_start = [], start
+    for period_end in sorted(set(edges[(edges >= start) & (edges < end)])) + [end]:
+        if period_end >= period_start:
+            ranges.append((period_start, period_end))
+            period_start = period_end + pd.Timedelta(days=1)
+
+    return [(s.strftime('%Y-%m-%d'), e.strftime('%Y-%m-%d')) for s, e in ranges]
+
+def chain_cumulative(frames, date_field='date', group_fields=(), columns=None, scale=1.0):
+    """
+    Chain-link the cumulative return series of consecutive sub-periods geometrically:
+
+        C(t) = (1 + C(end of previous periods)) * (1 + c(t)) - 1
+
+    Args:
+        frames — Per-period frames in chronological order, each cumulative from the start of its period.
+        date_field — Field holding the date.
+        group_fields — Fields identifying independent series, e.g. ['portfolioId'].
+        columns — Cumulative return columns. Defaults to CUMULATIVE_RETURN_FIELDS.  Columns the frames don't have
+                  are left out, other columns are kept as reported for each period.
+        scale — 100 when returns are expressed in percent, 1 for fractions.
+
+    Returns:
+        pd.DataFrame
+    """
+
+    frames = [frame for frame in frames if len(frame)]
+    if not frames:
+        return pd.DataFrame()
+
+    group_fields = [field for field in group_fields if field in frames[0]]
+    if columns is None:
+        columns = CUMULATIVE_RETURN_FIELDS
+    columns = [c for c in columns if c in frames[0]]
+
+    chained, growth = [], None
+    for frame in frames:
+        frame = frame.sort_values(group_fields + [date_field]) if date_field in frame else frame.copy()
+        values = frame[columns].to_numpy(dtype=float) / scale
+
+        # Growth carried in from the previous periods, per group
+        if growth is None:
+            carried = np.ones_like(values)
+        elif group_fields:
+            carried = frame[group_fields].merge(growth, how='left', left_on=group_fields, right_index=True)
+            carried = carried[columns].fillna(1.0).to_numpy()
+        else:
+            carried = np.broadcast_to(growth.to_numpy(), values.shape)
+
+        linked = carried * (1 + values) - 1
+        frame = frame.copy()
+        frame[columns] = linked * scale
+        chained.append(frame)
+
+        # Growth up to the end of this period
+        last = pd.DataFrame(1 + linked, columns=columns, index=frame.index)
+        if group_fields:
+            growth = pd.concat([frame[group_fields], last], axis=1).groupby(group_fields).last()
+        else:
+            growth = last.iloc[-1]
+
+    return pd.concat(chained, ignore_index=True)
+
+def link_contributions(frames, period_returns=None, keys=None, scale=1.0, group_field=None):
+    """
+    Combine per-period contribution frames (e.g. 'securities' or 'classifications') into a full-period view.
+
+    Contribution and effect columns are linked: each period's value is scaled by the growth of the
+    preceding periods, (1 + R1) ... (1 + Rk-1), so they add up to the full-period compounded return.
+    Return columns are compounded, other numeric columns (weights) are averaged over the periods.
+
+    Args:
+        frames — Per-period frames in chronological order.
+        period_returns — Portfolio return of each period: a number, or a mapping / Series of portfolio ID to
+                         return when the frames hold several portfolios - each row is then scaled by the growth
+                         of its own portfolio.  None for a period adds no growth.  Without it, contributions
+                         are simply summed.
+        keys — Fields identifying a row across periods. Defaults to the index and the non-numeric columns.
+        scale — 100 when values are expressed in percent, 1 for fractions.
+        group_field — Field holding the portfolio ID of a row, required with per-portfolio period returns.
+
+    Returns:
+        pd.DataFrame
+    """
+
+    # Growth of the periods before each period - a number, or a Series per portfolio
+    factors = _growth(period_returns, len(frames), scale)
+
+    # Empty periods contribute nothing, but still count towards averages
+    count = len(frames)
+    periods = [(factor, frame) for factor, frame in zip(factors, frames) if len(frame)]
+    if not periods:
+        return pd.DataFrame()
+    factors = [factor for factor, _ in periods]
+    frames = [frame for _, frame in periods]
+
+    index_names = [name for name in frames[0].index.names if name is not None]
+    frames = [frame.reset_index() if index_names else frame for frame in frames]
+    if keys is None:
+        keys = index_names + [c for c in frames[0].columns if c not in index_names and not pd.api.types.is_numeric_dtype(frames[0][c])]
+    numeric = [c for c in frames[0].columns if c not in keys and pd.api.types.is_numeric_dtype(frames[0][c])]
+
+    linked = [c for c in numeric if _matches(c, LINKED_FIELDS)]
+    compounded = [c for c in numeric if c not in linked and _matches(c, COMPOUNDED_FIELDS)]
+    averaged = [c for c in numeric if c not in linked and c not in compounded]
+
+    parts = []
+    for factor, frame in zip(factors, frames):
+        if isinstance(factor, pd.Series):
+            if group_field in frame:
+                factor = frame[group_field].map(factor).astype(float).fillna(1.0).to_numpy()[:, None]
+            elif len(factor) == 1:
+                factor = factor.iloc[0]
+            else:
+                raise ValueError(f"Per-portfolio period returns need the '{group_field}' field in every frame")
+
+        part = frame[keys].copy()
+        part[linked] = frame[linked].to_numpy(dtype=float) * factor
+        part[compounded] = np.log1p(frame[compounded].to_numpy(dtype=float) / scale)
+        part[averaged] = frame[averaged].to_numpy(dtype=float)
+        parts.append(part)
+
+    combined = pd.concat(parts, ignore_index=True)
+    grouped = combined.groupby(keys, sort=False, dropna=False)
+    result = pd.concat([grouped[linked].sum(), np.expm1(grouped[compounded].sum()) * scale,
+                        grouped[averaged].sum() / count], axis=1)[numeric]
+
+    # Restore the original index (e.g. 'classificationCode')
+    result = result.reset_index()
+    return result.set_index(index_names) if index_names else result
+
+def _growth(period_returns, count, scale):
+    # Compounded growth of the periods before each period - per portfolio when the returns are mappings
+    if period_returns is None:
+        return [1.0] * count
+
+    if not any(isinstance(r, (dict, pd.Series)) for r in period_returns):
+        returns = np.array([0.0 if r is None else r for r in period_returns], dtype=float) / scale
+        factors = np.ones(count)
+        factors[1:] = np.cumprod(1 + returns[:-1])
+        return list(factors)
+
+    # Portfolios x periods, a portfolio missing from a period not growing in it
+    table = pd.concat([pd.Series(r if isinstance(r, (dict, pd.Series)) else {}, dtype=float) for r in period_returns],
+                      axis=1, keys=range(count)).fillna(0.0)
+    growth = (1 + table / scale).cumprod(axis=1).shift(1, axis=1).fillna(1.0)
+    return [growth[k] for k in range(count)]
+
+def _matches(column, fragments):
+    name = str(column).lower()
+    return any(fragment in name for fragment in fragments)
@@ -0,0 +1,171 @@
+# MPT statistics - local engine
+# Vectorized Modern Portfolio Theory statistics computed from return series already at hand, for many portfolios and windows at once.
+
+import numpy as np
+import pandas as pd
+
+# Trailing windows, in observations, of daily series
+WINDOWS = {'1Y': 252, '3Y': 756, '5Y': 1260}
+PERIODS_PER_YEAR = 252
+
+# Statistics, in the column order of the results
+STATISTICS = ['annualizedReturn', 'annualizedVolatility', 'sharpeRatio', 'beta', 'alpha', 'correlation',
+              'trackingError', 'informationRatio', 'maxDrawdown']
+
+def returns_from_cumulative(daily_cumulative, value_field, date_field='date', group_field='portfolioId', scale=100):
+    """
+    Turn cumulative return series, e.g. Performance.dailyCumulative, into periodic returns.
+
+    Args:
+        daily_cumulative — Long frame of cumulative returns.
+        value_field — Column holding the cumulative return.
+        date_field — Column holding the date.
+        group_field — Column identifying the series, or None for a single series.
+        scale — 100 when returns are expressed in percent, 1 for fractions.
+
+    Returns:
+        pd.DataFrame — dates x series of periodic returns (as fractions)
+    """
+
+    frame = daily_cumulative.assign(**{date_field: pd.to_datetime(daily_cumulative[date_field])})
+    if group_field is None or group_field not in frame:
+        wide = frame.set_index(date_field)[[value_field]].sort_index()
+    else:
+        wide = frame.pivot_table(index=date_field, columns=group_field, values=value_field, aggfunc='last').sort_index()
+
+    growth = 1 + wide / scale
+    returns = growth / growth.shift(1) - 1
+
+    # The first observation is its own return since inception
+    returns.iloc[0] = growth.iloc[0] - 1
+    return returns
+
+def mpt_statistics(returns, benchmark, windows=WINDOWS, risk_free=0.0, periods_per_year=PERIODS_PER_YEAR):
+    """
+    Trailing MPT statistics of many portfolios over several windows, ending at the last observation.
+
+    Every window is computed from one pass of cumulative sums over the series (taken from the end),
+    vectorized across portfolios.  Observations missing for the portfolio or the benchmark are ignored.
+    Windows longer than the history are left out.
+
+    Args:
+        returns — dates x portfolios frame of periodic returns (fractions).
+        benchmark — Series of benchmark returns, or a frame with one benchmark column per portfolio.
+        windows — Mapping of window label to number of observations. Defaults to WINDOWS.
+        risk_free — Annual risk-free rate (fraction).
+        periods_per_year — Observations per year.
+
+    Returns:
+        pd.DataFrame — one row per portfolio and window: 'portfolioId', 'window', 'startDate', 'endDate',
+                       'observations', followed by STATISTICS
+    """
+
+    r, b = _align(returns, benchmark)
+    T, n = r.shape
+    rf = (1 + risk_free) ** (1 / periods_per_year) - 1
+
+    # Cumulative sums from the most recent observation backwards - row k covers the last k + 1 observations
+    mask = ~(np.isnan(r) | np.isnan(b))
+    x = np.where(mask, r - rf, 0.0)
+    y = np.where(mask, b - rf, 0.0)
+    sums = {name: np.cumsum(values[::-1], axis=0)
+            for name, values in (('n', mask.astype(float)), ('x', x), ('y', y), ('xx', x * x), ('yy', y * y),
+                                 ('xy', x * y), ('log', np.where(mask, np.log1p(np.where(mask, r, 0.0)), 0.0)))}
+
+    dates = returns.index
+    rows = []
+    for label, window in windows.items():
+        # A window longer than the history would only be a shorter one under its label
+        if window > T or window < 1:
+            continue
+        k = window - 1
+
+        s = {name: values[k] for name, values in sums.items()}
+        stats = _statistics(s, periods_per_year)
+        stats['maxDrawdown'] = _max_drawdown(np.where(mask[T - k - 1:], r[T - k - 1:], 0.0))
+
+        frame = pd.DataFrame({name: stats[name] for name in STATISTICS})
+        frame.insert(0, 'portfolioId', returns.columns)
+        frame.insert(1, 'window', label)
+        frame.insert(2, 'startDate', dates[T - k - 1])
+        frame.insert(3, 'endDate', dates[-1])
+        frame.insert(4, 'observations', s['n'].astype(int))
+        rows.append(frame)
+
+    if not rows:
+        return pd.DataFrame(columns=['portfolioId', 'window', 'startDate', 'endDate', 'observations'] + STATISTICS)
+    return pd.concat(rows, ignore_index=True)
+
+def rolling_mpt_statistics(returns, benchmark, window, risk_free=0.0, periods_per_year=PERIODS_PER_YEAR):
+    """
+    Rolling MPT statistics over a window of 'window' observations, for every date and portfolio at once.
+    Windows are evaluated from differences of cumulative sums.  Max drawdown is only available from
+    mpt_statistics().
+
+    Args:
+        returns, benchmark, risk_free, periods_per_year — As for mpt_statistics().
+        window — Number of observations in the window.
+
+    Returns:
+        dict of statistic name -> dates x portfolios frame (NaN until the window is full)
+    """
+
+    r, b = _align(returns, benchmark)
+    rf = (1 + risk_free) ** (1 / periods_per_year) - 1
+    mask = ~(np.isnan(r) | np.isnan(b))
+    x = np.where(mask, r - rf, 0.0)
+    y = np.where(mask, b - rf, 0.0)
+
+    def rolling(values):
+        c = np.cumsum(np.vstack([np.zeros((1, values.shape[1])), values]), axis=0)
+        out = np.full(values.shape, np.nan)
+        out[window - 1:] = c[window:] - c[:-window]
+        return out
+
+    s = {'n': rolling(mask.astype(float)), 'x': rolling(x), 'y': rolling(y), 'xx': rolling(x * x), 'yy': rolling(y * y),
+         'xy': rolling(x * y), 'log': rolling(np.where(mask, np.log1p(np.where(mask, r, 0.0)), 0.0))}
+    stats = _statistics(s, periods_per_year)
+
+    return {name: pd.DataFrame(stats[name], index=returns.index, columns=returns.columns)
+            for name in STATISTICS if name != 'maxDrawdown'}
+
+def _align(returns, benchmark):
+    # Portfolio and benchmark returns as two dates x portfolios arrays
+    if isinstance(benchmark, pd.DataFrame):
+        benchmark = benchmark.reindex(index=returns.index, columns=returns.columns)
+        return returns.to_numpy(dtype=float), benchmark.to_numpy(dtype=float)
+
+    b = benchmark.reindex(returns.index).to_numpy(dtype=float)
+    r = returns.to_numpy(dtype=float)
+    return r, np.broadcast_to(b[:, None], r.shape)
+
+def _statistics(s, periods_per_year):
+    # Statistics from window sums of excess returns x (portfolio) and y (benchmark)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        n = s['n']
+        mean_x, mean_y = s['x'] / n, s['y'] / n
+        var_x = (s['xx'] - n * mean_x ** 2) / (n - 1)
+        var_y = (s['yy'] - n * mean_y ** 2) / (n - 1)
+        cov = (s['xy'] - n * mean_x * mean_y) / (n - 1)
+        var_a = var_x + var_y - 2 * cov
+
+        vol = np.sqrt(np.maximum(var_x, 0) * periods_per_year)
+        tracking_error = np.sqrt(np.maximum(var_a, 0) * periods_per_year)
+        beta = cov / var_y
+
+        return {
+            'annualizedReturn': np.expm1(s['log'] * periods_per_year / n),
+            'annualizedVolatility': vol,
+            'sharpeRatio': mean_x * periods_per_year / vol,
+            'beta': beta,
+            'alpha': (mean_x - beta * mean_y) * periods_per_year,
+            'correlation': cov / np.sqrt(var_x * var_y),
+            'trackingError': tracking_error,
+            'informationRatio': (mean_x - mean_y) * periods_per_year / tracking_error,
+        }
+
+def _max_drawdown(r):
+    # Largest peak-to-trough fall of the wealth path, per column
+    wealth = np.cumprod(1 + r, axis=0)
+    peak = np.maximum.accumulate(np.vstack([np.ones((1, r.shape[1])), wealth]), axis=0)[1:]
+    return (wealth / peak - 1).min(axis=0)
@@ -1,133 +1,191 @@
 # Performance Attribution - Analytics
 # API operation for running attribution analysis for a portoflio and a benchmark. This API operation does not modify any portfolio data.
 
-from refinitiv.data.delivery import endpoint_request
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+
+from ..core import Container, LazyModule, RequestError, flatten_classifications, from_records, scheduler, tee_reader
+from .linking import chain_cumulative, link_contributions, split_range
+
+pd = LazyModule('pandas')
 
 # static endpoint
 ENDPOINT = 'https://api.refinitiv.com/user-data/portfolio-management/v1/portfolio-analytics/performance-attribution'
 
-class Performance:
-    def __init__(self, data):
-        self.__data = data
-        self.__dataframes = {}
-
-        # Dispatch table mapping keys to processing functions
-        self.__dispatch_table = {
-            'portfolios': pd.DataFrame.from_records,
-            'longShortBreakDown': pd.DataFrame.from_records,            
-            'classifications': self.__process_classifications,
-            'securities': pd.DataFrame.from_records,
-            'dailyCumulative': pd.DataFrame.from_records,
-            'auditSummaries': pd.DataFrame.from_records,
-            'auditSecurityDetails': pd.DataFrame.from_records,
-            'auditHoldingsDetails': pd.DataFrame.from_records,
-            'auditContributorRICDetails': pd.DataFrame.from_records,
-            'auditTransactionDetails': pd.DataFrame.from_records            
-        }
+# Request keys of the analysis date range, used when splitting a request into sub-periods
+START_DATE_KEY = 'startDate'
+END_DATE_KEY = 'endDate'
+
+# Fields of the 'dailyCumulative' section used to stitch sub-periods together
+DATE_FIELD = 'date'
+GROUP_FIELDS = ['portfolioId']
+PORTFOLIO_RETURN_FIELD = 'portfolioReturn'
+BENCHMARK_RETURN_FIELD = 'benchmarkReturn'
+
+# Returns are expressed in percent
+RETURN_SCALE = 100
+
+class Performance(Container):
+    __slots__ = ()
+
+    # Frames mapped to their source section and processing function
+    _sections = {
+        'portfolios': ('portfolios', from_records),
+        'longShortBreakDown': ('longShortBreakDown', from_records),
+        'classifications': ('classifications', flatten_classifications),
+        'securities': ('securities', from_records),
+        'dailyCumulative': ('dailyCumulative', from_records),
+        'auditSummaries': ('auditSummaries', from_records),
+        'auditSecurityDetails': ('auditSecurityDetails', from_records),
+        'auditHoldingsDetails': ('auditHoldingsDetails', from_records),
+        'auditContributorRICDetails': ('auditContributorRICDetails', from_records),
+        'auditTransactionDetails': ('auditTransactionDetails', from_records)
+    }
 
-    @property
-    def data(self):
-        return self.__data
-        
     @property
     def portfolios(self):
-        return self.__get('portfolios')
+        return self._get('portfolios')
 
     @property
     def longShortBreakDown(self):
-        return self.__get('longShortBreakDown')    
+        return self._get('longShortBreakDown')
 
     @property
     def classifications(self):
-        return self.__get('classifications')
+        return self._get('classifications')
 
     @property
     def securities(self):
-        return self.__get('securities')
+        return self._get('securities')
 
     @property
     def dailyCumulative(self):
-        return self.__get('dailyCumulative')
+        return self._get('dailyCumulative')
 
     @property
     def auditSummaries(self):
-        return self.__get('auditSummaries')
+        return self._get('auditSummaries')
 
     @property
     def auditSecurityDetails(self):
-        return self.__get('auditSecurityDetails')
+        return self._get('auditSecurityDetails')
 
     @property
     def auditHoldingsDetails(self):
-        return self.__get('auditHoldingsDetails')  
+        return self._get('auditHoldingsDetails')
 
     @property
     def auditContributorRICDetails(self):
-        return self.__get('auditContributorRICDetails')
+        return self._get('auditContributorRICDetails')
 
     @property
     def auditTransactionDetails(self):
-        return self.__get('auditTransactionDetails')      
-
-    def __get(self, key):
-        # Perform lazy-instantiation
-        if key not in self.__dataframes:
-            # Dispatch to the correct processing method
-            processing_function = self.__dispatch_table.get(key, self.__default_processing)
-            if key in self.__data:
-                self.__dataframes[key] = processing_function(self.__data[key])
-            else:
-                self.__dataframes[key] = {}
-            
-        return self.__dataframes[key]
-
-    # Default processing function
-    def __default_processing(self, data):
-        return pd.DataFrame()
-
-    def __process_classifications(self, data):
-        # Initialize an empty DataFrame
-        df = pd.DataFrame()
-            
-        # Loop through each dictionary in the list
-        for d in data:
-            # Flatten the 'classificationData' field and add 'classificationCode' as a column
-            temp_df = pd.json_normalize(d['classificationData'])
-            temp_df['classificationCode'] = d['classificationCode']
-                
-            # Append the temporary DataFrame to the main DataFrame
-            df = df.append(temp_df, ignore_index=True)
-            
-        # Set 'classificationCode' as the index
-        df.set_index('classificationCode', inplace=True)
-        return df
-
-def get_performance_attribution(request) -> Performance:
+        return self._get('auditTransactionDetails')
+
+def get_performance_attribution(request, cache=None, stream=False, sections=None, columns=None,
+                                split=None, max_workers=4) -> Performance:
     """API operation for running attribution analysis for a portoflio and a benchmark. 
     This API operation does not modify any portfolio data.
     
     Args:
         Request dictionary detailing the specific operations.  Refer to the API documentation for more details.
+        cache — Optional ResponseCache.  Identical requests are answered from the cache instead of the API.
+        stream — Parse the response as it arrives, building large sections in record batches.  Only transports
+                 handing over the unread body stream (see pam.core.transport) - otherwise the decoded response is used.
+        sections — Optional list of sections to keep.  Others are dropped as soon as the response arrives.
+        columns — Optional fields to extract - a list applied to every section, or a mapping of section name to list.
+        split — Optional number of sub-periods (or pandas frequency such as 'YE') to split the date range into.  
+                Sub-periods run concurrently and are stitched back together - see _get_split_attribution().
+        max_workers — Maximum number of sub-period requests in flight. Defaults to 4.
     
     Returns:
         pd.DataFrame    
     """    
     
-    definition = endpoint_request.Definition(
-        method = endpoint_request.RequestMethod.POST,
-        url = ENDPOINT,
-        body_parameters = request
-    )
-
-    # Submit request
+    # Run long date ranges as concurrent sub-period requests
+    if split is not None:
+        return _get_split_attribution(request, split, max_workers, cache=cache, stream=stream, sections=sections, columns=columns)
+
+    # Serve repeated requests from the cache
+    if cache is not None:
+        key = cache.key(ENDPOINT, request)
+        raw = cache.get(key)
+        if raw is not None:
+            return Performance(raw, sections=sections, columns=columns)
+
+    # Submit request - rate limited and retried by the scheduler
     try:
-        response = definition.get_data()
-        if response.is_success:
-            return Performance(response.data.raw)
-        
-        # Throw an exception
-        raise Exception(f"HTTP Error. Code: {response.raw.status_code}. Reason: {response.raw.reason_phrase}\n[{response.raw.text}")
-        
+        response = scheduler.request(ENDPOINT, method='POST', body_parameters=request, stream=stream)
+        body = getattr(response, 'stream', None) if stream else None
+        if body is not None:
+            # Parse the body as it arrives off the connection - the cache gets a copy of the raw bytes
+            chunks = []
+            source = tee_reader(body, chunks) if cache is not None else body
+            with response:
+                result = Performance.from_stream(source, sections=sections, columns=columns)
+            if cache is not None:
+                cache.put(key, b''.join(chunks), request)
+            return result
+
+        if cache is not None:
+            cache.put(key, response.data.raw, request)
+        return Performance(response.data.raw, sections=sections, columns=columns)
+
+    except RequestError:
+        raise
     except Exception as e:
         raise RuntimeError(f"An error occurred: {str(e)}") from e
+
+def _get_split_attribution(request, split, max_workers, sections=None, **kwargs) -> Performance:
+    # Split the date range and request every sub-period concurrently
+    if START_DATE_KEY not in request or END_DATE_KEY not in request:
+        raise ValueError(f"Splitting requires '{START_DATE_KEY}' and '{END_DATE_KEY}' in the request")
+
+    # Linking contributions needs the portfolio returns of 'dailyCumulative', whatever sections are kept
+    if isinstance(sections, str):
+        sections = [sections]
+    requested = sections
+    if sections is not None and 'dailyCumulative' not in sections:
+        requested = list(sections) + ['dailyCumulative']
+
+    ranges = split_range(request[START_DATE_KEY], request[END_DATE_KEY], split)
+    requests = [{**request, START_DATE_KEY: start, END_DATE_KEY: end} for start, end in ranges]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(lambda r: get_performance_attribution(r, sections=requested, **kwargs), requests))
+
+    # Portfolio returns of each sub-period, used to link contributions
+    period_returns = [_period_returns(result.dailyCumulative) for result in results]
+
+    frames = {}
+    for name in Performance._sections:
+        parts = [getattr(result, name) for result in results]
+        if name == 'dailyCumulative':
+            # Cumulative series are chain-linked geometrically
+            frames[name] = chain_cumulative(parts, DATE_FIELD, GROUP_FIELDS, columns=[PORTFOLIO_RETURN_FIELD, BENCHMARK_RETURN_FIELD],
+                                            scale=RETURN_SCALE)
+        elif name in ('securities', 'classifications'):
+            # Contributions are linked into a full-period view
+            frames[name] = link_contributions(parts, period_returns, scale=RETURN_SCALE, group_field=GROUP_FIELDS[0])
+        else:
+            # Everything else is kept per sub-period
+            parts = [part.assign(**{START_DATE_KEY: start, END_DATE_KEY: end}) for part, (start, end) in zip(parts, ranges) if len(part)]
+            frames[name] = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+
+    if sections is not None and 'dailyCumulative' not in sections:
+        frames['dailyCumulative'] = pd.DataFrame()
+
+    return Performance.from_frames(frames)
+
+def _period_returns(frame):
+    # Return of a sub-period - the last cumulative return of each portfolio, or None for an empty period
+    if not len(frame):
+        return None
+    if PORTFOLIO_RETURN_FIELD not in frame:
+        raise ValueError(f"Linking sub-period contributions needs '{PORTFOLIO_RETURN_FIELD}' in 'dailyCumulative' - "
+                         f"keep it in 'columns'")
+
+    if DATE_FIELD in frame:
+        frame = frame.sort_values(DATE_FIELD, kind='stable')
+    groups = [field for field in GROUP_FIELDS if field in frame]
+    if not groups:
+        return frame[PORTFOLIO_RETURN_FIELD].iloc[-1]
+    return frame.groupby(groups[0], sort=False)[PORTFOLIO_RETURN_FIELD].last()
@@ -1,139 +1,121 @@
 # Profiles - Analytics
 # API operation for running profile analysis for one or multiple portfolios. This API operation does not modify any portfolio data.
 
-from refinitiv.data.delivery import endpoint_request
-import pandas as pd
+from ..core import Container, LazyModule, RequestError, flatten_classifications, from_records, scheduler, tee_reader
+
+pd = LazyModule('pandas')
 
 # static endpoint
 ENDPOINT = 'https://api.refinitiv.com/user-data/portfolio-management/v1/portfolio-analytics/profiles'
 
-class Profiles:
-    def __init__(self, data):
-        self.__data = data
-        self.__dataframes = {}
-
-        # Dispatch table mapping keys to processing functions
-        self.__dispatch_table = {
-            'portfolios': pd.DataFrame.from_records,
-            'profileAttributes': pd.DataFrame.from_records,
-            'longShortBreakDown': pd.DataFrame.from_records,            
-            'classifications': self.__process_classifications,
-            'securities': pd.DataFrame.from_records,
-            'portfolioCentricCompositionSummaries': pd.DataFrame.from_records,
-            'portfolioRelativeCompositionSummaries': pd.DataFrame.from_records,
-            'breakpoints': pd.DataFrame.from_records,            
-            'auditSummaries': pd.DataFrame.from_records,
-            'auditSecurityDetails': pd.DataFrame.from_records,
-            'auditHoldingsDetails': pd.DataFrame.from_records,
-            'auditContributorRICDetails': pd.DataFrame.from_records
-        }
+class Profiles(Container):
+    __slots__ = ()
+
+    # Frames mapped to their source section and processing function
+    _sections = {
+        'portfolios': ('portfolios', from_records),
+        'profileAttributes': ('profileAttributes', from_records),
+        'longShortBreakDown': ('longShortBreakDown', from_records),
+        'classifications': ('classifications', flatten_classifications),
+        'securities': ('securities', from_records),
+        'portfolioCentricCompositionSummaries': ('portfolioCentricCompositionSummaries', from_records),
+        'portfolioRelativeCompositionSummaries': ('portfolioRelativeCompositionSummaries', from_records),
+        'breakpoints': ('breakpoints', from_records),
+        'auditSummaries': ('auditSummaries', from_records),
+        'auditSecurityDetails': ('auditSecurityDetails', from_records),
+        'auditHoldingsDetails': ('auditHoldingsDetails', from_records),
+        'auditContributorRICDetails': ('auditContributorRICDetails', from_records)
+    }
 
-    @property
-    def data(self):
-        return self.__data
-        
     @property
     def portfolios(self):
-        return self.__get('portfolios')
+        return self._get('portfolios')
 
     @property
     def profileAttributes(self):
-        return self.__get('profileAttributes')
+        return self._get('profileAttributes')
 
     @property
     def longShortBreakDown(self):
-        return self.__get('longShortBreakDown')    
+        return self._get('longShortBreakDown')
 
     @property
     def classifications(self):
-        return self.__get('classifications')
+        return self._get('classifications')
 
     @property
     def securities(self):
-        return self.__get('securities')
+        return self._get('securities')
 
     @property
     def portfolioCentricCompositionSummaries(self):
-        return self.__get('portfolioCentricCompositionSummaries')
+        return self._get('portfolioCentricCompositionSummaries')
 
     @property
     def portfolioRelativeCompositionSummaries(self):
-        return self.__get('portfolioRelativeCompositionSummaries')
+        return self._get('portfolioRelativeCompositionSummaries')
 
     @property
     def breakpoints(self):
-        return self.__get('breakpoints')    
-        
+        return self._get('breakpoints')
+
     @property
     def auditSummaries(self):
-        return self.__get('auditSummaries')
+        return self._get('auditSummaries')
 
     @property
     def auditSecurityDetails(self):
-        return self.__get('auditSecurityDetails')
+        return self._get('auditSecurityDetails')
 
     @property
     def auditHoldingsDetails(self):
-        return self.__get('auditHoldingsDetails')  
+        return self._get('auditHoldingsDetails')
 
     @property
     def auditContributorRICDetails(self):
-        return self.__get('auditContributorRICDetails')     
-
-    def __get(self, key):
-        # Perform lazy-instantiation
-        if key not in self.__dataframes:
-            # Dispatch to the correct processing method
-            processing_function = self.__dispatch_table.get(key, self.__default_processing)
-            self.__dataframes[key] = processing_function(self.__data[key])
-            
-        return self.__dataframes[key]
-
-    # Default processing function
-    def __default_processing(self, data):
-        return pd.DataFrame()
-
-    def __process_classifications(self, data):
-        # Initialize an empty DataFrame
-        df = pd.DataFrame()
-            
-        # Loop through each dictionary in the list
-        for d in data:
-            # Flatten the 'classificationData' field and add 'classificationCode' as a column
-            temp_df = pd.json_normalize(d['classificationData'])
-            temp_df['classificationCode'] = d['classificationCode']
-                
-            # Append the temporary DataFrame to the main DataFrame
-            df = df.append(temp_df, ignore_index=True)
-            
-        # Set 'classificationCode' as the index
-        df.set_index('classificationCode', inplace=True)
-        return df
-
-def get_profiles(request) -> Profiles:
+        return self._get('auditContributorRICDetails')
+
+def get_profiles(request, cache=None, stream=False, sections=None, columns=None) -> Profiles:
     """API operation for running profile analysis for one or multiple portfolios
     
     Args:
         Request parameters required for running profile analysis for one or multiple portfolios.  Refer to the API documentation for more details.
+        cache — Optional ResponseCache.  Identical requests are answered from the cache instead of the API.
+        stream — Parse the response as it arrives, building large sections in record batches.  Only transports
+                 handing over the unread body stream (see pam.core.transport) - otherwise the decoded response is used.
+        sections — Optional list of sections to keep.  Others are dropped as soon as the response arrives.
+        columns — Optional fields to extract - a list applied to every section, or a mapping of section name to list.
     
     Returns:
         pd.DataFrame    
     """    
     
-    definition = endpoint_request.Definition(
-        method = endpoint_request.RequestMethod.POST,
-        url = ENDPOINT,
-        body_parameters = request
-    )
-
-    # Submit request
+    # Serve repeated requests from the cache
+    if cache is not None:
+        key = cache.key(ENDPOINT, request)
+        raw = cache.get(key)
+        if raw is not None:
+            return Profiles(raw, sections=sections, columns=columns)
+
+    # Submit request - rate limited and retried by the scheduler
     try:
-        response = definition.get_data()
-        if response.is_success:
-            return Profiles(response.data.raw)
-        
-        # Throw an exception
-        raise Exception(f"HTTP Error. Code: {response.raw.status_code}. Reason: {response.raw.reason_phrase}\n[{response.raw.text}")
-        
+        response = scheduler.request(ENDPOINT, method='POST', body_parameters=request, stream=stream)
+        body = getattr(response, 'stream', None) if stream else None
+        if body is not None:
+            # Parse the body as it arrives off the connection - the cache gets a copy of the raw bytes
+            chunks = []
+            source = tee_reader(body, chunks) if cache is not None else body
+            with response:
+                result = Profiles.from_stream(source, sections=sections, columns=columns)
+            if cache is not None:
+                cache.put(key, b''.join(chunks), request)
+            return result
+
+        if cache is not None:
+            cache.put(key, response.data.raw, request)
+        return Profiles(response.data.raw, sections=sections, columns=columns)
+
+    except RequestError:
+        raise
     except Exception as e:
         raise RuntimeError(f"An error occurred: {str(e)}") from None
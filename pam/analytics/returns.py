@@ -1,92 +1,91 @@
 # Return Statistics - Analytics
 # API operation for calculating MPT (Modern Portfolio Theory) statistics for one or multiple portfolios.
 
-from refinitiv.data.delivery import endpoint_request
-import pandas as pd
+from ..core import Container, LazyModule, RequestError, from_records, scheduler, tee_reader
+
+pd = LazyModule('pandas')
 
 # static endpoint
 ENDPOINT = 'https://api.refinitiv.com/user-data/portfolio-management/v1/portfolio-analytics/return-statistics'
 
-class Returns:
-    def __init__(self, data):
-        self.__data = data
-        self.__dataframes = {}
+class Returns(Container):
+    __slots__ = ()
 
-        # Dispatch table mapping keys to processing functions
-        self.__dispatch_table = {
-            'portfolios': pd.DataFrame.from_records,
-            'mptStatisticsData': pd.DataFrame.from_records,           
-            'auditSummaries': pd.DataFrame.from_records,
-            'auditHoldingsDetails': pd.DataFrame.from_records,
-            'auditSecurityDetails': pd.DataFrame.from_records,            
-            'auditContributorRICDetails': pd.DataFrame.from_records
-        }
+    # Frames mapped to their source section and processing function
+    _sections = {
+        'portfolios': ('portfolios', from_records),
+        'mptStatisticsData': ('mptStatisticsData', from_records),
+        'auditSummaries': ('auditSummaries', from_records),
+        'auditHoldingsDetails': ('auditHoldingsDetails', from_records),
+        'auditSecurityDetails': ('auditSecurityDetails', from_records),
+        'auditContributorRICDetails': ('auditContributorRICDetails', from_records)
+    }
 
-    @property
-    def data(self):
-        return self.__data
-        
     @property
     def portfolios(self):
-        return self.__get('portfolios')
+        return self._get('portfolios')
 
     @property
     def mptStatisticsData(self):
-        return self.__get('mptStatisticsData')   
-        
+        return self._get('mptStatisticsData')
+
     @property
     def auditSummaries(self):
-        return self.__get('auditSummaries')
+        return self._get('auditSummaries')
 
     @property
     def auditHoldingsDetails(self):
-        return self.__get('auditHoldingsDetails')      
+        return self._get('auditHoldingsDetails')
 
     @property
     def auditSecurityDetails(self):
-        return self.__get('auditSecurityDetails')
+        return self._get('auditSecurityDetails')
 
     @property
     def auditContributorRICDetails(self):
-        return self.__get('auditContributorRICDetails')     
-
-    def __get(self, key):
-        # Perform lazy-instantiation
-        if key not in self.__dataframes:
-            # Dispatch to the correct processing method
-            processing_function = self.__dispatch_table.get(key, self.__default_processing)
-            self.__dataframes[key] = processing_function(self.__data[key])
-            
-        return self.__dataframes[key]
+        return self._get('auditContributorRICDetails')
 
-    # Default processing function
-    def __default_processing(self, data):
-        return pd.DataFrame()
-
-def get_return_statistics(request) -> Returns:
+def get_return_statistics(request, cache=None, stream=False, sections=None, columns=None) -> Returns:
     """API operation for calculating MPT (Modern Portfolio Theory) statistics for one or multiple portfolios.
     
     Args:
         Request details required to calculate statistics for one or multiple portfolios.  Refer to the API documentation for more details.
+        cache — Optional ResponseCache.  Identical requests are answered from the cache instead of the API.
+        stream — Parse the response as it arrives, building large sections in record batches.  Only transports
+                 handing over the unread body stream (see pam.core.transport) - otherwise the decoded response is used.
+        sections — Optional list of sections to keep.  Others are dropped as soon as the response arrives.
+        columns — Optional fields to extract - a list applied to every section, or a mapping of section name to list.
     
     Returns:
         pd.DataFrame    
     """    
     
-    definition = endpoint_request.Definition(
-        method = endpoint_request.RequestMethod.POST,
-        url = ENDPOINT,
-        body_parameters = request
-    )
+    # Serve repeated requests from the cache
+    if cache is not None:
+        key = cache.key(ENDPOINT, request)
+        raw = cache.get(key)
+        if raw is not None:
+            return Returns(raw, sections=sections, columns=columns)
 
-    # Submit request
+    # Submit request - rate limited and retried by the scheduler
     try:
-        response = definition.get_data()
-        if response.is_success:
-            return Returns(response.data.raw)
-        
-        # Throw an exception
-        raise Exception(f"HTTP Error. Code: {response.raw.status_code}. Reason: {response.raw.reason_phrase}\n[{response.raw.text}")
-        
+        response = scheduler.request(ENDPOINT, method='POST', body_parameters=request, stream=stream)
+        body = getattr(response, 'stream', None) if stream else None
+        if body is not None:
+            # Parse the body as it arrives off the connection - the cache gets a copy of the raw bytes
+            chunks = []
+            source = tee_reader(body, chunks) if cache is not None else body
+            with response:
+                result = Returns.from_stream(source, sections=sections, columns=columns)
+            if cache is not None:
+                cache.put(key, b''.join(chunks), request)
+            return result
+
+        if cache is not None:
+            cache.put(key, response.data.raw, request)
+        return Returns(response.data.raw, sections=sections, columns=columns)
+
+    except RequestError:
+        raise
     except Exception as e:
         raise RuntimeError(f"An error occurred: {str(e)}") from None
@@ -0,0 +1,140 @@
+# Rolling statistics - incremental
+# Trailing MPT statistics of many portfolios kept up to date in constant time per new observation.
+
+import numpy as np
+import pandas as pd
+
+from .mpt import PERIODS_PER_YEAR, STATISTICS, _align, _statistics, returns_from_cumulative
+
+class RollingStatistics:
+    """
+    Trailing statistics over the last 'window' observations, for many portfolios at once.  Running sums
+    and a ring buffer of the window are kept, so update() costs O(1) per portfolio whatever the history
+    length.  The sums are re-derived from the buffer once every 'window' updates to stop rounding drift.
+
+    Max drawdown is tracked since the start of the seeded history (peak, wealth and worst drawdown are
+    carried forward); a windowed max drawdown can't be maintained in constant time.
+
+    Args:
+        portfolios — Portfolio IDs, in the order of the values passed to update().
+        window — Number of observations in the trailing window.
+        risk_free — Annual risk-free rate (fraction).
+        periods_per_year — Observations per year.
+    """
+
+    def __init__(self, portfolios, window=252, risk_free=0.0, periods_per_year=PERIODS_PER_YEAR):
+        self.portfolios = list(portfolios)
+        self.window = window
+        self.periods_per_year = periods_per_year
+        self.rf = (1 + risk_free) ** (1 / periods_per_year) - 1
+        self.date = None
+
+        n = len(self.portfolios)
+        self.__buffers = {name: np.zeros((window, n)) for name in ('n', 'x', 'y', 'xx', 'yy', 'xy', 'log')}
+        self.__sums = {name: np.zeros(n) for name in self.__buffers}
+        self.__position = 0
+        self.__updates = 0
+
+        self.__wealth = np.ones(n)
+        self.__peak = np.ones(n)
+        self.__max_drawdown = np.zeros(n)
+
+    @classmethod
+    def from_history(cls, returns, benchmark, window=252, risk_free=0.0, periods_per_year=PERIODS_PER_YEAR):
+        """
+        Seed from a history of periodic returns.
+
+        Args:
+            returns — dates x portfolios frame of periodic returns (fractions).
+            benchmark — Series of benchmark returns, or a frame with one benchmark column per portfolio.
+        """
+
+        stats = cls(returns.columns, window, risk_free, periods_per_year)
+        r, b = _align(returns, benchmark)
+
+        # Only the window needs replaying into the buffer, the drawdown state covers the full history
+        rows = stats.__observations(r[-window:], b[-window:])
+        k = len(r[-window:])
+        for name, values in rows.items():
+            stats.__buffers[name][:k] = values
+            stats.__sums[name] = values.sum(axis=0)
+        stats.__position = k % window
+
+        wealth = np.cumprod(1 + np.nan_to_num(r), axis=0)
+        if len(wealth):
+            peak = np.maximum.accumulate(np.vstack([np.ones((1, r.shape[1])), wealth]), axis=0)[1:]
+            stats.__wealth, stats.__peak = wealth[-1], peak[-1]
+            stats.__max_drawdown = np.minimum((wealth / peak - 1).min(axis=0), 0)
+            stats.date = returns.index[-1]
+
+        return stats
+
+    @classmethod
+    def from_cumulative(cls, daily_cumulative, value_field, benchmark_field, window=252, scale=100, **kwargs):
+        """
+        Seed from cumulative return series such as Performance.dailyCumulative, holding the portfolio's and
+        the benchmark's cumulative returns in 'value_field' and 'benchmark_field' per 'portfolioId'.
+        """
+
+        returns = returns_from_cumulative(daily_cumulative, value_field, scale=scale)
+        benchmark = returns_from_cumulative(daily_cumulative, benchmark_field, scale=scale)
+        return cls.from_history(returns, benchmark.reindex(columns=returns.columns), window, **kwargs)
+
+    def update(self, returns, benchmark, date=None):
+        """
+        Add one observation - O(1) per portfolio.
+
+        Args:
+            returns — Periodic return of every portfolio: array in 'portfolios' order, or a mapping/Series by portfolio ID.
+            benchmark — Benchmark return: a scalar, or one per portfolio like 'returns'.
+            date — Optional date of the observation.
+        """
+
+        r = self.__vector(returns)
+        # A mapping has no dimensions to numpy, so it is told apart from a scalar first
+        per_portfolio = isinstance(benchmark, (dict, pd.Series)) or np.ndim(benchmark) > 0
+        b = np.broadcast_to(self.__vector(benchmark) if per_portfolio else float(benchmark), r.shape)
+        rows = self.__observations(r[None, :], b[None, :])
+
+        # Replace the oldest observation of the window by the new one
+        p = self.__position
+        for name, values in rows.items():
+            self.__sums[name] += values[0] - self.__buffers[name][p]
+            self.__buffers[name][p] = values[0]
+        self.__position = (p + 1) % self.window
+
+        # Drawdown since the start of the history
+        self.__wealth = self.__wealth * (1 + np.nan_to_num(r))
+        self.__peak = np.maximum(self.__peak, self.__wealth)
+        self.__max_drawdown = np.minimum(self.__max_drawdown, self.__wealth / self.__peak - 1)
+
+        self.__updates += 1
+        if self.__updates % self.window == 0:
+            self.__sums = {name: values.sum(axis=0) for name, values in self.__buffers.items()}
+
+        if date is not None:
+            self.date = date
+
+    @property
+    def statistics(self) -> pd.DataFrame:
+        """Current trailing statistics, one row per portfolio."""
+        stats = _statistics(self.__sums, self.periods_per_year)
+        stats['maxDrawdown'] = self.__max_drawdown
+
+        df = pd.DataFrame({name: stats[name] for name in STATISTICS}, index=pd.Index(self.portfolios, name='portfolioId'))
+        df.insert(0, 'observations', self.__sums['n'].round().astype(int))
+        df['currentDrawdown'] = self.__wealth / self.__peak - 1
+        return df
+
+    def __vector(self, values):
+        if isinstance(values, (dict, pd.Series)):
+            return pd.Series(values).reindex(self.portfolios).to_numpy(dtype=float)
+        return np.asarray(values, dtype=float)
+
+    def __observations(self, r, b):
+        # Per-observation terms of the window sums
+        mask = ~(np.isnan(r) | np.isnan(b))
+        x = np.where(mask, r - self.rf, 0.0)
+        y = np.where(mask, b - self.rf, 0.0)
+        return {'n': mask.astype(float), 'x': x, 'y': y, 'xx': x * x, 'yy': y * y, 'xy': x * y,
+                'log': np.where(mask, np.log1p(np.where(mask, r, 0.0)), 0.0)}
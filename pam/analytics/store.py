@@ -0,0 +1,162 @@
+# Holdings store
+# Local store of holdings statements, keyed by portfolio ID and statement date.  Only dates not yet stored are requested.
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+import shutil
+import urllib.parse
+
+from ..core import LazyModule
+from .holdings import Holdings, get_holdings_statements
+
+pd = LazyModule('pandas')
+
+# Sections kept by the store
+SECTIONS = ['holdingsSummaries', 'holdingsDetails']
+
+# Field holding the statement date within the stored sections
+DATE_FIELD = 'holdingsStatementDate'
+
+# Request key listing the statement dates to calculate
+REQUEST_DATES_KEY = 'holdingsStatementDates'
+
+# Raw value of the stored Holdings (kept in its manifest) listing every date requested so far - including
+# dates the API had no statement for, which are not requested again
+REQUESTED_DATES_KEY = 'requestedStatementDates'
+
+def request_for_dates(request, dates):
+    """Default request builder - the base request with its statement dates replaced by 'dates'."""
+    return {**request, REQUEST_DATES_KEY: list(dates)}
+
+class HoldingsStore:
+    """
+    Holdings statements persisted per portfolio ID under 'root' (one directory per portfolio, in the
+    Container.save() format).  update() requests only the statement dates not requested before and
+    merges the new rows into the stored 'holdingsSummaries' and 'holdingsDetails'.
+
+    Args:
+        root — Directory of the store, created if needed.
+        date_field — Field holding the statement date in the stored sections. Defaults to DATE_FIELD.
+        request_builder — Function (request, dates) -> request asking for the given dates only. Defaults to request_for_dates.
+        format — Storage format, 'arrow' or 'parquet'.
+    """
+
+    def __init__(self, root, date_field=DATE_FIELD, request_builder=request_for_dates, format='arrow'):
+        self.root = root
+        self.date_field = date_field
+        self.request_builder = request_builder
+        self.format = format
+        os.makedirs(root, exist_ok=True)
+
+    def load(self, portfolio_id):
+        """Return the stored Holdings of a portfolio, or None if nothing is stored yet."""
+        path = self.__path(portfolio_id)
+        if not os.path.isdir(path):
+            return None
+        return Holdings.load(path)
+
+    def dates(self, portfolio_id):
+        """Statement dates stored for a portfolio, as sorted 'YYYY-MM-DD' strings."""
+        return self.__dates(self.load(portfolio_id))
+
+    def missing(self, portfolio_id, dates):
+        """Statement dates of 'dates' neither stored nor requested before for a portfolio."""
+        return self.__missing(self.load(portfolio_id), dates)
+
+    def update(self, portfolio_id, request, dates) -> Holdings:
+        """
+        Bring a portfolio's stored holdings up to date for 'dates', requesting only the missing ones.  Dates
+        requested without getting a statement back are remembered and not requested again.
+
+        Args:
+            portfolio_id — Portfolio ID.
+            request — Base holdings statements request.  Refer to the API documentation for more details.
+            dates — Statement dates that should be stored.
+
+        Returns:
+            Holdings — the full stored history
+        """
+
+        stored = self.load(portfolio_id)
+        missing = self.__missing(stored, dates)
+        if not missing:
+            return stored
+
+        fresh = get_holdings_statements(portfolio_id, self.request_builder(request, missing), sections=SECTIONS)
+
+        frames = {}
+        for name in SECTIONS:
+            new = getattr(fresh, name)
+            if stored is None:
+                frames[name] = new
+                continue
+
+            # Replace any stored rows of the requested dates by the new ones
+            old = getattr(stored, name)
+            if self.date_field in old and self.date_field in new:
+                old = old[~_normalize(old[self.date_field]).isin(missing).to_numpy()]
+            frames[name] = pd.concat([old, new], ignore_index=True)
+
+        requested = sorted(set(self.__requested(stored)) | set(missing))
+        holdings = Holdings.from_frames(frames, data={REQUESTED_DATES_KEY: requested})
+        self.__write(portfolio_id, holdings)
+        return holdings
+
+    def update_many(self, ids, request, dates, max_workers=8):
+        """
+        update() for many portfolios in parallel.
+
+        Returns:
+            (dict of portfolio ID -> Holdings, dict of portfolio ID -> error message)
+        """
+        results, errors = {}, {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {id: executor.submit(self.update, id, request, dates) for id in dict.fromkeys(ids)}
+            for id, future in futures.items():
+                try:
+                    results[id] = future.result()
+                except RuntimeError as e:
+                    errors[id] = str(e)
+
+        return results, errors
+
+    def __dates(self, holdings):
+        if holdings is None:
+            return []
+
+        summaries = holdings.holdingsSummaries
+        if self.date_field not in summaries:
+            return []
+        return sorted(set(_normalize(summaries[self.date_field])))
+
+    def __requested(self, holdings):
+        if holdings is None:
+            return []
+        return holdings.data.get(REQUESTED_DATES_KEY, [])
+
+    def __missing(self, holdings, dates):
+        known = set(self.__dates(holdings)) | set(self.__requested(holdings))
+        return [date for date in dict.fromkeys(_normalize(pd.Series(list(dates)))) if date not in known]
+
+    def __path(self, portfolio_id):
+        # IDs are percent-encoded, dots included, so none can name a path outside 'root' or clash with
+        # the '.new' / '.old' directories of __write()
+        name = urllib.parse.quote(str(portfolio_id), safe='').replace('.', '%2E')
+        return os.path.join(self.root, name)
+
+    def __write(self, portfolio_id, holdings):
+        # Write alongside, then swap in, so an interrupted update leaves the previous version intact
+        path = self.__path(portfolio_id)
+        temp, old = path + '.new', path + '.old'
+        shutil.rmtree(temp, ignore_errors=True)
+        holdings.save(temp, self.format)
+
+        if os.path.isdir(path):
+            shutil.rmtree(old, ignore_errors=True)
+            os.replace(path, old)
+        os.replace(temp, path)
+        shutil.rmtree(old, ignore_errors=True)
+
+def _normalize(values):
+    # Statement dates as 'YYYY-MM-DD' strings, whatever their stored type
+    return pd.to_datetime(values).dt.strftime('%Y-%m-%d')
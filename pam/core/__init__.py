@@ -0,0 +1,19 @@
+# Core helpers shared by the PAM API operations - members are imported on first access
+from .lazy import LazyModule, lazy_members
+
+# Member name -> module defining it, or (module, None) for the module itself
+_MEMBERS = {
+    'merge_payloads': '.payloads', 'failed_ids': '.payloads', 'retry_failed': '.payloads',
+    'flatten_classifications': '.frames', 'from_records': '.frames',
+    'Container': '.container',
+    'compact_frame': '.dtypes', 'field_types_from_columns': '.dtypes',
+    'tee_reader': '.streaming',
+    'storage': ('.storage', None),
+    'RequestError': '.scheduler', 'ThrottledError': '.scheduler',
+    'scheduler': ('.scheduler', None),
+    'Transport': '.transport', 'RefinitivTransport': '.transport', 'HttpTransport': '.transport',
+    'instrumentation': ('.instrumentation', None)
+}
+
+__all__ = ['LazyModule', *_MEMBERS]
+__getattr__, __dir__ = lazy_members(__name__, _MEMBERS)
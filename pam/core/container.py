@@ -0,0 +1,231 @@
+# Result containers
+# Base class for the results of the PAM API operations - raw JSON sections are turned into DataFrames lazily, on first access.
+
+import functools
+import threading
+import time
+
+from . import instrumentation, storage
+from .dtypes import compact_frame
+from .lazy import LazyModule
+from .streaming import DEFAULT_BATCH_SIZE, parse_sections
+
+pd = LazyModule('pandas')
+
+class Container:
+    """
+    Lazily materialized result of a PAM API operation.
+
+    Subclasses describe their frames in '_sections', a mapping of frame name to (source section of the
+    raw response, processing function).  Processing functions receive the list of records of the source
+    section, plus the 'columns' to extract when a projection applies, and return a DataFrame.  Frames 
+    whose section is missing from the response are empty.
+
+    Args:
+        data — Raw response dictionary.
+        release_raw — Drop each raw section once it has been turned into frames.
+        sections — Optional frame names to keep.  The raw sections of all other frames are dropped immediately.
+        columns — Optional fields to extract - a list applied to every frame, or a mapping of frame name to list.
+        compact — Convert frames to compact dtypes (see compact()).  True, or a mapping of field name to type.
+    """
+
+    __slots__ = ('_data', '_frames', '_lock', '_release', '_columns', '_compact', '_loaders')
+
+    _sections = {}
+
+    def __init__(self, data, release_raw=False, sections=None, columns=None, compact=False):
+        self._data = data
+        self._frames = {}
+        self._lock = threading.RLock()
+        self._release = release_raw
+        self._columns = columns
+        self._compact = compact
+        self._loaders = None
+
+        # Drop the raw sections no requested frame is built from
+        if sections is not None:
+            for source in self._sources() - self._sources(sections):
+                self._data.pop(source, None)
+
+    @classmethod
+    def from_stream(cls, stream, batch_size=DEFAULT_BATCH_SIZE, sections=None, columns=None, **kwargs):
+        """
+        Build the container from a JSON response body, parsed incrementally.  Sections feeding a single
+        frame are converted in record batches as they are parsed and never held as raw JSON.  Sections 
+        not requested are skipped by the parser.  Slower than decoding the body in one go, but only a few
+        record batches are held at a time - worth it when the body is read off a connection rather than
+        already in memory.
+
+        Args:
+            stream — A binary file-like object (e.g. an unread response), an iterable of byte chunks, or bytes.
+            batch_size — Number of records converted to a DataFrame at a time.
+            sections, columns, kwargs — Passed on to the container's constructor.
+        """
+
+        start = time.perf_counter() if instrumentation.enabled() else None
+        container = cls({}, sections=sections, columns=columns, **kwargs)
+        names = cls._sections.keys() if sections is None else cls._names(sections)
+
+        # Only sections feeding a single frame can be converted while parsing
+        sources = [source for source, _ in cls._sections.values()]
+        processors = {}
+        for name in names:
+            source = cls._sections[name][0]
+            if sources.count(source) == 1:
+                processors[source] = functools.partial(container._process, name)
+
+        frames, container._data = parse_sections(stream, processors, batch_size,
+                                                 skip=cls._sources() - cls._sources(names))
+        for name in names:
+            source = cls._sections[name][0]
+            if source in frames:
+                container._frames[name] = container._finish(frames[source])
+
+        if start is not None:
+            instrumentation.emit(instrumentation.STREAM, cls.__name__, time.perf_counter() - start,
+                                 bytes=len(stream) if isinstance(stream, (bytes, bytearray)) else None,
+                                 rows=sum(len(frame) for frame in container._frames.values()))
+        return container
+
+    @classmethod
+    def from_frames(cls, frames, data=None, **kwargs):
+        """
+        Build the container from frames already at hand, e.g. the result of combining several responses.
+
+        Args:
+            frames — Mapping of frame name to DataFrame.  Frames not supplied are empty.
+            data — Optional raw values to keep alongside, e.g. top-level scalars.
+            kwargs — Passed on to the container's constructor.
+        """
+        container = cls(data if data is not None else {}, **kwargs)
+        for name in cls._names(list(frames)):
+            container._frames[name] = container._finish(frames[name])
+
+        return container
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reopen a result written by save().  Frames are read lazily, on first access, from memory-mapped files.
+
+        Args:
+            path — Directory written by save().
+        """
+        return storage.load(cls, path)
+
+    def save(self, path, format='arrow'):
+        """
+        Write every frame to its own Arrow (or Parquet) file in 'path', alongside a manifest.  Requires 'pyarrow'.
+
+        Args:
+            path — Target directory, created if needed.
+            format — 'arrow' (default, memory-mapped on reload) or 'parquet' (compressed).
+        """
+        storage.save(self, path, format)
+
+    @property
+    def data(self):
+        return self._data
+
+    def materialize_all(self):
+        """Build every frame of the container.  Returns the container."""
+        for name in self._sections:
+            self._get(name)
+
+        return self
+
+    def compact(self, field_types=None):
+        """
+        Convert the frames to compact dtypes - low-cardinality strings become categoricals, dates are parsed
+        and numbers downcast where no precision is lost.  Applies to frames already built and to those built 
+        from now on.  Returns the container.
+
+        Args:
+            field_types — Optional mapping of field name -> 'date', 'number' or 'string'.  Build one from the
+                          data columns metadata with pam.core.field_types_from_columns(pam.metadata.get_data_columns()).
+        """
+        with self._lock:
+            self._compact = field_types or True
+            for name, frame in self._frames.items():
+                self._frames[name] = self._finish(frame)
+
+        return self
+
+    def release_raw(self):
+        """
+        Drop the raw JSON sections that have been turned into frames, and keep doing so for frames built
+        from now on.  Long-lived results then hold their frames only.
+        """
+        with self._lock:
+            self._release = True
+            for source in {source for source, _ in self._sections.values()}:
+                self.__drop(source)
+
+    def _get(self, name):
+        # Fast path - no locking once the frame exists
+        frame = self._frames.get(name)
+        if frame is not None:
+            return frame
+
+        # Perform lazy-instantiation, once, however many threads ask
+        with self._lock:
+            frame = self._frames.get(name)
+            if frame is not None:
+                return frame
+
+            start = time.perf_counter() if instrumentation.enabled() else None
+            if self._loaders and name in self._loaders:
+                frame = self._frames[name] = self._finish(self._loaders.pop(name)())
+            else:
+                source = self._sections[name][0]
+                records = self._data.get(source)
+                frame = self._frames[name] = pd.DataFrame() if records is None else self._finish(self._process(name, records))
+
+                if self._release:
+                    self.__drop(source)
+
+            if start is not None:
+                instrumentation.emit(instrumentation.SECTION, f'{type(self).__name__}.{name}', time.perf_counter() - start, rows=len(frame))
+            return frame
+
+    def _process(self, name, records):
+        # Run the frame's processing function, extracting only the projected fields if any
+        process = self._sections[name][1]
+        columns = self._columns
+        if isinstance(columns, dict):
+            columns = columns.get(name)
+
+        if columns is None:
+            return process(records)
+        return process(records, columns=list(columns))
+
+    def _attributes(self):
+        # Constructor arguments, beyond the raw data, persisted by save()
+        return {}
+
+    def _finish(self, frame):
+        # Apply the compact dtype pass when enabled
+        if not self._compact:
+            return frame
+        return compact_frame(frame, self._compact if isinstance(self._compact, dict) else None)
+
+    @classmethod
+    def _names(cls, sections):
+        # Validate requested frame names
+        names = [sections] if isinstance(sections, str) else list(sections)
+        unknown = [name for name in names if name not in cls._sections]
+        if unknown:
+            raise ValueError(f"Unknown sections for {cls.__name__}: {', '.join(unknown)}")
+
+        return names
+
+    @classmethod
+    def _sources(cls, sections=None):
+        # Raw sections the given frames (default all) are built from
+        names = cls._sections.keys() if sections is None else cls._names(sections)
+        return {cls._sections[name][0] for name in names}
+
+    def __drop(self, source):
+        # A section is only dropped once every frame built from it exists
+        if all(name in self._frames for name, (s, _) in self._sections.items() if s == source):
+            self._data.pop(source, None)
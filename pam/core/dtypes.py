@@ -0,0 +1,120 @@
+# Dtypes
+# Compact dtypes for result DataFrames - categorical strings, parsed dates and downcast numbers.
+
+from .lazy import LazyModule
+
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
+
+# String columns with at most this fraction of distinct values become categoricals
+CATEGORY_RATIO = 0.5
+
+# Candidate names of the field name and data type columns of the get_data_columns() metadata
+NAME_FIELDS = ('name', 'fieldName', 'dataColumnName', 'code', 'id')
+TYPE_FIELDS = ('dataType', 'type', 'valueType')
+
+def field_types_from_columns(columns):
+    """
+    Build a field type mapping from the data columns metadata returned by pam.metadata.get_data_columns().
+
+    Args:
+        columns — DataFrame of data columns metadata.
+
+    Returns:
+        dict of field name -> 'date', 'number' or 'string'
+    """
+
+    name_field = next((c for c in NAME_FIELDS if c in columns.columns), None)
+    type_field = next((c for c in TYPE_FIELDS if c in columns.columns), None)
+    if name_field is None or type_field is None:
+        return {}
+
+    types = {}
+    for name, data_type in zip(columns[name_field], columns[type_field].astype(str).str.lower()):
+        if 'date' in data_type:
+            types[name] = 'date'
+        elif any(t in data_type for t in ('number', 'money', 'percent', 'decimal', 'double', 'float', 'int')):
+            types[name] = 'number'
+        else:
+            types[name] = 'string'
+
+    return types
+
+def compact_frame(df, field_types=None, category_ratio=CATEGORY_RATIO):
+    """
+    Convert the columns of a DataFrame to compact dtypes:
+
+        - low-cardinality string columns (and index) become categoricals
+        - date columns are parsed into datetime64
+        - integers are downcast, floats become float32 only where the values round-trip exactly
+
+    Columns are identified by 'field_types' when given, otherwise string columns named '...Date' or 'date'
+    are treated as dates.
+
+    Args:
+        df — DataFrame to convert.
+        field_types — Optional mapping of field name -> 'date', 'number' or 'string', e.g. from field_types_from_columns().
+        category_ratio — Maximum fraction of distinct values for a string column to become categorical.
+
+    Returns:
+        pd.DataFrame
+    """
+
+    field_types = field_types or {}
+    columns = {}
+    for column in df.columns:
+        series = df[column]
+        kind = field_types.get(column)
+        if kind is None and isinstance(column, str) and (column == 'date' or column.endswith('Date')):
+            kind = 'date'
+
+        converted = _compact_series(series, kind, category_ratio)
+        if converted is not series:
+            columns[column] = converted
+
+    if columns:
+        df = df.copy(deep=False)
+        for column, values in columns.items():
+            df[column] = values
+
+    if not isinstance(df.index, pd.CategoricalIndex) and _is_categorical(df.index, category_ratio):
+        df = df.set_axis(pd.CategoricalIndex(df.index, name=df.index.name), axis=0)
+
+    return df
+
+def _compact_series(series, kind, category_ratio):
+    dtype = series.dtype
+    if dtype == object or pd.api.types.is_string_dtype(dtype):
+        if kind == 'date':
+            parsed = pd.to_datetime(series, errors='coerce')
+            # Only keep the conversion if every value was a date
+            if parsed.isna().sum() == series.isna().sum():
+                return parsed
+        elif kind == 'number':
+            parsed = pd.to_numeric(series, errors='coerce')
+            if parsed.isna().sum() == series.isna().sum():
+                return _downcast(parsed)
+
+        if _is_categorical(series, category_ratio):
+            return series.astype('category')
+        return series
+
+    return _downcast(series)
+
+def _downcast(series):
+    if pd.api.types.is_integer_dtype(series.dtype):
+        return pd.to_numeric(series, downcast='integer')
+
+    if series.dtype == np.float64:
+        narrow = series.astype(np.float32)
+        if np.array_equal(narrow.to_numpy(dtype=np.float64), series.to_numpy(), equal_nan=True):
+            return narrow
+
+    return series
+
+def _is_categorical(values, category_ratio):
+    n = len(values)
+    if n == 0 or pd.api.types.infer_dtype(values, skipna=True) != 'string':
+        return False
+
+    return values.nunique() <= category_ratio * n
@@ -0,0 +1,49 @@
+# Frames
+# Helpers for turning raw JSON sections into DataFrames.
+
+from .lazy import LazyModule
+
+pd = LazyModule('pandas')
+
+def from_records(records, columns=None):
+    """
+    Build a DataFrame from a list of records - the default processing function of container sections.
+    Same as pd.DataFrame.from_records, but can be referenced without importing pandas.
+    """
+
+    return pd.DataFrame.from_records(records, columns=columns)
+
+def flatten_classifications(records, data_key='classificationData', columns=None):
+    """
+    Flatten classification blocks into a single DataFrame indexed by 'classificationCode'.  Each block 
+    is of the form {'classificationCode': ..., data_key: [...]} - the nested rows of every block are 
+    collected in one pass and normalized once, rather than building and appending a frame per block.
+
+    Args:
+        records — List of classification blocks.
+        data_key — Name of the nested list within each block, e.g. 'classificationData' or 'sectors'.
+        columns — Optional list of (flattened) fields to extract.  Other fields are not normalized at all.
+
+    Returns:
+        pd.DataFrame
+    """
+
+    rows, codes = [], []
+    for record in records:
+        data = record[data_key]
+        rows.extend(data)
+        codes.extend([record['classificationCode']] * len(data))
+
+    # Keep only the top-level fields the projected columns come from before normalizing
+    if columns is not None:
+        fields = {column.split('.')[0] for column in columns}
+        rows = [{k: v for k, v in row.items() if k in fields} for row in rows]
+
+    df = pd.json_normalize(rows) if rows else pd.DataFrame()
+    if columns is not None:
+        df = df.reindex(columns=columns)
+
+    # The block's code takes precedence over any code within the nested rows
+    df = df.drop(columns='classificationCode', errors='ignore')
+    df.index = pd.Index(codes, name='classificationCode')
+    return df
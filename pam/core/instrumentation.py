@@ -0,0 +1,156 @@
+# Instrumentation
+# Timing events from the hot paths - requests, JSON decoding and section materialization - delivered to registered callbacks.
+
+from collections import deque
+import contextlib
+import threading
+import time
+
+# Event kinds
+REQUEST = 'request'         # one API call through the scheduler, retries included - name is the endpoint
+DECODE = 'decode'           # JSON decoding of a response body - name is the endpoint
+SECTION = 'section'         # one frame of a container built - name is 'Container.section'
+STREAM = 'stream'           # a response parsed incrementally by Container.from_stream() - name is the container
+
+# Registered callbacks.  The hot paths only test this list, so instrumentation costs nothing while it is empty.
+_callbacks = []
+_lock = threading.Lock()
+
+class Event:
+    """
+    One timed operation.
+
+    Attributes:
+        kind — REQUEST, DECODE, SECTION or STREAM.
+        name — Endpoint, or container and section.
+        seconds — Duration.
+        bytes — Size of the response body, when known.
+        rows — Rows of the frame built, for SECTION events.
+        retries — Retries before the final response, for REQUEST events.
+        status_code — HTTP status of the final response, for REQUEST events.
+        error — Error message of a failed operation, else None.
+        timestamp — Time the operation ended (time.time()).
+    """
+
+    __slots__ = ('kind', 'name', 'seconds', 'bytes', 'rows', 'retries', 'status_code', 'error', 'timestamp')
+
+    def __init__(self, kind, name, seconds, bytes=None, rows=None, retries=None, status_code=None, error=None):
+        self.kind = kind
+        self.name = name
+        self.seconds = seconds
+        self.bytes = bytes
+        self.rows = rows
+        self.retries = retries
+        self.status_code = status_code
+        self.error = error
+        self.timestamp = time.time()
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__ if getattr(self, name) is not None)
+        return f'Event({fields})'
+
+def enabled():
+    """True when at least one callback is registered."""
+    return bool(_callbacks)
+
+def subscribe(callback):
+    """Register a callback receiving every Event.  Returns the callback."""
+    with _lock:
+        _callbacks.append(callback)
+    return callback
+
+def unsubscribe(callback):
+    """Remove a registered callback."""
+    with _lock:
+        if callback in _callbacks:
+            _callbacks.remove(callback)
+
+def emit(kind, name, seconds, **fields):
+    """Deliver an event to the registered callbacks.  A failing callback never fails the API call."""
+    if not _callbacks:
+        return
+
+    event = Event(kind, name, seconds, **fields)
+    for callback in list(_callbacks):
+        try:
+            callback(event)
+        except Exception:
+            pass
+
+class Aggregator:
+    """
+    In-memory collector of events, summarized by kind and name with latency percentiles.  Subscribe an
+    instance, or use collect().
+
+    Args:
+        max_samples — Durations kept per (kind, name) for the percentiles - the most recent ones.
+    """
+
+    def __init__(self, max_samples=100000):
+        self.max_samples = max_samples
+        self.__stats = {}           # (kind, name) -> dict of counters and recent durations
+        self.__lock = threading.Lock()
+
+    def __call__(self, event):
+        with self.__lock:
+            stats = self.__stats.get((event.kind, event.name))
+            if stats is None:
+                stats = self.__stats[(event.kind, event.name)] = {
+                    'count': 0, 'errors': 0, 'seconds': 0.0, 'bytes': 0, 'rows': 0, 'retries': 0,
+                    'samples': deque(maxlen=self.max_samples)
+                }
+
+            stats['count'] += 1
+            stats['seconds'] += event.seconds
+            stats['samples'].append(event.seconds)
+            stats['errors'] += event.error is not None
+            stats['bytes'] += event.bytes or 0
+            stats['rows'] += event.rows or 0
+            stats['retries'] += event.retries or 0
+
+    def summary(self, percentiles=(50, 90, 99)):
+        """
+        Summary of the events collected.
+
+        Returns:
+            pd.DataFrame — indexed by (kind, name): count, errors, total and mean seconds, the requested
+                           percentiles and max (seconds), total bytes, rows and retries
+        """
+        import numpy as np
+        import pandas as pd
+
+        with self.__lock:
+            items = [(key, dict(stats, samples=list(stats['samples']))) for key, stats in self.__stats.items()]
+
+        rows = []
+        for (kind, name), stats in sorted(items):
+            samples = np.asarray(stats['samples'])
+            row = {'kind': kind, 'name': name, 'count': stats['count'], 'errors': stats['errors'],
+                   'total': stats['seconds'], 'mean': stats['seconds'] / stats['count']}
+            row.update({f'p{p:g}': np.percentile(samples, p) for p in percentiles})
+            row.update({'max': samples.max(), 'bytes': stats['bytes'], 'rows': stats['rows'], 'retries': stats['retries']})
+            rows.append(row)
+
+        columns = ['kind', 'name', 'count', 'errors', 'total', 'mean'] + [f'p{p:g}' for p in percentiles] + ['max', 'bytes', 'rows', 'retries']
+        return pd.DataFrame(rows, columns=columns).set_index(['kind', 'name'])
+
+    def reset(self):
+        with self.__lock:
+            self.__stats.clear()
+
+@contextlib.contextmanager
+def collect(aggregator=None):
+    """
+    Collect the events of a block of code.
+
+    Example:
+        with instrumentation.collect() as stats:
+            get_holdings_statements_many(ids, request)
+        print(stats.summary())
+    """
+    aggregator = aggregator if aggregator is not None else Aggregator()
+    subscribe(aggregator)
+    try:
+        yield aggregator
+    finally:
+        unsubscribe(aggregator)
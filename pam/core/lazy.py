@@ -0,0 +1,66 @@
+# Lazy imports
+# Deferred loading of heavy dependencies and of package members, so that importing pam costs next to nothing
+# and a single operation only loads what it uses.
+
+import importlib
+import sys
+
+class LazyModule:
+    """
+    Stand-in for a module, imported on first attribute access.
+
+    Example:
+        pd = LazyModule('pandas')       # nothing imported yet
+        pd.DataFrame()                  # pandas imported here
+    """
+
+    __slots__ = ('_name', '_module')
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attribute):
+        # Racing first uses are fine - the import system hands every thread the same module
+        module = self._module
+        if module is None:
+            module = self._module = importlib.import_module(self._name)
+        return getattr(module, attribute)
+
+    def __repr__(self):
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f"<LazyModule '{self._name}' ({state})>"
+
+def lazy_members(package, members):
+    """
+    Module __getattr__ and __dir__ (PEP 562) for a package whose members are imported on first access.
+    Use in the package's __init__:
+
+        __getattr__, __dir__ = lazy_members(__name__, {'search': '.search', 'storage': ('.storage', None)})
+
+    Args:
+        package — Name of the package, i.e. __name__.
+        members — Mapping of member name -> relative module defining it, or (relative module, attribute)
+                  where attribute None means the module itself.
+
+    Returns:
+        (__getattr__, __dir__)
+    """
+
+    def __getattr__(name):
+        target = members.get(name)
+        if target is None:
+            raise AttributeError(f"module '{package}' has no attribute '{name}'")
+
+        module_name, attribute = target if isinstance(target, tuple) else (target, name)
+        module = importlib.import_module(module_name, package)
+        value = module if attribute is None else getattr(module, attribute)
+
+        # Bind the member on the package so later lookups don't come back here
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(sys.modules[package])) | set(members))
+
+    return __getattr__, __dir__
@@ -0,0 +1,167 @@
+# Payloads
+# Helpers for combining the raw JSON responses of several PAM API requests.
+
+import time
+
+from .scheduler import get_scheduler
+
+def merge_payloads(payloads, tags=None, tag_field='portfolioId'):
+    """
+    Merge raw JSON responses into a single response.  List sections are concatenated in order,
+    any other section keeps the first value seen.
+
+    Args:
+        payloads — List of raw response dictionaries.
+        tags — Optional list of values (one per payload) stamped onto each record of the list sections, e.g. portfolio IDs.
+        tag_field — Name of the field holding the tag. Records already carrying the field are left untouched.
+
+    Returns:
+        dict
+    """
+
+    merged = {}
+    if tags is None:
+        tags = [None] * len(payloads)
+
+    for payload, tag in zip(payloads, tags):
+        for key, value in payload.items():
+            if isinstance(value, list):
+                if tag is not None:
+                    value = [{tag_field: tag, **record} if isinstance(record, dict) else record for record in value]
+                merged.setdefault(key, []).extend(value)
+            else:
+                merged.setdefault(key, value)
+
+    return merged
+
+# Section reporting the outcome of each portfolio of a multi-portfolio request
+BULK_STATUSES = 'bulkStatuses'
+
+# Fields of a 'bulkStatuses' record: the portfolio ID, flags / status values marking a failure, and error details
+BULK_ID_FIELDS = ('portfolioId', 'id')
+BULK_SUCCESS_FIELDS = ('isSuccess', 'success')
+BULK_STATUS_FIELDS = ('status', 'statusCode')
+BULK_FAILED_STATUSES = ('failed', 'failure', 'error', 'partialsuccess', 'partiallysucceeded')
+BULK_ERROR_FIELDS = ('error', 'errors', 'errorCode', 'errorMessage')
+
+# Rounds of re-requesting failed portfolios
+BULK_RETRIES = 3
+
+def failed_ids(payload):
+    """
+    IDs of the portfolios reported as failed in the 'bulkStatuses' section of a raw response, in order.
+
+    Args:
+        payload — Raw response dictionary.
+
+    Returns:
+        list
+    """
+
+    ids = []
+    for record in payload.get(BULK_STATUSES) or []:
+        if not isinstance(record, dict) or not _is_failure(record):
+            continue
+        id = _record_id(record, BULK_ID_FIELDS)
+        if id is not None and id not in ids:
+            ids.append(id)
+
+    return ids
+
+def merge_recovered(payload, recovered, ids, id_field=None):
+    """
+    Merge the response of re-requested portfolios into the original response.  Only the IDs that come back
+    in the recovered response are replaced - their original 'bulkStatuses' and records are dropped in favour
+    of the recovered ones.  IDs the re-request returned nothing for keep their original status and records.
+
+    Args:
+        payload — Original raw response.
+        recovered — Raw response of the re-request.
+        ids — IDs re-requested.
+        id_field — Field holding the portfolio ID of the records: a name, a dotted path into nested records
+                   such as 'portfolioHeader.portfolioId', or a mapping of section name to either.  Records
+                   of sections without one are appended.  'bulkStatuses' are always matched on BULK_ID_FIELDS.
+
+    Returns:
+        dict
+    """
+
+    # IDs the re-request actually returned something for
+    returned = set()
+    for key, value in recovered.items():
+        extract = _section_id(key, id_field)
+        if isinstance(value, list) and extract is not None:
+            returned.update(extract(record) for record in value if isinstance(record, dict))
+    returned &= set(ids)
+
+    kept = {}
+    for key, value in payload.items():
+        extract = _section_id(key, id_field)
+        if isinstance(value, list) and extract is not None and returned:
+            value = [record for record in value if not (isinstance(record, dict) and extract(record) in returned)]
+        kept[key] = value
+
+    return merge_payloads([kept, recovered])
+
+def retry_failed(payload, fetch, retries=BULK_RETRIES, id_field=None):
+    """
+    Re-request only the portfolios reported as failed in 'bulkStatuses', with jittered exponential
+    backoff between rounds, and merge what is recovered into the response.
+
+    Args:
+        payload — Raw response.
+        fetch — Function (ids) -> raw response for those portfolio IDs.
+        retries — Maximum rounds of re-requests.
+        id_field — As for merge_recovered().
+
+    Returns:
+        dict — the response, with any portfolios still failing reported in 'bulkStatuses'
+    """
+
+    for attempt in range(retries):
+        ids = failed_ids(payload)
+        if not ids:
+            break
+
+        time.sleep(get_scheduler().backoff(attempt))
+        try:
+            recovered = fetch(ids)
+        except RuntimeError:
+            continue
+        payload = merge_recovered(payload, recovered, ids, id_field)
+
+    return payload
+
+def _is_failure(record):
+    for field in BULK_SUCCESS_FIELDS:
+        if field in record:
+            return not record[field]
+    for field in BULK_STATUS_FIELDS:
+        status = record.get(field)
+        if isinstance(status, str) and status.replace(' ', '').lower() in BULK_FAILED_STATUSES:
+            return True
+        if isinstance(status, int) and status >= 400:
+            return True
+    return any(record.get(field) for field in BULK_ERROR_FIELDS)
+
+def _record_id(record, fields):
+    return next((record[field] for field in fields if record.get(field) is not None), None)
+
+def _section_id(section, id_field):
+    # Function (record) -> portfolio ID for the records of a section, or None when they can't be attributed
+    if section == BULK_STATUSES:
+        return lambda record: _record_id(record, BULK_ID_FIELDS)
+    if isinstance(id_field, dict):
+        id_field = id_field.get(section)
+    if id_field is None:
+        return None
+
+    path = id_field.split('.')
+    def extract(record):
+        for key in path:
+            if not isinstance(record, dict):
+                return None
+            record = record.get(key)
+        return record
+
+    return extract
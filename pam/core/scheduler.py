@@ -0,0 +1,302 @@
+# Request scheduler
+# Process-wide gate for every API request - a token bucket per endpoint, Retry-After handling and jittered exponential backoff.
+
+import random
+import sys
+import threading
+import time
+import urllib.error
+
+from . import instrumentation
+from .transport import default_transport
+
+# Transport failures worth retrying.  The errors of 'httpx', the HTTP client underneath refinitiv-data, are
+# added by _transient_errors() once something else imported it - it is never imported just for this.
+TRANSIENT_ERRORS = (ConnectionError, TimeoutError, urllib.error.URLError)
+
+# Default request rate of an endpoint (requests per second) and burst size.  PAM publishes no client-side
+# quota, so requests are not limited by default - the server's 429 responses and their Retry-After delays
+# pace them instead.  Set a rate with configure() / Scheduler.limit() to stay under a known quota.
+DEFAULT_RATE = None
+DEFAULT_BURST = 10
+
+# Retries of a throttled or failed request, with delays growing from BACKOFF_BASE up to BACKOFF_MAX seconds
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+
+# HTTP status codes of responses worth retrying - throttling and transient gateway errors
+THROTTLE_STATUSES = {429, 503}
+RETRY_STATUSES = THROTTLE_STATUSES | {502, 504}
+
+class RequestError(RuntimeError):
+    """
+    A failed API request.  A RuntimeError, as raised by the API operations before.
+
+    Attributes:
+        status_code — HTTP status code, or None when no response was received.
+        reason — HTTP reason phrase.
+        text — Response body.
+        url — Endpoint of the request.
+        retries — Retries made before giving up.
+    """
+
+    def __init__(self, message, status_code=None, reason=None, text=None, url=None):
+        super().__init__(f"An error occurred: {message}")
+        self.status_code = status_code
+        self.reason = reason
+        self.text = text
+        self.url = url
+        self.retries = 0
+
+class ThrottledError(RequestError):
+    """A request still throttled (HTTP 429 / 503) once retries ran out.  'retry_after' holds the last delay asked for, in seconds."""
+
+    def __init__(self, message, retry_after=None, **kwargs):
+        super().__init__(message, **kwargs)
+        self.retry_after = retry_after
+
+class TokenBucket:
+    """
+    Thread-safe token bucket - 'rate' tokens per second, up to 'burst' saved up.  acquire() blocks
+    until a token is available, and hold() stops handing out tokens until a given time.  With 'rate'
+    None tokens are unlimited, and only hold() blocks.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST):
+        self.rate = rate
+        self.burst = burst
+        self.__tokens = float(burst) if rate is not None else 0.0
+        self.__updated = time.monotonic()
+        self.__hold_until = 0.0
+        self.__lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.__lock:
+                now = time.monotonic()
+                if self.rate is None:
+                    if now >= self.__hold_until:
+                        return
+                    wait = self.__hold_until - now
+                else:
+                    self.__tokens = min(self.burst, self.__tokens + (now - self.__updated) * self.rate)
+                    self.__updated = now
+
+                    if now >= self.__hold_until and self.__tokens >= 1:
+                        self.__tokens -= 1
+                        return
+
+                    wait = max(self.__hold_until - now, (1 - self.__tokens) / self.rate)
+
+            time.sleep(wait)
+
+    def hold(self, seconds):
+        """Hand out no tokens for the next 'seconds', e.g. when the server asks to retry later."""
+        with self.__lock:
+            self.__hold_until = max(self.__hold_until, time.monotonic() + seconds)
+            self.__tokens = 0.0
+
+class Scheduler:
+    """
+    Sends API requests through a token bucket per endpoint, retrying throttled and transiently failed
+    requests with jittered exponential backoff.  A Retry-After header holds back every request to that
+    endpoint, not only the one retried.
+
+    Args:
+        rate — Default requests per second of an endpoint. Defaults to None, no client-side limit.
+        burst — Default burst size of an endpoint.
+        max_retries — Retries of a request before giving up.
+        backoff_base — First backoff delay, in seconds, doubled on each retry.
+        backoff_max — Longest backoff delay, in seconds.
+        transport — Transport sending the requests. Defaults to pam.core.transport.default_transport().
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, max_retries=MAX_RETRIES,
+                 backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX, transport=None):
+        self.transport = transport if transport is not None else default_transport()
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.__limits = {}          # url -> (rate, burst) set by limit()
+        self.__buckets = {}
+        self.__lock = threading.Lock()
+
+    def limit(self, url, rate=None, burst=None):
+        """Set the rate and burst size of one endpoint, overriding the defaults."""
+        with self.__lock:
+            rate = rate if rate is not None else self.__limits.get(url, (self.rate, self.burst))[0]
+            burst = burst if burst is not None else self.__limits.get(url, (self.rate, self.burst))[1]
+            self.__limits[url] = (rate, burst)
+            self.__buckets.pop(url, None)
+
+    def reset(self):
+        """Drop the endpoint buckets, so changed defaults apply from the next request."""
+        with self.__lock:
+            self.__buckets.clear()
+
+    def bucket(self, url) -> TokenBucket:
+        """Token bucket of an endpoint, keyed by its URL template."""
+        with self.__lock:
+            bucket = self.__buckets.get(url)
+            if bucket is None:
+                bucket = self.__buckets[url] = TokenBucket(*self.__limits.get(url, (self.rate, self.burst)))
+            return bucket
+
+    def request(self, url, method=None, path_parameters=None, query_parameters=None, body_parameters=None, stream=False):
+        """
+        Send a request, waiting for the endpoint's rate limit and retrying throttled or transient failures.
+
+        Args:
+            url — Endpoint URL, possibly a template filled from 'path_parameters'.
+            method — HTTP method name, e.g. 'POST'. Defaults to GET.
+            path_parameters, query_parameters, body_parameters — Parameters of the request.
+            stream — Ask the transport for the successful response with its body unread (see Transport).
+
+        Returns:
+            The successful response.
+
+        Raises:
+            ThrottledError — Still throttled once retries ran out.
+            RequestError — Any other failed request.
+        """
+
+        method = method or 'GET'
+        if not instrumentation.enabled():
+            return self.__send(url, method, path_parameters, query_parameters, body_parameters, stream)[0]
+
+        # Latency covers rate limiting and retries - the time the caller waited
+        start = time.perf_counter()
+        try:
+            response, retries = self.__send(url, method, path_parameters, query_parameters, body_parameters, stream)
+        except RequestError as e:
+            instrumentation.emit(instrumentation.REQUEST, url, time.perf_counter() - start, retries=e.retries,
+                                 status_code=e.status_code, error=str(e))
+            raise
+
+        # The size of a streamed body is unknown until it is read
+        content = getattr(response.raw, 'content', None) if getattr(response, 'stream', None) is None else None
+        instrumentation.emit(instrumentation.REQUEST, url, time.perf_counter() - start, bytes=len(content) if content is not None else None,
+                             retries=retries, status_code=getattr(response.raw, 'status_code', None))
+        return response
+
+    def backoff(self, attempt):
+        """Jittered ("full jitter") exponential backoff delay of a retry, in seconds."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def __send(self, url, method, path_parameters, query_parameters, body_parameters, stream):
+        # The successful response and the number of retries it took
+        bucket = self.bucket(url)
+        options = {'stream': True} if stream else {}
+        attempt = 0
+        while True:
+            bucket.acquire()
+            try:
+                response = self.transport.send(url, method, path_parameters, query_parameters, body_parameters, **options)
+            except _transient_errors() as e:
+                if attempt >= self.max_retries:
+                    raise _retried(RequestError(str(e), url=url), attempt) from None
+                time.sleep(self.backoff(attempt))
+                attempt += 1
+                continue
+            except Exception as e:
+                raise _retried(RequestError(str(e), url=url), attempt) from None
+
+            if response.is_success:
+                return response, attempt
+
+            raw = response.raw
+            status = getattr(raw, 'status_code', None)
+            if status not in RETRY_STATUSES or attempt >= self.max_retries:
+                raise _retried(_error(response, url), attempt)
+
+            # Honour the server's delay for the whole endpoint, never retrying sooner than the backoff
+            delay = self.backoff(attempt)
+            retry_after = _retry_after(raw)
+            if retry_after is not None:
+                bucket.hold(retry_after)
+                delay = max(delay, retry_after)
+
+            time.sleep(delay)
+            attempt += 1
+
+def _transient_errors():
+    # An httpx error can only be raised once httpx is loaded
+    httpx = sys.modules.get('httpx')
+    if httpx is None:
+        return TRANSIENT_ERRORS
+    return TRANSIENT_ERRORS + (httpx.TransportError,)
+
+def _retried(error, retries):
+    error.retries = retries
+    return error
+
+def _error(response, url):
+    raw = response.raw
+    status, reason, text = getattr(raw, 'status_code', None), getattr(raw, 'reason_phrase', None), getattr(raw, 'text', None)
+    message = f"HTTP Error. Code: {status}. Reason: {reason}\n[{text}"
+    if status in THROTTLE_STATUSES:
+        return ThrottledError(message, _retry_after(raw), status_code=status, reason=reason, text=text, url=url)
+    return RequestError(message, status_code=status, reason=reason, text=text, url=url)
+
+def _retry_after(raw):
+    # Retry-After as seconds to wait - either a number of seconds or an HTTP date
+    headers = getattr(raw, 'headers', None)
+    value = headers.get('Retry-After') if headers is not None else None
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    from email.utils import parsedate_to_datetime
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+# Process-wide scheduler shared by the API operations
+_scheduler = Scheduler()
+
+def get_scheduler() -> Scheduler:
+    """Return the process-wide request scheduler."""
+    return _scheduler
+
+def configure(rate=None, burst=None, max_retries=None, backoff_base=None, backoff_max=None, limits=None, transport=None):
+    """
+    Configure the process-wide request scheduler.
+
+    Args:
+        rate (float, optional): Default requests per second of an endpoint. Not limited unless set.
+        burst (int, optional): Default burst size of an endpoint.
+        max_retries (int, optional): Retries of a throttled or failed request.
+        backoff_base (float, optional): First backoff delay, in seconds.
+        backoff_max (float, optional): Longest backoff delay, in seconds.
+        limits (dict, optional): Mapping of endpoint URL to requests per second, overriding 'rate'.
+        transport (Transport, optional): Transport sending the requests, e.g. pam.core.transport.HttpTransport(url).
+    """
+    if transport is not None:
+        _scheduler.transport = transport
+    if rate is not None:
+        _scheduler.rate = rate
+    if burst is not None:
+        _scheduler.burst = burst
+    if max_retries is not None:
+        _scheduler.max_retries = max_retries
+    if backoff_base is not None:
+        _scheduler.backoff_base = backoff_base
+    if backoff_max is not None:
+        _scheduler.backoff_max = backoff_max
+    if rate is not None or burst is not None:
+        _scheduler.reset()
+    for url, url_rate in (limits or {}).items():
+        _scheduler.limit(url, url_rate)
+
+def request(url, method=None, path_parameters=None, query_parameters=None, body_parameters=None, stream=False):
+    """Send a request through the process-wide scheduler - see Scheduler.request()."""
+    return _scheduler.request(url, method, path_parameters, query_parameters, body_parameters, stream)
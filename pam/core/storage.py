@@ -0,0 +1,128 @@
+# Storage
+# Columnar persistence of result containers - one Arrow IPC (or Parquet) file per frame, described by a small manifest.
+
+import functools
+import json
+import os
+
+# Persistence requires the optional 'pyarrow' package, imported by the first save() or load()
+pa = pq = None
+
+MANIFEST = 'manifest.json'
+MANIFEST_VERSION = 1
+
+# File extension of each supported format
+FORMATS = {'arrow': '.arrow', 'parquet': '.parquet'}
+
+def save(container, path, format='arrow'):
+    """
+    Write every frame of a container to a directory, alongside a manifest describing them.
+
+    Args:
+        container — Result container, e.g. Holdings or Performance.
+        path — Target directory, created if needed.
+        format — 'arrow' (uncompressed Arrow IPC, memory-mapped on reload) or 'parquet' (compressed).
+    """
+
+    _require_pyarrow()
+    if format not in FORMATS:
+        raise ValueError(f"Unknown format '{format}'. Expected one of: {', '.join(FORMATS)}")
+
+    os.makedirs(path, exist_ok=True)
+    container.materialize_all()
+
+    frames = {}
+    for name in container._sections:
+        frame = container._get(name)
+        filename = name + FORMATS[format]
+        json_columns = _write_frame(frame, os.path.join(path, filename), format)
+        frames[name] = {'file': filename, 'rows': len(frame), 'json_columns': json_columns}
+
+    # Raw values not turned into frames (e.g. top-level scalars) are kept in the manifest
+    sources = container._sources()
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'container': type(container).__name__,
+        'format': format,
+        'frames': frames,
+        'data': {key: value for key, value in container.data.items() if key not in sources},
+        'attributes': container._attributes()
+    }
+
+    # Written last - a directory with a manifest is complete
+    with open(os.path.join(path, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2, default=str)
+
+def load(cls, path):
+    """
+    Reopen a container written by save().  Frames are read lazily, on first access - Arrow files are
+    memory-mapped so only the sections touched are read.
+
+    Args:
+        cls — Container class, e.g. Holdings.
+        path — Directory written by save().
+    """
+
+    _require_pyarrow()
+    with open(os.path.join(path, MANIFEST)) as f:
+        manifest = json.load(f)
+
+    if manifest['container'] != cls.__name__:
+        raise ValueError(f"'{path}' holds a {manifest['container']} result, not {cls.__name__}")
+
+    container = cls(manifest['data'], **manifest['attributes'])
+    container._loaders = {
+        name: functools.partial(_read_frame, os.path.join(path, entry['file']), manifest['format'], entry['json_columns'])
+        for name, entry in manifest['frames'].items() if name in cls._sections
+    }
+    return container
+
+def _write_frame(frame, filename, format):
+    try:
+        table = pa.Table.from_pandas(frame, preserve_index=True)
+        json_columns = []
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        # Nested values Arrow can't type consistently are stored as JSON text
+        json_columns = [column for column in frame.columns if frame[column].dtype == object
+                        and frame[column].map(lambda v: isinstance(v, (dict, list))).any()]
+        frame = frame.assign(**{column: frame[column].map(_to_json) for column in json_columns})
+        table = pa.Table.from_pandas(frame, preserve_index=True)
+
+    if format == 'parquet':
+        pq.write_table(table, filename)
+    else:
+        with pa.OSFile(filename, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    return json_columns
+
+def _read_frame(filename, format, json_columns):
+    if format == 'parquet':
+        table = pq.read_table(filename, memory_map=True)
+    else:
+        with pa.memory_map(filename, 'r') as source:
+            table = pa.ipc.open_file(source).read_all()
+
+    frame = table.to_pandas()
+    for column in json_columns:
+        frame[column] = frame[column].map(lambda v: json.loads(v) if isinstance(v, str) else v)
+
+    return frame
+
+def _to_json(value):
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    return json.dumps(value, default=str)
+
+def _require_pyarrow():
+    global pa, pq
+    if pa is not None:
+        return
+
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Saving and loading results requires the 'pyarrow' package: pip install pyarrow") from None
+    pa, pq = pyarrow, pyarrow.parquet
@@ -0,0 +1,209 @@
+# Streaming
+# Incremental parsing of large JSON responses - list sections are turned into DataFrames in fixed-size record batches.
+
+import io
+import json
+
+from .lazy import LazyModule
+
+pd = LazyModule('pandas')
+
+# Incremental parsing requires the optional 'ijson' package, imported by the first parse.  Without it, the
+# body is decoded in one go and each section is still converted in batches.
+_ijson = None               # the module once imported, False when not installed
+
+# Number of records held as dictionaries before they are converted to a DataFrame - together with the
+# parser's read buffer, this bounds what is held of a section besides its frames
+DEFAULT_BATCH_SIZE = 2000
+
+def parse_sections(source, processors, batch_size=DEFAULT_BATCH_SIZE, skip=()):
+    """
+    Parse a JSON object incrementally, building a DataFrame for each list section as its records arrive.
+
+    Args:
+        source — bytes, a binary file-like object or an iterable of byte chunks.
+        processors — Mapping of section name to processing function (list of records -> DataFrame).
+        batch_size — Number of records converted at a time.
+        skip — Top-level keys to discard without building them.
+
+    Returns:
+        (dict of section name -> pd.DataFrame, dict of the remaining top-level values)
+    """
+
+    ijson = _import_ijson()
+    if ijson is None:
+        return _parse_buffered(source, processors, batch_size, skip)
+
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    elif not hasattr(source, 'read'):
+        source = _ChunkReader(source)
+
+    frames, rest = {}, {}
+    batches = None              # batches of the list section being parsed
+    builder, depth = None, 0    # builder of the value being assembled, with its nesting depth
+    target = None               # top-level key the assembled value belongs to, or None for a record
+
+    for prefix, event, value in ijson.parse(source, use_float=True):
+        # Skipped sections are parsed over but never built
+        if skip and prefix.partition('.')[0] in skip:
+            continue
+
+        # Assemble the current record / value
+        if builder is not None:
+            builder.event(event, value)
+            if event in ('start_map', 'start_array'):
+                depth += 1
+            elif event in ('end_map', 'end_array'):
+                depth -= 1
+
+            if depth == 0:
+                if target is None:
+                    batches.add(builder.value)
+                else:
+                    rest[target] = builder.value
+                builder = None
+            continue
+
+        # Root object and its keys
+        if prefix == '':
+            continue
+
+        # Top-level value
+        if '.' not in prefix:
+            if event == 'start_array' and prefix in processors:
+                batches = _Batches(processors[prefix], batch_size)
+            elif event == 'end_array' and batches is not None:
+                frames[prefix] = batches.result()
+                batches = None
+            elif event in ('start_map', 'start_array'):
+                builder, depth, target = ijson.ObjectBuilder(), 1, prefix
+                builder.event(event, value)
+            else:
+                rest[prefix] = value
+            continue
+
+        # Record within the list section being parsed
+        if batches is not None:
+            if event in ('start_map', 'start_array'):
+                builder, depth, target = ijson.ObjectBuilder(), 1, None
+                builder.event(event, value)
+            else:
+                batches.add(value)
+
+    return frames, rest
+
+def _import_ijson():
+    global _ijson
+    if _ijson is None:
+        try:
+            import ijson
+            _ijson = ijson
+        except ImportError:
+            _ijson = False
+    return _ijson or None
+
+def _parse_buffered(source, processors, batch_size, skip):
+    # Fallback without 'ijson' - decode everything, then convert and release one section at a time
+    if hasattr(source, 'read'):
+        source = source.read()
+    elif not isinstance(source, (bytes, bytearray, str)):
+        source = b''.join(source)
+
+    rest = json.loads(source)
+    for key in skip:
+        rest.pop(key, None)
+
+    frames = {}
+    for section, process in processors.items():
+        records = rest.pop(section, None)
+        if isinstance(records, list):
+            batches = _Batches(process, batch_size)
+            for i in range(0, len(records), batch_size):
+                batches.add_all(records[i:i + batch_size])
+            del records
+            frames[section] = batches.result()
+        elif records is not None:
+            rest[section] = records
+
+    return frames, rest
+
+def tee_reader(source, chunks):
+    """
+    Binary file-like view of 'source' appending every chunk read to the list 'chunks' - e.g. to cache the
+    raw body of a response while it is parsed.
+    """
+    return _TeeReader(source, chunks)
+
+class _Batches:
+    # Collects records and converts them batch by batch
+    def __init__(self, process, batch_size):
+        self.process = process
+        self.batch_size = batch_size
+        self.records = []
+        self.frames = []
+
+    def add(self, record):
+        self.records.append(record)
+        if len(self.records) >= self.batch_size:
+            self.flush()
+
+    def add_all(self, records):
+        self.records.extend(records)
+        self.flush()
+
+    def flush(self):
+        if self.records:
+            self.frames.append(self.process(self.records))
+            self.records = []
+
+    def result(self):
+        self.flush()
+        if not self.frames:
+            return self.process([])
+        if len(self.frames) == 1:
+            return self.frames[0]
+
+        # Record frames carry a default index which is renumbered, keyed frames (e.g. classifications) keep theirs
+        return pd.concat(self.frames, ignore_index=isinstance(self.frames[0].index, pd.RangeIndex))
+
+class _ChunkReader(io.RawIOBase):
+    # File-like view over an iterable of byte chunks
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.buffer = b''
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self.buffer:
+            try:
+                self.buffer = next(self.chunks)
+            except StopIteration:
+                return 0
+
+        n = min(len(b), len(self.buffer))
+        b[:n] = self.buffer[:n]
+        self.buffer = self.buffer[n:]
+        return n
+
+class _TeeReader(io.RawIOBase):
+    # File-like view over another, keeping a copy of what is read
+    def __init__(self, source, chunks):
+        self.source = source
+        self.chunks = chunks
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        chunk = self.source.read(size)
+        if chunk:
+            self.chunks.append(chunk)
+        return chunk
+
+    def readinto(self, b):
+        chunk = self.read(len(b))
+        b[:len(chunk)] = chunk
+        return len(chunk)
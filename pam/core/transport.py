@@ -0,0 +1,188 @@
+# Transport
+# How requests reach the PAM API - through the Refinitiv Data Library session, or over plain HTTP (e.g. to the local stand-in server).
+
+import abc
+import json
+import os
+import time
+import urllib.error
+import urllib.parse
+
+from . import instrumentation
+
+# Root of the endpoint URLs, replaced by the base URL of an HttpTransport
+API_ROOT = 'https://api.refinitiv.com'
+
+# Environment variable naming a base URL - when set, requests go over plain HTTP instead of the Refinitiv session
+BASE_URL_ENV = 'PAM_BASE_URL'
+
+# Seconds to wait for an HTTP response
+DEFAULT_TIMEOUT = 60.0
+
+class Transport(abc.ABC):
+    """
+    Sends one request and returns the response.  Responses expose the surface of the Refinitiv Data
+    Library's: 'is_success', 'raw' (status_code, reason_phrase, text, headers, content) and 'data.raw'
+    (the decoded JSON body).
+
+    With 'stream', a transport able to do so hands back a successful response with its body unread - a binary
+    file-like object in 'stream', released by close().  Other transports return the usual decoded response.
+    """
+
+    @abc.abstractmethod
+    def send(self, url, method='GET', path_parameters=None, query_parameters=None, body_parameters=None, stream=False):
+        """Send one request and return its response."""
+
+class RefinitivTransport(Transport):
+    """Requests sent through the Refinitiv Data Library's default session.  The session decodes every body, so nothing is streamed."""
+
+    def send(self, url, method='GET', path_parameters=None, query_parameters=None, body_parameters=None, stream=False):
+        from refinitiv.data.delivery import endpoint_request
+
+        kwargs = {'url': url, 'method': endpoint_request.RequestMethod[method]}
+        if path_parameters is not None:
+            kwargs['path_parameters'] = path_parameters
+        if query_parameters is not None:
+            kwargs['query_parameters'] = query_parameters
+        if body_parameters is not None:
+            kwargs['body_parameters'] = body_parameters
+
+        return endpoint_request.Definition(**kwargs).get_data()
+
+class HttpTransport(Transport):
+    """
+    Requests sent over plain HTTP, with API_ROOT of the endpoint URLs replaced by 'base_url' - e.g. the
+    local stand-in server of pam.standin.  Uses the standard library only.
+
+    Args:
+        base_url — Base URL, e.g. 'http://127.0.0.1:8080'.
+        timeout — Seconds to wait for a response. Defaults to DEFAULT_TIMEOUT.
+        headers — Optional extra request headers, e.g. authorization.
+
+    Streamed responses are read straight from the connection, which stays open until the body is read or closed.
+    """
+
+    def __init__(self, base_url, timeout=DEFAULT_TIMEOUT, headers=None):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.headers = headers or {}
+
+    def send(self, url, method='GET', path_parameters=None, query_parameters=None, body_parameters=None, stream=False):
+        endpoint = url
+        if path_parameters:
+            url = url.format(**{name: urllib.parse.quote(str(value), safe='') for name, value in path_parameters.items()})
+        if url.startswith(API_ROOT):
+            url = self.base_url + url[len(API_ROOT):]
+        if query_parameters:
+            url += '?' + urllib.parse.urlencode({name: _query_value(value) for name, value in query_parameters.items()})
+
+        headers = {'Accept': 'application/json', **self.headers}
+        body = None
+        if body_parameters is not None:
+            body = json.dumps(body_parameters).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+
+        # Deferred - urllib.request pulls in http.client and ssl
+        from urllib.request import Request, urlopen
+
+        request = Request(url, data=body, headers=headers, method=method)
+        try:
+            response = urlopen(request, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            # Error statuses are responses too - the scheduler decides what to do with them
+            with e:
+                return HttpResponse(e.code, e.reason, e.headers, e.read(), endpoint)
+
+        if stream:
+            return HttpResponse(response.status, response.reason, response.headers, None, endpoint, stream=response)
+        with response:
+            return HttpResponse(response.status, response.reason, response.headers, response.read(), endpoint)
+
+class HttpResponse:
+    """Response of HttpTransport, shaped like a Refinitiv Data Library response."""
+
+    __slots__ = ('raw', 'data')
+
+    def __init__(self, status_code, reason_phrase, headers, content, url=None, stream=None):
+        self.raw = _Raw(status_code, reason_phrase, headers, content, stream)
+        self.data = _Data(self.raw, url)
+
+    @property
+    def is_success(self):
+        return 200 <= self.raw.status_code < 300
+
+    @property
+    def stream(self):
+        """The unread body as a binary file-like object, or None once read (or when not streamed)."""
+        return self.raw._stream
+
+    def close(self):
+        self.raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class _Raw:
+    __slots__ = ('status_code', 'reason_phrase', 'headers', '_content', '_stream')
+
+    def __init__(self, status_code, reason_phrase, headers, content, stream=None):
+        self.status_code = status_code
+        self.reason_phrase = reason_phrase
+        if headers is None:
+            from email.message import Message
+            headers = Message()
+        self.headers = headers
+        self._content = content
+        self._stream = stream
+
+    @property
+    def content(self):
+        # A streamed body is read in full only when asked for
+        if self._content is None and self._stream is not None:
+            with self._stream:
+                self._content = self._stream.read()
+            self._stream = None
+        return self._content
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+class _Data:
+    # The body is only decoded when asked for - streaming callers read the response's 'stream' instead
+    __slots__ = ('_raw_response', '_url', '_decoded')
+
+    def __init__(self, raw_response, url=None):
+        self._raw_response = raw_response
+        self._url = url
+        self._decoded = None
+
+    @property
+    def raw(self):
+        if self._decoded is None:
+            content = self._raw_response.content
+            if not instrumentation.enabled():
+                self._decoded = json.loads(content)
+            else:
+                start = time.perf_counter()
+                self._decoded = json.loads(content)
+                instrumentation.emit(instrumentation.DECODE, self._url, time.perf_counter() - start, bytes=len(content))
+        return self._decoded
+
+def _query_value(value):
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return value
+
+def default_transport() -> Transport:
+    """HttpTransport to the base URL named by the PAM_BASE_URL environment variable if set, else RefinitivTransport."""
+    base_url = os.environ.get(BASE_URL_ENV)
+    return HttpTransport(base_url) if base_url else RefinitivTransport()
@@ -1,6 +1,14 @@
-# Metadata functions
-from .currencies import get_currencies
-from .attributes import get_attributes
-from .identifiers import get_identifiers
-from .columns import get_data_columns
-from .sectors import get_classification_sectors
+# Metadata functions - imported on first access, so that using one operation only loads its own module
+from ..core import lazy_members
+
+_MEMBERS = {
+    'get_currencies': '.currencies',
+    'get_attributes': '.attributes',
+    'get_identifiers': '.identifiers',
+    'get_data_columns': '.columns',
+    'get_classification_sectors': '.sectors',
+    'cache': ('.cache', None)
+}
+
+__all__ = list(_MEMBERS)
+__getattr__, __dir__ = lazy_members(__name__, _MEMBERS)
@@ -1,12 +1,17 @@
 # Attributes metadata
 # Retrieve a list of attributes based on specified criteria.
 
-from refinitiv.data.delivery import endpoint_request
-import pandas as pd
+from __future__ import annotations
+
+from ..core import LazyModule, RequestError, scheduler
+from .cache import cached
+
+pd = LazyModule('pandas')
 
 # static endpoint
 ENDPOINT = 'https://api.refinitiv.com/user-data/portfolio-management/v1/metadata/attributes'
 
+@cached
 def get_attributes(include_portfolio_attributes=None, data_owner_type=None, 
                    attribute_types=None, attribute_data_types=None) -> pd.DataFrame:
     """
@@ -38,21 +43,13 @@ def get_attributes(include_portfolio_attributes=None, data_owner_type=None,
         if isinstance(attribute_data_types, str):
             attribute_data_types = [attribute_data_types]   
         params["attributeDataTypes"] = ",".join(attribute_data_types)
-    
-    # Prepare endpoint definition...
-    definition = endpoint_request.Definition(
-        url = ENDPOINT,
-        query_parameters = params
-    )
-    
-    # Submit request
+
+    # Submit request - rate limited and retried by the scheduler
     try:
-        response = definition.get_data()
-        if response.is_success:
-            return pd.DataFrame.from_records(response.data.raw['attributes'])
-        
-        # Throw an exception
-        raise Exception(f"HTTP Error. Code: {response.raw.status_code}. Reason: {response.raw.reason_phrase}\n[{response.raw.text}")
-        
+        response = scheduler.request(ENDPOINT, query_parameters=params)
+        return pd.DataFrame.from_records(response.data.raw['attributes'])
+
+    except RequestError:
+        raise
     except Exception as e:
         raise RuntimeError(f"An error occurred: {str(e)}") from None
@@ -0,0 +1,229 @@
+# Metadata cache
+# Process-wide cache for metadata lookups with TTL expiry, LRU eviction, shared in-flight requests and an optional on-disk store.
+
+from collections import OrderedDict
+from concurrent.futures import Future
+import functools
+import hashlib
+import inspect
+import json
+import io
+import os
+import tempfile
+import threading
+import time
+
+from ..core import LazyModule
+
+pd = LazyModule('pandas')
+
+# Reference data changes rarely - keep entries for a day by default
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_MAXSIZE = 256
+
+# Environment variable naming a directory for the on-disk store, so new processes start warm
+CACHE_DIR_ENV = 'PAM_METADATA_CACHE_DIR'
+
+# Entries are stored as JSON - a shared directory must never hold anything executed on load (e.g. pickles),
+# and JSON reads back the same under any pandas version
+FILE_SUFFIX = '.json'
+FILE_VERSION = 1
+
+class MetadataCache:
+    def __init__(self, ttl=DEFAULT_TTL, maxsize=DEFAULT_MAXSIZE, path=None, enabled=True):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.path = path
+        self.enabled = enabled
+
+        self.__entries = OrderedDict()      # key -> (fetch time, value), least recently used first
+        self.__pending = {}                 # key -> Future shared by concurrent callers
+        self.__lock = threading.Lock()
+
+    def get_or_fetch(self, key, fetch):
+        """
+        Return the cached value for 'key', calling 'fetch' on a miss.  Concurrent callers of the same
+        key wait on a single fetch.
+        """
+
+        now = time.time()
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and entry[0] + self.ttl > now:
+                self.__entries.move_to_end(key)
+                return entry[1]
+
+            future = self.__pending.get(key)
+            owner = future is None
+            if owner:
+                future = self.__pending[key] = Future()
+
+        if not owner:
+            return future.result()
+
+        try:
+            entry = self.__read(key, now)
+            if entry is None:
+                entry = (now, fetch())
+                self.__write(key, entry)
+
+            with self.__lock:
+                self.__entries[key] = entry
+                self.__entries.move_to_end(key)
+                while len(self.__entries) > self.maxsize:
+                    self.__entries.popitem(last=False)
+
+            future.set_result(entry[1])
+            return entry[1]
+
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+
+        finally:
+            with self.__lock:
+                self.__pending.pop(key, None)
+
+    def clear(self, disk=False):
+        """Drop all in-memory entries and, optionally, the on-disk store."""
+        with self.__lock:
+            self.__entries.clear()
+
+        if disk and self.path and os.path.isdir(self.path):
+            for name in os.listdir(self.path):
+                if name.endswith(FILE_SUFFIX):
+                    os.remove(os.path.join(self.path, name))
+
+    def __filename(self, key):
+        return os.path.join(self.path, hashlib.sha256(key.encode('utf-8')).hexdigest() + FILE_SUFFIX)
+
+    def __read(self, key, now):
+        if not self.path:
+            return None
+
+        filename = self.__filename(key)
+        if not os.path.exists(filename):
+            return None
+
+        # Whatever can't be read back - corrupt, foreign or from an incompatible environment - is a miss
+        try:
+            with open(filename, encoding='utf-8') as f:
+                stored = json.load(f)
+            if stored['version'] != FILE_VERSION or stored['key'] != key:
+                raise ValueError('Not an entry of this key')
+            entry = (float(stored['time']), _frame_from_json(stored['frame'], stored['index']))
+        except Exception:
+            _remove(filename)
+            return None
+
+        return entry if entry[0] + self.ttl > now else None
+
+    def __write(self, key, entry):
+        if not self.path:
+            return
+
+        # Only frames are stored - anything else stays in memory
+        try:
+            frame, index = _frame_to_json(entry[1])
+            text = json.dumps({'version': FILE_VERSION, 'key': key, 'time': entry[0], 'frame': frame, 'index': index})
+        except (AttributeError, TypeError, ValueError):
+            return
+
+        # Write atomically so concurrent processes never read a partial file
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            fd, temp = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(temp, self.__filename(key))
+        except OSError:
+            _remove(temp)
+
+# Process-wide cache shared by the metadata functions
+_cache = MetadataCache(path=os.environ.get(CACHE_DIR_ENV))
+
+def get_cache() -> MetadataCache:
+    """Return the process-wide metadata cache."""
+    return _cache
+
+def configure(ttl=None, maxsize=None, path=None, enabled=None):
+    """
+    Configure the process-wide metadata cache.
+
+    Args:
+        ttl (float, optional): Seconds before an entry expires.
+        maxsize (int, optional): Maximum number of in-memory entries before the least recently used is evicted.
+        path (str, optional): Directory of the on-disk store.  Use '' to disable the store.
+        enabled (bool, optional): Turn caching on or off.
+    """
+    if ttl is not None:
+        _cache.ttl = ttl
+    if maxsize is not None:
+        _cache.maxsize = maxsize
+    if path is not None:
+        _cache.path = path or None
+    if enabled is not None:
+        _cache.enabled = enabled
+
+def clear(disk=False):
+    """Drop all entries of the process-wide metadata cache."""
+    _cache.clear(disk)
+
+def cached(function):
+    """
+    Decorator caching a metadata function in the process-wide cache, keyed by the function and its
+    normalized arguments.  The undecorated function remains available as 'function.uncached'.
+    """
+
+    signature = inspect.signature(function)
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if not _cache.enabled:
+            return function(*args, **kwargs)
+
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = json.dumps([function.__module__, function.__qualname__,
+                          {name: _normalize(value) for name, value in bound.arguments.items()}], sort_keys=True)
+
+        # Hand out copies so callers can't modify the cached frame
+        return _cache.get_or_fetch(key, lambda: function(*args, **kwargs)).copy()
+
+    wrapper.uncached = function
+    return wrapper
+
+def _frame_to_json(frame):
+    # The 'table' orient drops a non-unique index (e.g. repeated classificationCode values), so the index
+    # levels are stored as leading columns and their names alongside
+    if isinstance(frame.index, pd.RangeIndex) and frame.index.name is None and frame.index.start == 0 and frame.index.step == 1:
+        return frame.reset_index(drop=True).to_json(orient='table', index=False, date_format='iso'), []
+
+    names = list(frame.index.names)
+    flat = frame.reset_index()
+    return flat.to_json(orient='table', index=False, date_format='iso'), [names, list(flat.columns[:len(names)])]
+
+def _frame_from_json(text, index):
+    frame = pd.read_json(io.StringIO(text), orient='table')
+    if index:
+        names, columns = index
+        frame = frame.set_index(columns)
+        frame.index.names = names
+    return frame
+
+def _remove(filename):
+    try:
+        os.remove(filename)
+    except OSError:
+        pass
+
+def _normalize(value):
+    # A single string and a one-element list build the same request
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) if not isinstance(v, str) else v for v in value]
+    return value
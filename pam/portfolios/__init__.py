@@ -1,3 +1,14 @@
-# Metadata functions
-from .portfolios import get_portfolios
-from .search import search
+# Metadata functions - imported on first access, so that using one operation only loads its own module
+from ..core import lazy_members
+
+# The search operations are bound eagerly - 'search' being also the name of its module, a direct import of
+# pam.portfolios.search would otherwise shadow the function with the module.  The module is light, pandas is
+# only loaded on use.
+from .search import search, search_iter
+
+_MEMBERS = {
+    'get_portfolios': '.portfolios'
+}
+
+__all__ = ['search', 'search_iter', *_MEMBERS]
+__getattr__, __dir__ = lazy_members(__name__, _MEMBERS)
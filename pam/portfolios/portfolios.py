@@ -1,100 +1,210 @@
 # Portfolios
 # API operation for getting a list of portfolios based on portfolio IDs.
 
-from refinitiv.data.delivery import endpoint_request
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+
+from ..core import Container, LazyModule, RequestError, from_records, merge_payloads, retry_failed, scheduler
+
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
 
 # static endpoint
 ENDPOINT = 'https://api.refinitiv.com/user-data/portfolio-management/v1/portfolios'
 
-class Portfolios:
-    def __init__(self, data):
-        self.__data = data
-        self.__dataframes = {}
+# Bounds on the 'ids' query parameter of a single request.  Larger ID lists are split into chunks.
+MAX_IDS_PER_REQUEST = 100
+MAX_IDS_LENGTH = 2000
 
-        # Dispatch table mapping keys to processing functions
-        self.__dispatch_table = {
-            #'portfolios': self.__process_portfolios,
-            'headers': self.__process_headers,
-            'statements': self.__process_statements,
-            'bulkStatuses': self.__process_bulk_statuses
-        }
+# Portfolio ID column of the statements frame - also its path in the raw 'portfolios' records - and the
+# statement date column the as-of lookups go by
+ID_FIELD = 'portfolioHeader.portfolioId'
+DATE_FIELD = 'holdingsStatementDate'
 
-    @property
-    def data(self):
-        return self.__data
+def _process_headers(data, columns=None):
+    # Extract 'portfolioHeader' details
+    portfolio_headers = [d['portfolioHeader'] for d in data if 'portfolioHeader' in d]
+    
+    # Create DataFrame - the index is always kept
+    if columns is not None and 'portfolioId' not in columns:
+        columns = ['portfolioId'] + columns
+    df = pd.DataFrame.from_records(portfolio_headers, columns=columns)
+
+    # Set 'portfolioId' as the index
+    df.set_index('portfolioId', inplace=True)    
+
+    return df
+
+def _process_statements(data, columns=None):
+    # normalize the 'holdingsStatementHeaders'
+    df_statements = pd.json_normalize(data, record_path=['holdingsStatementHeaders'], meta=[['portfolioHeader', 'portfolioId']])
+    if columns is not None:
+        df_statements = df_statements.reindex(columns=columns)
+
+    return df_statements
+
+class _StatementLookup:
+    # Statements sorted by (portfolio ID, date), with the arrays the as-of lookups binary-search:
+    #   ids - sorted distinct portfolio IDs, bounds - start of each ID's rows (plus the row count),
+    #   dates - statement dates as int64 nanoseconds, keys - (ID rank, date rank) combined into one sorted int64
+    __slots__ = ('frame', 'flat', 'ids', 'bounds', 'dates', 'unique_dates', 'keys')
+
+    def __init__(self, statements, date_field):
+        for field in (ID_FIELD, date_field):
+            if field not in statements.columns:
+                if len(statements):
+                    raise ValueError(f"The statements have no '{field}' column")
+                statements = statements.assign(**{field: pd.Series(dtype=object)})
+
+        dates = pd.to_datetime(statements[date_field], errors='coerce')
+        frame = (statements.assign(**{date_field: dates})
+                           .rename(columns={ID_FIELD: 'portfolioId'})
+                           .dropna(subset=['portfolioId', date_field])
+                           .set_index(['portfolioId', date_field])
+                           .sort_index())
+
+        ids = frame.index.get_level_values(0).to_numpy(dtype=object)
+        self.frame = frame
+        self.flat = frame.reset_index()
+        self.ids, starts = np.unique(ids, return_index=True)
+        self.bounds = np.append(starts, len(ids))
+        self.dates = frame.index.get_level_values(1).to_numpy(dtype='datetime64[ns]').view('int64')
+
+        # A date's rank among the distinct dates keeps the combined key within int64 at any date resolution
+        self.unique_dates = np.unique(self.dates)
+        codes = np.repeat(np.arange(len(self.ids)), np.diff(self.bounds))
+        self.keys = codes * (len(self.unique_dates) + 1) + np.searchsorted(self.unique_dates, self.dates) + 1
+
+    def latest(self, portfolio_id, as_of):
+        # Position of the last statement of one portfolio on or before as_of, or -1
+        i = np.searchsorted(self.ids, portfolio_id)
+        if i == len(self.ids) or self.ids[i] != portfolio_id:
+            return -1
+
+        start, end = self.bounds[i], self.bounds[i + 1]
+        count = np.searchsorted(self.dates[start:end], _nanoseconds(as_of), side='right')
+        return start + count - 1 if count else -1
+
+    def latest_many(self, portfolio_ids, as_of):
+        # Positions of the last statements on or before as_of (one date, or one per ID), -1 where there is none
+        portfolio_ids = np.asarray(portfolio_ids, dtype=object)
+        if len(self.ids) == 0:
+            return np.full(len(portfolio_ids), -1)
+
+        codes = np.minimum(np.searchsorted(self.ids, portfolio_ids), len(self.ids) - 1)
+        known = self.ids[codes] == portfolio_ids
+
+        # Number of distinct dates on or before as_of - the date rank of a statement dated exactly then, plus one
+        ranks = np.searchsorted(self.unique_dates, _nanoseconds(as_of), side='right')
+        positions = np.searchsorted(self.keys, codes * (len(self.unique_dates) + 1) + ranks, side='right') - 1
+
+        # Anything before the portfolio's first row belongs to the previous portfolio
+        return np.where(known & (positions >= self.bounds[codes]), positions, -1)
+
+def _nanoseconds(dates):
+    # Date(s) as int64 nanoseconds, comparable with _StatementLookup.dates
+    if np.ndim(dates) == 0:
+        return pd.Timestamp(dates).as_unit('ns').value
+    return pd.to_datetime(np.asarray(dates)).to_numpy(dtype='datetime64[ns]').view('int64')
+
+class Portfolios(Container):
+    __slots__ = ('_lookups',)
+
+    # Frames mapped to their source section and processing function - headers and statements both come from 'portfolios'
+    _sections = {
+        'headers': ('portfolios', _process_headers),
+        'statements': ('portfolios', _process_statements),
+        'bulkStatuses': ('bulkStatuses', from_records)
+    }
+
+    def __init__(self, data, **kwargs):
+        super().__init__(data, **kwargs)
+        self._lookups = {}          # date field -> _StatementLookup
 
     @property
     def headers(self):
-        return self.__get('headers')
+        return self._get('headers')
         
     @property
     def statements(self):
-        return self.__get('statements')
+        return self._get('statements')
 
     @property
     def bulkStatuses(self):
-        return self.__get('bulkStatuses')     
-
-    def __get(self, key):
-        # Perform lazy-instantiation
-        if key not in self.__dataframes:
-            # Dispatch to the correct processing method
-            processing_function = self.__dispatch_table.get(key, self.__default_processing)
-            self.__dataframes[key] = processing_function(key)
-            
-        return self.__dataframes[key]
-
-    # Default processing function
-    def __default_processing(self, key):
-        return pd.DataFrame()
-
-    def __process_headers(self, key):
-        data = self.__data['portfolios']
-        
-        # Extract 'portfolioHeader' details
-        portfolio_headers = [d['portfolioHeader'] for d in data if 'portfolioHeader' in d]
-        
-        # Create DataFrame
-        df = pd.DataFrame(portfolio_headers)
+        return self._get('bulkStatuses')
 
-        # Set 'portfolioId' as the index
-        df.set_index('portfolioId', inplace=True)    
+    def indexed_statements(self, date_field=DATE_FIELD):
+        """
+        Statements indexed by a sorted (portfolioId, statement date) MultiIndex, dates parsed.  Statements
+        without a portfolio ID or a valid date are left out.
 
-        return df
+        Args:
+            date_field — Statement date column. Defaults to DATE_FIELD.
 
-    def __process_statements(self, key):
-        data = self.__data['portfolios']
+        Returns:
+            pd.DataFrame
+        """
 
-        # normalize the 'holdingsStatementHeaders'
-        df_statements = pd.json_normalize(data, record_path=['holdingsStatementHeaders'], meta=[['portfolioHeader', 'portfolioId']])
+        return self.__lookup(date_field).frame
 
-        return df_statements
+    def latest_statement(self, portfolio_id, as_of, date_field=DATE_FIELD):
+        """
+        Latest statement of a portfolio dated on or before 'as_of', found by binary search.
 
-    def __process_portfolios(self, data):
-        # normalize the 'portfolioHeader'
-        df_portfolio = pd.json_normalize([item['portfolioHeader'] for item in data])
-        
-        # normalize the 'holdingsStatementHeaders'
-        df_holdings = pd.json_normalize(data, record_path=['holdingsStatementHeaders'], meta=[['portfolioHeader', 'portfolioId']])
-        
-        # set 'portfolioId' as the index for easy access
-        df_portfolio.set_index('portfolioId', inplace=True)
-        df_holdings.set_index('portfolioHeader.portfolioId', inplace=True)
-        
-        return df_holdings
+        Args:
+            portfolio_id — Portfolio ID.
+            as_of — Date, as anything pd.Timestamp accepts.
+            date_field — Statement date column. Defaults to DATE_FIELD.
+
+        Returns:
+            pd.Series named by its (portfolioId, date) key, or None when there is no such statement
+        """
+
+        lookup = self.__lookup(date_field)
+        position = lookup.latest(portfolio_id, as_of)
+        return lookup.frame.iloc[position] if position >= 0 else None
+
+    def latest_statements(self, portfolio_ids, as_of, date_field=DATE_FIELD):
+        """
+        Vectorized latest_statement() over many portfolios.
+
+        Args:
+            portfolio_ids — Portfolio IDs, repeats allowed.
+            as_of — One date for all portfolios, or one date per portfolio ID.
+            date_field — Statement date column. Defaults to DATE_FIELD.
+
+        Returns:
+            pd.DataFrame — one row per requested ID, indexed by portfolioId, with the statement date as a column.
+                           Rows of portfolios without a statement on or before 'as_of' are all missing values.
+        """
 
-    def __process_bulk_statuses(self, key):
-        data = self.__data['bulkStatuses']
+        if isinstance(portfolio_ids, str):
+            portfolio_ids = [portfolio_ids]
+        lookup = self.__lookup(date_field)
+        positions = lookup.latest_many(portfolio_ids, as_of)
 
-        return pd.DataFrame.from_records(data)
+        # Reindexing the flat frame's RangeIndex by position turns -1 into an empty row
+        result = lookup.flat.reindex(positions).drop(columns='portfolioId')
+        result.index = pd.Index(portfolio_ids, name='portfolioId')
+        return result
+
+    def __lookup(self, date_field):
+        lookup = self._lookups.get(date_field)
+        if lookup is None:
+            with self._lock:
+                lookup = self._lookups.get(date_field)
+                if lookup is None:
+                    lookup = self._lookups[date_field] = _StatementLookup(self.statements, date_field)
+        return lookup
 
 def get_portfolios(ids, startDate=None, endDate=None, includePortfolioLevelAttributes=True,
                    includeDefaultBenchmarkHeader=True, includeCarveOutBasePortfolioHeader=True,
-                   traverseCompositePositions=True) -> Portfolios:
+                   traverseCompositePositions=True, max_workers=4, retry=False, retries=3) -> Portfolios:
     """
     Request for a list of portfolios based on portfolio ID(s) and date range.
 
+    Large ID lists are split into chunks bounded by MAX_IDS_PER_REQUEST and MAX_IDS_LENGTH, fetched 
+    concurrently and merged into a single result.
+
     Args:
         ids — The list of portfolio IDs of interest.
         startDate — Start date of the portfolio data retrieval request.
@@ -103,9 +213,12 @@ def get_portfolios(ids, startDate=None, endDate=None, includePortfolioLevelAttri
         includeDefaultBenchmarkHeader — Indicates whether to include a default benchmark header.
         includeCarveOutBasePortfolioHeader — Indicates whether to include carve-out base portfolio header.
         traverseCompositePositions — Indicates whether to traverse composite positions.
+        max_workers — Maximum number of chunk requests in flight. Defaults to 4.
+        retry — Re-request only the portfolios reported as failed in 'bulkStatuses', merging what is recovered.
+        retries — Maximum rounds of re-requests, with backoff between them. Defaults to 3.
 
     Returns:
-        pd.DataFrame
+        Portfolios
     """  
     
     params = {}
@@ -113,7 +226,6 @@ def get_portfolios(ids, startDate=None, endDate=None, includePortfolioLevelAttri
     # Include optional parameters
     if isinstance(ids, str):
         ids = [ids]
-    params["ids"] = ",".join(ids)
     if startDate is not None:
         params["startDate"] = startDate
     if endDate is not None:
@@ -126,24 +238,46 @@ def get_portfolios(ids, startDate=None, endDate=None, includePortfolioLevelAttri
         params["includeCarveOutBasePortfolioHeader"] = includeCarveOutBasePortfolioHeader
     if traverseCompositePositions is not None:  
         params["traverseCompositePositions"] = traverseCompositePositions        
-    
-    # Prepare endpoint definition...
-    definition = endpoint_request.Definition(
-        url = ENDPOINT,
-        query_parameters = params
-    )
-    
-    # Submit request
-    try:
-        response = definition.get_data()
-        if response.is_success:
-            return Portfolios(response.data.raw)
-        
-        # Throw an exception
-        raise Exception(f"HTTP Error. Code: {response.raw.status_code}. Reason: {response.raw.reason_phrase}\n[{response.raw.text}")
-        
-    except Exception as e:
-        raise RuntimeError(f"An error occurred: {str(e)}") from None
 
+    payload = _fetch_ids(ids, params, max_workers)
+    if retry:
+        payload = retry_failed(payload, lambda failed: _fetch_ids(failed, params, max_workers), retries,
+                               {'portfolios': ID_FIELD})
+
+    return Portfolios(payload)
+
+def _fetch_ids(ids, params, max_workers):
+    chunks = _chunk_ids(ids)
+    if len(chunks) <= 1:
+        return _fetch({**params, "ids": ",".join(ids)})
+
+    # Fetch each chunk concurrently and merge the raw payloads in the order requested
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        payloads = list(executor.map(lambda chunk: _fetch({**params, "ids": ",".join(chunk)}), chunks))
 
+    return merge_payloads(payloads)
 
+def _chunk_ids(ids):
+    # Greedily pack IDs into chunks bounded by count and by the length of the joined 'ids' parameter
+    chunks, chunk, length = [], [], 0
+    for id in ids:
+        if chunk and (len(chunk) >= MAX_IDS_PER_REQUEST or length + len(id) + 1 > MAX_IDS_LENGTH):
+            chunks.append(chunk)
+            chunk, length = [], 0
+        chunk.append(id)
+        length += len(id) + 1
+
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+def _fetch(params):
+    # Submit request - rate limited and retried by the scheduler
+    try:
+        response = scheduler.request(ENDPOINT, query_parameters=params)
+        return response.data.raw
+
+    except RequestError:
+        raise
+    except Exception as e:
+        raise RuntimeError(f"An error occurred: {str(e)}") from None
@@ -1,12 +1,23 @@
 # Portfolios - Search
 # API operation for getting a list of portfolio headers based on request query options.
 
-from refinitiv.data.delivery import endpoint_request
-import pandas as pd
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+
+from ..core import LazyModule, RequestError, scheduler
+
+pd = LazyModule('pandas')
 
 # static endpoint
 ENDPOINT = 'https://api.refinitiv.com/user-data/portfolio-management/v1/portfolios/search'
 
+# Portfolio headers requested per page by search_iter()
+PAGE_SIZE = 500
+
+# Query parameter carrying the number of headers to skip, for paging
+OFFSET_PARAMETER = 'offset'
+
 def search(portfolioTypes=None, query=None, queryField=None, queryCondition=None, userSources=None, sort=None, 
            maxCount=None, includeDefaultBenchmarkHeader=True) -> pd.DataFrame:
     """
@@ -26,7 +37,99 @@ def search(portfolioTypes=None, query=None, queryField=None, queryCondition=None
         pd.DataFrame
     """  
 
-    params = {} 
+    params = _params(portfolioTypes, query, queryField, queryCondition, userSources, sort, includeDefaultBenchmarkHeader)
+    if maxCount is not None:
+        params["maximumCount"] = maxCount
+
+    # Submit request - rate limited and retried by the scheduler
+    try:
+        response = scheduler.request(ENDPOINT, query_parameters=params)
+        return pd.DataFrame.from_records(response.data.raw['portfolioHeaders'])
+
+    except RequestError:
+        raise
+    except Exception as e:
+        raise RuntimeError(f"An error occurred: {str(e)}") from None
+
+def search_iter(portfolioTypes=None, query=None, queryField=None, queryCondition=None, userSources=None, sort=None,
+                maxCount=None, includeDefaultBenchmarkHeader=True, page_size=PAGE_SIZE, prefetch=True,
+                offset_parameter=OFFSET_PARAMETER):
+    """
+    Page through the portfolio headers matching the request query options, yielding one DataFrame per page
+    as it arrives.  Work on the first pages, e.g. get_portfolios() of their IDs, can start while the rest
+    is still being listed.
+
+        for headers in search_iter(portfolioTypes='FundedPortfolio', page_size=200):
+            portfolios = get_portfolios(list(headers['portfolioId']))
+
+    Args:
+        portfolioTypes, query, queryField, queryCondition, userSources, sort, includeDefaultBenchmarkHeader — As for search().
+        maxCount — Optional maximum number of portfolio headers over all pages.
+        page_size — Portfolio headers requested per page. Defaults to PAGE_SIZE.
+        prefetch — Request the next page while the caller works on the current one.
+        offset_parameter — Name of the query parameter carrying the number of headers to skip. Defaults to OFFSET_PARAMETER.
+
+    Returns:
+        generator of pd.DataFrame, one per non-empty page - listing stops at the first short page
+    """
+
+    if page_size < 1:
+        raise ValueError(f"page_size must be positive, not {page_size}")
+    if maxCount is not None and maxCount < 1:
+        return
+
+    params = _params(portfolioTypes, query, queryField, queryCondition, userSources, sort, includeDefaultBenchmarkHeader)
+
+    def fetch(offset):
+        count = page_size if maxCount is None else min(page_size, maxCount - offset)
+        return _fetch({**params, 'maximumCount': count, offset_parameter: offset})
+
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    try:
+        offset, previous = 0, None
+        headers = fetch(offset)
+        while headers:
+            # A server ignoring the offset would hand back the same page forever
+            if previous is not None and headers[0] == previous:
+                raise RuntimeError(f"An error occurred: the search returned the same page at offset {offset} - "
+                                   f"is '{offset_parameter}' the offset parameter of the endpoint?")
+            previous = headers[0]
+
+            page = pd.DataFrame.from_records(headers)
+            offset += len(headers)
+            more = len(headers) >= page_size and (maxCount is None or offset < maxCount)
+            headers = None
+
+            if not more:
+                yield page
+                return
+
+            # Ask for the next page before handing this one over
+            if executor is not None:
+                next_page = executor.submit(fetch, offset)
+                yield page
+                headers = next_page.result()
+            else:
+                yield page
+                headers = fetch(offset)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+def _fetch(params):
+    # One page of portfolio headers
+    try:
+        response = scheduler.request(ENDPOINT, query_parameters=params)
+        return response.data.raw['portfolioHeaders']
+
+    except RequestError:
+        raise
+    except Exception as e:
+        raise RuntimeError(f"An error occurred: {str(e)}") from None
+
+def _params(portfolioTypes, query, queryField, queryCondition, userSources, sort, includeDefaultBenchmarkHeader):
+    # Query parameters shared by search() and search_iter()
+    params = {}
 
     # Include optional parameters
     if portfolioTypes is not None:
@@ -45,28 +148,7 @@ def search(portfolioTypes=None, query=None, queryField=None, queryCondition=None
         params["userSources"] = ",".join(userSources)
     if sort is not None:
         params["sort"] = sort
-    if maxCount is not None:
-        params["maximumCount"] = maxCount
     if includeDefaultBenchmarkHeader is not None:
-        params["includeDefaultBenchmarkHeader"] = includeDefaultBenchmarkHeader        
-    
-    # Prepare endpoint definition...
-    definition = endpoint_request.Definition(
-        url = ENDPOINT,
-        query_parameters = params
-    )
-    
-    # Submit request
-    try:
-        response = definition.get_data()
-        if response.is_success:
-            return pd.DataFrame.from_records(response.data.raw['portfolioHeaders'])
-        
-        # Throw an exception
-        raise Exception(f"HTTP Error. Code: {response.raw.status_code}. Reason: {response.raw.reason_phrase}\n[{response.raw.text}")
-        
-    except Exception as e:
-        raise RuntimeError(f"An error occurred: {str(e)}") from None
-
-
+        params["includeDefaultBenchmarkHeader"] = includeDefaultBenchmarkHeader
 
+    return params
@@ -0,0 +1,11 @@
+# Local stand-in for the PAM API - synthetic payloads and an HTTP server for offline load tests and benchmarks.
+# Members are imported on first access.
+from ..core import lazy_members
+
+_MEMBERS = {
+    'PayloadGenerator': '.payloads', 'DEFAULT_SIZES': '.payloads',
+    'StandInServer': '.server'
+}
+
+__all__ = list(_MEMBERS)
+__getattr__, __dir__ = lazy_members(__name__, _MEMBERS)
@@ -0,0 +1,35 @@
+# Stand-in server - command line
+# Serve the local stand-in of the PAM API until interrupted.
+#
+# Usage:
+#   python -m pam.standin --port 8080 --latency 0.05 --throttle-rate 0.1 --securities 500
+
+import argparse
+
+from .payloads import DEFAULT_SIZES
+from .server import StandInServer
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m pam.standin', description='Local stand-in for the PAM API.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests failing with HTTP 500')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='fraction of requests throttled with HTTP 429')
+    parser.add_argument('--max-rate', type=float, default=None, help='requests per second allowed per endpoint')
+    parser.add_argument('--retry-after', type=int, default=1, help='seconds sent in Retry-After headers')
+    parser.add_argument('--seed', type=int, default=0)
+    for name, value in DEFAULT_SIZES.items():
+        parser.add_argument(f'--{name}', type=int, default=value, help=f'payload size (default {value})')
+    args = parser.parse_args(argv)
+
+    server = StandInServer(args.host, args.port, args.latency, args.error_rate, args.throttle_rate, args.max_rate,
+                           args.retry_after, args.seed, {name: getattr(args, name) for name in DEFAULT_SIZES})
+    print(f'PAM stand-in listening on {server.url} - set PAM_BASE_URL={server.url} to use it')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
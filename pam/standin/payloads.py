@@ -0,0 +1,269 @@
+# Stand-in payloads
+# Synthetic, size-configurable JSON responses shaped like those of the eleven PAM API endpoints.
+
+import datetime
+import random
+
+# Default sizes of the generated responses
+DEFAULT_SIZES = {
+    'portfolios': 10,           # portfolios listed when a request names none (search, analytics without 'portfolios')
+    'securities': 50,           # holdings per portfolio
+    'dates': 5,                 # holdings statement dates when a request names none
+    'days': 60,                 # business days of daily series when a request has no date range
+    'classifications': 3,       # classification schemes
+    'sectors': 11,              # sectors per classification scheme
+    'statements': 12            # statement headers per portfolio in get_portfolios responses
+}
+
+# Last date of generated series when a request has no date range
+END_DATE = datetime.date(2024, 12, 31)
+
+CURRENCIES = ['USD', 'EUR', 'GBP', 'JPY', 'CHF', 'CAD', 'AUD']
+WINDOWS = ['1Y', '3Y', '5Y']
+
+class PayloadGenerator:
+    """
+    Builds synthetic responses for every endpoint.  The same request and seed always produce the same
+    response, and the values of a portfolio do not depend on the other portfolios requested alongside.
+
+    Args:
+        seed — Seed of the generated values.
+        sizes — Sizes overriding DEFAULT_SIZES, e.g. securities=500, dates=20.
+    """
+
+    def __init__(self, seed=0, **sizes):
+        unknown = set(sizes) - set(DEFAULT_SIZES)
+        if unknown:
+            raise ValueError(f"Unknown sizes: {', '.join(sorted(unknown))}")
+
+        self.seed = seed
+        self.sizes = {**DEFAULT_SIZES, **sizes}
+
+    # Analytics
+
+    def holdings_statements(self, portfolio_id, request=None):
+        request = request or {}
+        dates = request.get('holdingsStatementDates') or self.__dates(request, self.sizes['dates'], monthly=True)
+
+        summaries, details = [], []
+        for date in dates:
+            rng = self.__rng(portfolio_id, date)
+            holdings = self.__holdings(portfolio_id, rng)
+            total = sum(h['marketValue'] for h in holdings)
+            summaries.append({
+                'portfolioId': portfolio_id, 'holdingsStatementDate': date, 'currency': 'USD',
+                'marketValue': round(total, 2), 'numberOfHoldings': len(holdings), 'cash': round(rng.uniform(0, 0.05) * total, 2)
+            })
+            details.extend({**h, 'holdingsStatementDate': date, 'weight': h['marketValue'] / total * 100} for h in holdings)
+
+        return {
+            'holdingsSummaries': summaries,
+            'holdingsDetails': details,
+            'bulkStatuses': [{'portfolioId': portfolio_id, 'isSuccess': True, 'status': 'Succeeded'}],
+            'auditSummaries': [{'portfolioId': portfolio_id, 'numberOfWarnings': 0, 'numberOfErrors': 0}],
+            'auditSecurityDetails': [],
+            'auditContributorRICDetails': []
+        }
+
+    def profiles(self, request=None):
+        request = request or {}
+        ids = self.__portfolio_ids(request)
+
+        securities = []
+        for id in ids:
+            rng = self.__rng(id, 'profiles')
+            for h in self.__holdings(id, rng):
+                weight = rng.uniform(0, 4)
+                securities.append({'portfolioId': id, 'securityId': h['securityId'], 'securityName': h['securityName'],
+                                   'sector': h['sector'], 'portfolioWeight': weight, 'benchmarkWeight': rng.uniform(0, 4),
+                                   'marketValue': h['marketValue'], 'priceToEarnings': rng.uniform(5, 40)})
+
+        return {
+            'portfolios': [self.__portfolio(id) for id in ids],
+            'profileAttributes': [{'portfolioId': id, 'attribute': name, 'portfolioValue': self.__rng(id, name).uniform(0, 30),
+                                   'benchmarkValue': self.__rng(id, name, 'b').uniform(0, 30)}
+                                  for id in ids for name in ('priceToEarnings', 'priceToBook', 'dividendYield', 'beta')],
+            'longShortBreakDown': [{'portfolioId': id, 'side': side, 'weight': weight}
+                                   for id in ids for side, weight in (('Long', 100.0), ('Short', 0.0))],
+            'classifications': self.__classifications(ids, ('portfolioWeight', 'benchmarkWeight', 'activeWeight')),
+            'securities': securities,
+            'portfolioCentricCompositionSummaries': [{'portfolioId': id, 'numberOfSecurities': self.sizes['securities'],
+                                                      'overlap': self.__rng(id, 'overlap').uniform(0, 100)} for id in ids],
+            'portfolioRelativeCompositionSummaries': [{'portfolioId': id, 'activeShare': self.__rng(id, 'active').uniform(0, 100)} for id in ids],
+            'breakpoints': [{'portfolioId': id, 'breakpoint': f'Q{q}', 'weight': 25.0} for id in ids for q in range(1, 5)],
+            'auditSummaries': [{'portfolioId': id, 'numberOfWarnings': 0, 'numberOfErrors': 0} for id in ids],
+            'auditSecurityDetails': [],
+            'auditHoldingsDetails': [],
+            'auditContributorRICDetails': []
+        }
+
+    def return_statistics(self, request=None):
+        request = request or {}
+        ids = self.__portfolio_ids(request)
+
+        statistics = []
+        for id in ids:
+            for window in WINDOWS:
+                rng = self.__rng(id, 'mpt', window)
+                statistics.append({
+                    'portfolioId': id, 'window': window, 'annualizedReturn': rng.gauss(8, 6), 'annualizedVolatility': rng.uniform(5, 25),
+                    'sharpeRatio': rng.gauss(0.6, 0.4), 'beta': rng.gauss(1, 0.2), 'alpha': rng.gauss(0, 2), 'correlation': rng.uniform(0.6, 1),
+                    'trackingError': rng.uniform(0.5, 8), 'informationRatio': rng.gauss(0, 0.5), 'maxDrawdown': -rng.uniform(5, 40)
+                })
+
+        return {
+            'portfolios': [self.__portfolio(id) for id in ids],
+            'mptStatisticsData': statistics,
+            'auditSummaries': [{'portfolioId': id, 'numberOfWarnings': 0, 'numberOfErrors': 0} for id in ids],
+            'auditHoldingsDetails': [],
+            'auditSecurityDetails': [],
+            'auditContributorRICDetails': []
+        }
+
+    def performance_attribution(self, request=None):
+        request = request or {}
+        ids = self.__portfolio_ids(request)
+        days = self.__dates(request, self.sizes['days'])
+
+        daily, securities = [], []
+        for id in ids:
+            rng = self.__rng(id, 'performance', days[0] if days else '')
+            portfolio = benchmark = 1.0
+            for day in days:
+                portfolio *= 1 + rng.gauss(0.0003, 0.01)
+                benchmark *= 1 + rng.gauss(0.0003, 0.009)
+                daily.append({'portfolioId': id, 'date': day, 'portfolioReturn': (portfolio - 1) * 100, 'benchmarkReturn': (benchmark - 1) * 100})
+
+            for h in self.__holdings(id, rng):
+                rate = rng.gauss(5, 15)
+                weight = rng.uniform(0, 4)
+                securities.append({'portfolioId': id, 'securityId': h['securityId'], 'securityName': h['securityName'], 'sector': h['sector'],
+                                   'portfolioAverageWeight': weight, 'portfolioReturn': rate, 'portfolioContribution': weight * rate / 100})
+
+        return {
+            'portfolios': [self.__portfolio(id) for id in ids],
+            'longShortBreakDown': [{'portfolioId': id, 'side': 'Long', 'weight': 100.0} for id in ids],
+            'classifications': self.__classifications(ids, ('portfolioAverageWeight', 'benchmarkAverageWeight', 'portfolioReturn',
+                                                            'benchmarkReturn', 'allocationEffect', 'selectionEffect', 'interactionEffect')),
+            'securities': securities,
+            'dailyCumulative': daily,
+            'auditSummaries': [{'portfolioId': id, 'numberOfWarnings': 0, 'numberOfErrors': 0} for id in ids],
+            'auditSecurityDetails': [],
+            'auditHoldingsDetails': [],
+            'auditContributorRICDetails': [],
+            'auditTransactionDetails': []
+        }
+
+    # Portfolios
+
+    def portfolios(self, ids):
+        portfolios = []
+        for id in ids:
+            rng = self.__rng(id, 'statements')
+            dates = _month_ends(END_DATE, self.sizes['statements'])
+            portfolios.append({
+                'portfolioHeader': self.__portfolio(id),
+                'holdingsStatementHeaders': [{'holdingsStatementDate': date, 'marketValue': round(rng.uniform(1e6, 1e9), 2),
+                                              'numberOfHoldings': self.sizes['securities']} for date in dates]
+            })
+
+        return {
+            'portfolios': portfolios,
+            'bulkStatuses': [{'portfolioId': id, 'isSuccess': True, 'status': 'Succeeded'} for id in ids]
+        }
+
+    def search(self, count=None, offset=0):
+        count = self.sizes['portfolios'] if count is None else count
+        total = self.sizes['portfolios']
+        return {'portfolioHeaders': [self.__portfolio(_portfolio_id(i)) for i in range(offset, min(offset + count, total))]}
+
+    # Metadata
+
+    def currencies(self):
+        return {'currencies': [{'code': code, 'name': code} for code in CURRENCIES]}
+
+    def identifiers(self):
+        return {'identifiers': [{'code': code, 'name': code} for code in ('RIC', 'ISIN', 'CUSIP', 'SEDOL', 'TICKER')]}
+
+    def data_columns(self):
+        columns = [('holdingsStatementDate', 'Date'), ('date', 'Date'), ('marketValue', 'Money'), ('weight', 'Percent'),
+                   ('quantity', 'Number'), ('price', 'Money'), ('sector', 'Sector'), ('currency', 'String')]
+        return {'dataColumns': [{'name': name, 'dataType': data_type} for name, data_type in columns]}
+
+    def attributes(self):
+        return {'attributes': [{'name': name, 'attributeType': attribute_type, 'attributeDataType': data_type}
+                               for name, attribute_type, data_type in (('Price', 'Price', 'Money'), ('Sector', 'Classification', 'Sector'),
+                                                                       ('ISIN', 'Identifier', 'Identifier'), ('Rate', 'CashRate', 'Number'))]}
+
+    def classification_sectors(self, codes=None):
+        codes = codes or self.__classification_codes()
+        return {'classificationSectors': [{'classificationCode': code,
+                                           'sectors': [{'sectorCode': f'S{j:02d}', 'sectorName': f'{code} sector {j}'} for j in range(self.sizes['sectors'])]}
+                                          for code in codes]}
+
+    # Helpers
+
+    def __rng(self, *key):
+        return random.Random(':'.join(str(part) for part in (self.seed,) + key))
+
+    def __portfolio_ids(self, request):
+        portfolios = request.get('portfolios')
+        if not portfolios:
+            return [_portfolio_id(i) for i in range(self.sizes['portfolios'])]
+        return [p.get('portfolioId') if isinstance(p, dict) else p for p in portfolios]
+
+    def __portfolio(self, id):
+        rng = self.__rng(id, 'header')
+        return {'portfolioId': id, 'portfolioName': f'Portfolio {id}', 'portfolioType': 'FundedPortfolio',
+                'currency': rng.choice(CURRENCIES), 'defaultBenchmarkId': 'BENCH0001'}
+
+    def __holdings(self, portfolio_id, rng):
+        holdings = []
+        for i in range(self.sizes['securities']):
+            quantity = rng.randint(100, 100000)
+            price = round(rng.uniform(5, 500), 2)
+            holdings.append({'portfolioId': portfolio_id, 'securityId': f'SEC{i:05d}', 'securityName': f'Security {i}',
+                             'sector': f'S{i % self.sizes["sectors"]:02d}', 'currency': CURRENCIES[i % len(CURRENCIES)],
+                             'quantity': quantity, 'price': price, 'marketValue': round(quantity * price, 2)})
+        return holdings
+
+    def __classification_codes(self):
+        return [f'CLASS_{i}' for i in range(self.sizes['classifications'])]
+
+    def __classifications(self, ids, fields):
+        blocks = []
+        for code in self.__classification_codes():
+            data = []
+            for id in ids:
+                rng = self.__rng(id, code)
+                for j in range(self.sizes['sectors']):
+                    data.append({'portfolioId': id, 'sectorCode': f'S{j:02d}', 'sectorName': f'{code} sector {j}',
+                                 **{field: rng.gauss(0, 5) for field in fields}})
+            blocks.append({'classificationCode': code, 'classificationData': data})
+        return blocks
+
+    def __dates(self, request, count, monthly=False):
+        # Dates of the request's range, else 'count' dates ending at END_DATE
+        start, end = request.get('startDate'), request.get('endDate')
+        if start and end:
+            start, end = datetime.date.fromisoformat(start[:10]), datetime.date.fromisoformat(end[:10])
+            return _month_ends(end, None, start) if monthly else _business_days(end, None, start)
+        return _month_ends(END_DATE, count) if monthly else _business_days(END_DATE, count)
+
+def _portfolio_id(i):
+    return f'PORT{i + 1:05d}'
+
+def _business_days(end, count=None, start=None):
+    days, day = [], end
+    while (count is None or len(days) < count) and (start is None or day >= start):
+        if day.weekday() < 5:
+            days.append(day.isoformat())
+        day -= datetime.timedelta(days=1)
+    return days[::-1]
+
+def _month_ends(end, count=None, start=None):
+    dates, day = [], end
+    while (count is None or len(dates) < count) and (start is None or day >= start):
+        dates.append(day.isoformat())
+        day = day.replace(day=1) - datetime.timedelta(days=1)
+    return dates[::-1]
@@ -0,0 +1,210 @@
+# Stand-in server
+# Local HTTP server answering the eleven PAM API endpoints with synthetic payloads, with injectable latency, errors and throttling.
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import random
+import re
+import threading
+import time
+import urllib.parse
+
+from ..analytics.holdings import ENDPOINT as HOLDINGS_ENDPOINT
+from ..analytics.performance import ENDPOINT as PERFORMANCE_ENDPOINT
+from ..analytics.profiles import ENDPOINT as PROFILES_ENDPOINT
+from ..analytics.returns import ENDPOINT as RETURNS_ENDPOINT
+from ..core.transport import API_ROOT
+from ..metadata.attributes import ENDPOINT as ATTRIBUTES_ENDPOINT
+from ..metadata.columns import ENDPOINT as COLUMNS_ENDPOINT
+from ..metadata.currencies import ENDPOINT as CURRENCIES_ENDPOINT
+from ..metadata.identifiers import ENDPOINT as IDENTIFIERS_ENDPOINT
+from ..metadata.sectors import ENDPOINT as SECTORS_ENDPOINT
+from ..portfolios.portfolios import ENDPOINT as PORTFOLIOS_ENDPOINT
+from ..portfolios.search import ENDPOINT as SEARCH_ENDPOINT
+from .payloads import PayloadGenerator
+
+class StandInServer:
+    """
+    Local stand-in for the PAM API, for load tests and benchmarks on an offline machine.  Point the
+    package at it with pam.core.scheduler.configure(transport=HttpTransport(server.url)), or by setting
+    the PAM_BASE_URL environment variable before importing pam.
+
+    Args:
+        host, port — Address to listen on.  Port 0 picks a free port.
+        latency — Seconds added to every response - a number, or a (min, max) range drawn uniformly.
+        error_rate — Fraction of requests answered with HTTP 500.
+        throttle_rate — Fraction of requests answered with HTTP 429 and a Retry-After header.
+        max_rate — Optional requests per second allowed per endpoint.  Requests beyond it get HTTP 429.
+        retry_after — Seconds sent in the Retry-After header of injected 429 responses.
+        seed — Seed of the payloads and of the injected failures.
+        sizes — Payload sizes, overriding pam.standin.payloads.DEFAULT_SIZES, e.g. {'securities': 500}.
+
+    Example:
+        with StandInServer(latency=0.05, throttle_rate=0.1) as server:
+            scheduler.configure(transport=HttpTransport(server.url))
+            ...
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, error_rate=0.0, throttle_rate=0.0, max_rate=None,
+                 retry_after=1, seed=0, sizes=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.max_rate = max_rate
+        self.retry_after = retry_after
+        self.generator = PayloadGenerator(seed, **(sizes or {}))
+        self.requests = {}          # route name -> number of requests received
+
+        self.__random = random.Random(seed)
+        self.__windows = {}         # route name -> (second, requests within it), for 'max_rate'
+        self.__lock = threading.Lock()
+        self.__thread = None
+
+        self.__httpd = ThreadingHTTPServer((host, port), _handler(self))
+        self.__httpd.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self.__httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        """Serve from a background thread.  Returns the server."""
+        if self.__thread is None:
+            self.__thread = threading.Thread(target=self.__httpd.serve_forever, name='pam-standin', daemon=True)
+            self.__thread.start()
+        return self
+
+    def stop(self):
+        if self.__thread is not None:
+            self.__httpd.shutdown()
+            self.__thread.join()
+            self.__thread = None
+        self.__httpd.server_close()
+
+    def serve_forever(self):
+        """Serve from the calling thread until interrupted."""
+        try:
+            self.__httpd.serve_forever()
+        finally:
+            self.__httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def handle(self, method, path, query, body):
+        """Answer one request - returns (status code, headers, payload)."""
+        route = _match(method, path)
+        if route is None:
+            return 404, {}, {'error': {'code': 404, 'message': f'No endpoint {method} {path}'}}
+        name, parameters = route
+
+        with self.__lock:
+            self.requests[name] = self.requests.get(name, 0) + 1
+            draw = self.__random.random()
+            delay = self.__random.uniform(*self.latency) if isinstance(self.latency, (tuple, list)) else self.latency
+            limited = self.__over_rate(name)
+
+        if delay:
+            time.sleep(delay)
+
+        if limited or draw < self.throttle_rate:
+            return 429, {'Retry-After': str(self.retry_after)}, {'error': {'code': 429, 'message': 'Too many requests'}}
+        if draw < self.throttle_rate + self.error_rate:
+            return 500, {}, {'error': {'code': 500, 'message': 'Injected failure'}}
+
+        return 200, {}, self.__payload(name, parameters, query, body)
+
+    def __over_rate(self, name):
+        # Fixed one-second windows per endpoint
+        if self.max_rate is None:
+            return False
+        second = int(time.monotonic())
+        start, count = self.__windows.get(name, (second, 0))
+        if start != second:
+            start, count = second, 0
+        self.__windows[name] = (start, count + 1)
+        return count + 1 > self.max_rate
+
+    def __payload(self, name, parameters, query, body):
+        generator = self.generator
+        if name == 'holdings-statements':
+            return generator.holdings_statements(parameters['portfolioId'], body)
+        if name == 'profiles':
+            return generator.profiles(body)
+        if name == 'return-statistics':
+            return generator.return_statistics(body)
+        if name == 'performance-attribution':
+            return generator.performance_attribution(body)
+        if name == 'portfolios':
+            return generator.portfolios([id for id in query.get('ids', '').split(',') if id])
+        if name == 'search':
+            count = query.get('maximumCount')
+            return generator.search(int(count) if count else None, int(query.get('offset', 0)))
+        if name == 'classification-sectors':
+            codes = query.get('classificationCodes')
+            return generator.classification_sectors(codes.split(',') if codes else None)
+        return getattr(generator, name.replace('-', '_'))()
+
+# Routes - name, method and path pattern of every endpoint
+ROUTES = [
+    ('holdings-statements', 'POST', HOLDINGS_ENDPOINT),
+    ('performance-attribution', 'POST', PERFORMANCE_ENDPOINT),
+    ('profiles', 'POST', PROFILES_ENDPOINT),
+    ('return-statistics', 'POST', RETURNS_ENDPOINT),
+    ('search', 'GET', SEARCH_ENDPOINT),
+    ('portfolios', 'GET', PORTFOLIOS_ENDPOINT),
+    ('attributes', 'GET', ATTRIBUTES_ENDPOINT),
+    ('data-columns', 'GET', COLUMNS_ENDPOINT),
+    ('currencies', 'GET', CURRENCIES_ENDPOINT),
+    ('identifiers', 'GET', IDENTIFIERS_ENDPOINT),
+    ('classification-sectors', 'GET', SECTORS_ENDPOINT)
+]
+
+_PATTERNS = [(name, method, re.compile('^' + re.sub(r'\\\{(\w+)\\\}', r'(?P<\1>[^/]+)', re.escape(url[len(API_ROOT):])) + '$'))
+             for name, method, url in ROUTES]
+
+def _match(method, path):
+    for name, route_method, pattern in _PATTERNS:
+        match = pattern.match(path)
+        if match and method == route_method:
+            return name, {key: urllib.parse.unquote(value) for key, value in match.groupdict().items()}
+    return None
+
+def _handler(server):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            self.__respond('GET')
+
+        def do_POST(self):
+            self.__respond('POST')
+
+        def __respond(self, method):
+            parts = urllib.parse.urlsplit(self.path)
+            query = dict(urllib.parse.parse_qsl(parts.query))
+            length = int(self.headers.get('Content-Length') or 0)
+            try:
+                body = json.loads(self.rfile.read(length)) if length else None
+            except ValueError:
+                status, headers, payload = 400, {}, {'error': {'code': 400, 'message': 'Invalid JSON body'}}
+            else:
+                status, headers, payload = server.handle(method, parts.path, query, body)
+
+            content = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(content)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
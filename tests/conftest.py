@@ -0,0 +1,20 @@
+# Fixtures shared by the tests
+
+import pytest
+
+from pam.core import scheduler
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    # Retry rounds back off with jittered delays - not worth waiting for in tests
+    monkeypatch.setattr(scheduler.get_scheduler(), 'backoff_base', 0.0)
+
+@pytest.fixture
+def standin(monkeypatch):
+    # Requests answered by a local stand-in server
+    from pam.core import HttpTransport
+    from pam.standin import StandInServer
+
+    with StandInServer(sizes={'securities': 20}) as server:
+        monkeypatch.setattr(scheduler.get_scheduler(), 'transport', HttpTransport(server.url))
+        yield server
@@ -0,0 +1,57 @@
+# Async twins and bounded fan-out
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from pam import aio
+
+def _blocking(record):
+    # A blocking API operation recording how many calls run at once
+    def call(item):
+        with record['lock']:
+            record['running'] += 1
+            record['peak'] = max(record['peak'], record['running'])
+        time.sleep(0.02)
+        with record['lock']:
+            record['running'] -= 1
+        return item * 2
+
+    return aio._twin(call)
+
+def _record():
+    return {'lock': threading.Lock(), 'running': 0, 'peak': 0}
+
+def test_fan_out_keeps_order_within_the_limit():
+    record = _record()
+    results = asyncio.run(aio.fan_out(_blocking(record), range(20), limit=3))
+
+    assert results == [item * 2 for item in range(20)]
+    assert record['peak'] == 3
+
+def test_limit_beyond_the_default_executor():
+    # Every call waits for all others - only possible with 'limit' threads running at once
+    limit = 40
+    barrier = threading.Barrier(limit, timeout=10)
+    def call(item):
+        barrier.wait()
+        return item
+
+    twin = aio._twin(call)
+
+    assert asyncio.run(aio.fan_out(twin, range(limit), limit=limit)) == list(range(limit))
+
+def test_fan_out_failures():
+    def call(item):
+        if item == 2:
+            raise RuntimeError('An error occurred')
+        return item
+
+    twin = aio._twin(call)
+    results = asyncio.run(aio.fan_out(twin, range(4), limit=2, return_exceptions=True))
+    assert results[:2] == [0, 1] and isinstance(results[2], RuntimeError) and results[3] == 3
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(aio.fan_out(twin, range(4), limit=2))
@@ -0,0 +1,44 @@
+# Brinson attribution
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pam.analytics import brinson_attribution
+
+HOLDINGS = pd.DataFrame({
+    'portfolioId': ['P1', 'P1', 'P1', 'P2', 'P2'],
+    'securityId': ['A', 'B', 'C', 'A', 'D'],
+    'weight': [0.5, 0.3, 0.2, 0.6, 0.4],
+    'sector': ['Tech', 'Energy', np.nan, 'Tech', 'Banks']
+})
+BENCHMARK = pd.DataFrame({
+    'securityId': ['A', 'B', 'D'],
+    'weight': [0.4, 0.4, 0.2],
+    'sector': ['Tech', 'Energy', 'Banks']
+})
+RETURNS = pd.DataFrame({'securityId': ['A', 'B', 'C', 'D'], 'return': [0.04, -0.01, 0.02, 0.015]})
+
+@pytest.mark.parametrize('with_returns', [False, True])
+def test_input_frames_are_unchanged(with_returns):
+    expected = HOLDINGS.merge(RETURNS, on='securityId') if with_returns else HOLDINGS
+    holdings, benchmark, returns = expected.copy(), BENCHMARK.copy(), RETURNS.copy()
+    brinson_attribution(holdings, benchmark, returns, 'sector')
+
+    pd.testing.assert_frame_equal(holdings, expected)
+    pd.testing.assert_frame_equal(benchmark, BENCHMARK)
+    pd.testing.assert_frame_equal(returns, RETURNS)
+
+@pytest.mark.parametrize('method', ['BF', 'BHB'])
+def test_effects_add_up_to_active_return(method):
+    result = brinson_attribution(HOLDINGS, BENCHMARK, RETURNS, 'sector', method=method)
+
+    rates = RETURNS.set_index('securityId')['return']
+    benchmark_return = (BENCHMARK['weight'] * BENCHMARK['securityId'].map(rates)).sum()
+    for portfolio_id, holdings in HOLDINGS.groupby('portfolioId'):
+        portfolio_return = (holdings['weight'] * holdings['securityId'].map(rates)).sum()
+        effects = result[result['portfolioId'] == portfolio_id]
+        total = effects[['allocationEffect', 'selectionEffect', 'interactionEffect']].to_numpy().sum()
+
+        assert total == pytest.approx(portfolio_return - benchmark_return)
+        assert effects['totalEffect'].sum() == pytest.approx(total)
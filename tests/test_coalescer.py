@@ -0,0 +1,48 @@
+# Coalescing concurrent multi-portfolio calls
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from pam.analytics import RequestCoalescer, get_profiles
+
+IDS = [f'PORT{i + 1:05d}' for i in range(5)]
+
+def _request(id):
+    return {'portfolios': [{'portfolioId': id}]}
+
+def test_coalesced_results_equal_direct_calls(standin):
+    coalescer = RequestCoalescer(get_profiles, window=0.2)
+    with ThreadPoolExecutor(max_workers=len(IDS)) as executor:
+        results = list(executor.map(lambda id: coalescer(_request(id)), IDS))
+
+    # One request served every caller
+    assert standin.requests['profiles'] == 1
+
+    for id, result in zip(IDS, results):
+        direct = get_profiles(_request(id))
+        for section in ('portfolios', 'classifications', 'securities', 'profileAttributes'):
+            pd.testing.assert_frame_equal(getattr(result, section), getattr(direct, section))
+        assert set(result.classifications['portfolioId']) == {id}
+
+def test_same_id_with_different_entries_is_not_merged():
+    from pam.analytics.profiles import Profiles
+
+    requests = []
+    def profiles(request, cache=None, sections=None, columns=None):
+        requests.append(request)
+        return Profiles({'portfolios': [{'portfolioId': p['portfolioId'], 'benchmark': p['benchmark']}
+                                        for p in request['portfolios']]}, sections=sections, columns=columns)
+
+    coalescer = RequestCoalescer(profiles, window=0.2)
+    entries = [{'portfolioId': 'P1', 'benchmark': 'B1'}, {'portfolioId': 'P1', 'benchmark': 'B2'},
+               {'portfolioId': 'P2', 'benchmark': 'B1'}, {'portfolioId': 'P1', 'benchmark': 'B1'}]
+    with ThreadPoolExecutor(max_workers=len(entries)) as executor:
+        results = list(executor.map(lambda entry: coalescer({'portfolios': [entry]}), entries))
+
+    for entry, result in zip(entries, results):
+        assert result.portfolios.to_dict('records') == [entry]
+
+    # The B2 entry went out on its own, the others together
+    assert len(requests) == 2
+    assert sorted(len(request['portfolios']) for request in requests) == [1, 2]
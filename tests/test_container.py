@@ -0,0 +1,56 @@
+# Lazy result containers
+
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+import pandas as pd
+
+from pam.core import Container, from_records
+from pam.portfolios.portfolios import Portfolios
+
+def _counting(calls):
+    def process(records, columns=None):
+        with calls['lock']:
+            calls['count'] += 1
+        time.sleep(0.01)
+        return from_records(records)
+    return process
+
+def _container(calls):
+    class Result(Container):
+        __slots__ = ()
+        _sections = {'rows': ('rows', _counting(calls)), 'other': ('other', from_records)}
+
+    return Result({'rows': [{'a': 1}, {'a': 2}], 'other': [{'b': 1}]})
+
+def test_frames_are_built_once_on_first_access():
+    calls = {'lock': threading.Lock(), 'count': 0}
+    result = _container(calls)
+    assert calls['count'] == 0
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        frames = list(executor.map(lambda _: result._get('rows'), range(8)))
+
+    assert calls['count'] == 1
+    assert all(frame is frames[0] for frame in frames)
+    pd.testing.assert_frame_equal(frames[0], pd.DataFrame({'a': [1, 2]}))
+
+def test_missing_section_is_empty():
+    result = Portfolios({'bulkStatuses': []})
+    assert result.headers.empty and result.statements.empty
+
+def test_release_raw_drops_a_section_once_all_its_frames_exist():
+    payload = {'portfolios': [{'portfolioHeader': {'portfolioId': 'P1'},
+                               'holdingsStatementHeaders': [{'holdingsStatementDate': '2024-01-31'}]}],
+               'bulkStatuses': [{'portfolioId': 'P1', 'status': 'Succeeded'}]}
+    result = Portfolios(payload, release_raw=True)
+
+    result.headers
+    # 'statements' is built from the same section - still needed
+    assert 'portfolios' in result.data
+
+    result.statements
+    result.bulkStatuses
+    assert result.data == {}
+    assert list(result.headers.index) == ['P1']
@@ -0,0 +1,48 @@
+# Compact dtypes
+
+import numpy as np
+import pandas as pd
+
+from pam.analytics.holdings import Holdings
+from pam.core import compact_frame, field_types_from_columns
+
+FRAME = pd.DataFrame({
+    'currency': ['USD', 'USD', 'EUR', 'USD'],
+    'securityId': ['S1', 'S2', 'S3', 'S4'],
+    'holdingsStatementDate': ['2024-01-31', '2024-01-31', '2024-02-29', None],
+    'count': [1, 2, 3, 4],
+    'weight': [0.5, 0.25, 0.125, np.nan],
+    'price': [0.1, 0.2, 0.3, 0.4],
+    'amount': ['1.5', '2', None, '3']
+})
+
+def test_compact_frame():
+    compact = compact_frame(FRAME, {'amount': 'number'})
+
+    assert isinstance(compact['currency'].dtype, pd.CategoricalDtype)
+    assert not isinstance(compact['securityId'].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_any_dtype(compact['holdingsStatementDate'])
+    assert compact['count'].dtype == np.int8
+    # float32 only where the values round-trip exactly
+    assert compact['weight'].dtype == np.float32
+    assert compact['price'].dtype == np.float64
+    assert compact['amount'].tolist()[:2] == [1.5, 2.0]
+
+    # Values are unchanged
+    assert compact['currency'].tolist() == FRAME['currency'].tolist()
+    assert compact['weight'].astype(float).equals(FRAME['weight'])
+
+def test_field_types_from_columns():
+    columns = pd.DataFrame({'name': ['asOf', 'value', 'label'], 'dataType': ['Date', 'Money', 'Text']})
+    assert field_types_from_columns(columns) == {'asOf': 'date', 'value': 'number', 'label': 'string'}
+    assert field_types_from_columns(pd.DataFrame({'other': [1]})) == {}
+
+def test_container_compact_applies_to_built_and_later_frames():
+    result = Holdings({'holdingsDetails': FRAME.to_dict('records'), 'holdingsSummaries': [{'count': 1}]})
+    details = result.holdingsDetails
+    assert details['count'].dtype == np.int64
+
+    result.compact()
+    assert result.holdingsDetails['count'].dtype == np.int8
+    assert result.holdingsSummaries['count'].dtype == np.int8
+    pd.testing.assert_frame_equal(details, FRAME, check_dtype=False)
@@ -0,0 +1,45 @@
+# Instrumentation hooks
+
+import pytest
+
+from pam.analytics import get_profiles
+from pam.analytics.profiles import ENDPOINT
+from pam.core import instrumentation
+
+def test_aggregator_summary():
+    aggregator = instrumentation.Aggregator()
+    for seconds in (0.1, 0.2, 0.3, 0.4):
+        aggregator(instrumentation.Event(instrumentation.REQUEST, 'endpoint', seconds, bytes=100, retries=1))
+    aggregator(instrumentation.Event(instrumentation.REQUEST, 'endpoint', 1.0, error='An error occurred'))
+    aggregator(instrumentation.Event(instrumentation.SECTION, 'Holdings.holdingsDetails', 0.05, rows=10))
+
+    summary = aggregator.summary(percentiles=(50,))
+
+    request = summary.loc[(instrumentation.REQUEST, 'endpoint')]
+    assert request['count'] == 5 and request['errors'] == 1
+    assert request['total'] == pytest.approx(2.0) and request['mean'] == pytest.approx(0.4)
+    assert request['p50'] == pytest.approx(0.3) and request['max'] == pytest.approx(1.0)
+    assert request['bytes'] == 400 and request['retries'] == 4
+    assert summary.loc[(instrumentation.SECTION, 'Holdings.holdingsDetails'), 'rows'] == 10
+
+def test_failing_callback_never_fails_the_call():
+    def broken(event):
+        raise ValueError('broken')
+
+    instrumentation.subscribe(broken)
+    try:
+        instrumentation.emit(instrumentation.DECODE, 'endpoint', 0.1)
+    finally:
+        instrumentation.unsubscribe(broken)
+    assert not instrumentation.enabled()
+
+def test_collect_events_of_a_call(standin):
+    with instrumentation.collect() as stats:
+        get_profiles({'portfolios': [{'portfolioId': 'PORT00001'}]}).securities
+
+    assert not instrumentation.enabled()
+    summary = stats.summary()
+    assert summary.loc[(instrumentation.REQUEST, ENDPOINT), 'count'] == 1
+    assert summary.loc[(instrumentation.REQUEST, ENDPOINT), 'errors'] == 0
+    assert summary.loc[(instrumentation.DECODE, ENDPOINT), 'bytes'] > 0
+    assert summary.loc[(instrumentation.SECTION, 'Profiles.securities'), 'rows'] == 20
@@ -0,0 +1,77 @@
+# Linking sub-period attribution results
+
+import pandas as pd
+import pytest
+
+from pam.analytics import performance
+from pam.analytics.linking import chain_cumulative, link_contributions
+from pam.analytics.performance import Performance, get_performance_attribution
+
+# Two portfolios over two sub-periods: P1 returns +10% then +10%, P2 +50% then 0%.  One security each
+# contributes the whole return.
+RETURNS = {'P1': (10.0, 10.0), 'P2': (50.0, 0.0)}
+
+def _period(k):
+    return {
+        'dailyCumulative': [{'portfolioId': id, 'date': f'2024-0{k + 1}-30', 'portfolioReturn': returns[k]} for id, returns in RETURNS.items()],
+        'securities': [{'portfolioId': id, 'securityId': f'{id}-S', 'portfolioContribution': returns[k]}
+                       for id, returns in RETURNS.items()]
+    }
+
+def test_link_contributions_per_portfolio():
+    frames = [pd.DataFrame(_period(k)['securities']) for k in range(2)]
+    returns = [pd.Series({id: r[k] for id, r in RETURNS.items()}) for k in range(2)]
+
+    linked = link_contributions(frames, returns, scale=100, group_field='portfolioId').set_index('portfolioId')
+
+    # Linked contributions add up to each portfolio's own compounded return
+    assert linked.loc['P1', 'portfolioContribution'] == pytest.approx(21.0)
+    assert linked.loc['P2', 'portfolioContribution'] == pytest.approx(50.0)
+
+def test_link_contributions_single_portfolio():
+    frames = [pd.DataFrame({'securityId': ['S'], 'portfolioContribution': [10.0]})] * 2
+    linked = link_contributions(frames, [10.0, 10.0], scale=100)
+    assert linked['portfolioContribution'].iloc[0] == pytest.approx(21.0)
+
+@pytest.fixture
+def split_requests(monkeypatch):
+    # Answer each sub-period from _period(), in the order requested
+    def fetch(request, sections=None, columns=None, **kwargs):
+        k = 0 if request['startDate'] == '2024-01-01' else 1
+        return Performance(_period(k), sections=sections, columns=columns)
+
+    original = performance.get_performance_attribution
+    monkeypatch.setattr(performance, 'get_performance_attribution',
+                        lambda request, split=None, **kwargs: fetch(request, **kwargs) if split is None else original(request, split=split, **kwargs))
+
+def test_split_attribution_links_each_portfolio(split_requests):
+    result = get_performance_attribution({'startDate': '2024-01-01', 'endDate': '2024-12-31'}, split=2)
+    contributions = result.securities.set_index('portfolioId')['portfolioContribution']
+    assert contributions.to_dict() == pytest.approx({'P1': 21.0, 'P2': 50.0})
+
+def test_split_attribution_links_without_daily_cumulative_section(split_requests):
+    result = get_performance_attribution({'startDate': '2024-01-01', 'endDate': '2024-12-31'}, split=2, sections=['securities'])
+    contributions = result.securities.set_index('portfolioId')['portfolioContribution']
+    assert contributions.to_dict() == pytest.approx({'P1': 21.0, 'P2': 50.0})
+    assert result.dailyCumulative.empty
+
+def test_split_attribution_with_a_single_section_name(split_requests):
+    result = get_performance_attribution({'startDate': '2024-01-01', 'endDate': '2024-12-31'}, split=2, sections='securities')
+    contributions = result.securities.set_index('portfolioId')['portfolioContribution']
+    assert contributions.to_dict() == pytest.approx({'P1': 21.0, 'P2': 50.0})
+
+def test_chain_cumulative_compounds_return_columns_only():
+    frames = [pd.DataFrame({'date': [f'2024-0{k + 1}-30'], 'portfolioReturn': [10.0], 'benchmarkReturn': [5.0],
+                            'activeReturn': [5.0], 'count': [3]}) for k in range(2)]
+
+    chained = chain_cumulative(frames, scale=100)
+
+    assert chained['portfolioReturn'].tolist() == pytest.approx([10.0, 21.0])
+    assert chained['benchmarkReturn'].tolist() == pytest.approx([5.0, 10.25])
+    assert chained['activeReturn'].tolist() == [5.0, 5.0]
+    assert chained['count'].tolist() == [3, 3]
+
+def test_split_attribution_without_portfolio_returns_raises(split_requests):
+    with pytest.raises(ValueError):
+        get_performance_attribution({'startDate': '2024-01-01', 'endDate': '2024-12-31'}, split=2,
+                                    columns={'dailyCumulative': ['portfolioId', 'date']})
@@ -0,0 +1,56 @@
+# On-disk store of the metadata cache
+
+import os
+
+import pandas as pd
+import pytest
+
+from pam.metadata.cache import MetadataCache
+
+FRAME = pd.DataFrame({'code': ['USD', 'EUR'], 'name': ['Dollar', 'Euro'], 'extra': [{'a': 1}, [2]]},
+                     index=pd.Index(['A', 'B'], name='classificationCode'))
+
+def _fail():
+    raise AssertionError('Fetched instead of read from disk')
+
+def _files(path):
+    return sorted(os.listdir(path))
+
+def test_new_process_starts_warm(tmp_path):
+    MetadataCache(path=str(tmp_path)).get_or_fetch('key', lambda: FRAME)
+
+    assert [name.endswith('.json') for name in _files(tmp_path)] == [True]
+    pd.testing.assert_frame_equal(MetadataCache(path=str(tmp_path)).get_or_fetch('key', _fail), FRAME)
+
+@pytest.mark.parametrize('content', [b'', b'not json', b'{"version": 1}', b'\x80\x04\x95 pickle'])
+def test_unreadable_entry_is_a_miss_and_removed(tmp_path, content):
+    MetadataCache(path=str(tmp_path)).get_or_fetch('key', lambda: FRAME)
+    [name] = _files(tmp_path)
+    (tmp_path / name).write_bytes(content)
+
+    fetched = []
+    value = MetadataCache(path=str(tmp_path)).get_or_fetch('key', lambda: fetched.append(1) or FRAME)
+
+    assert fetched == [1]
+    pd.testing.assert_frame_equal(value, FRAME)
+    # Replaced by a fresh, readable entry
+    pd.testing.assert_frame_equal(MetadataCache(path=str(tmp_path)).get_or_fetch('key', _fail), FRAME)
+
+def test_entry_of_another_key_is_not_served(tmp_path):
+    MetadataCache(path=str(tmp_path)).get_or_fetch('key', lambda: FRAME)
+    [name] = _files(tmp_path)
+    text = (tmp_path / name).read_text().replace('"key": "key"', '"key": "other"')
+    (tmp_path / name).write_text(text)
+
+    assert MetadataCache(path=str(tmp_path)).get_or_fetch('key', lambda: 'fetched') == 'fetched'
+
+def test_repeated_index_survives_the_round_trip(tmp_path):
+    frame = pd.DataFrame({'name': ['Energy', 'Oil', 'Banks'], 'level': [1, 2, 1]},
+                         index=pd.Index(['GICS', 'GICS', 'ICB'], name='classificationCode'))
+    MetadataCache(path=str(tmp_path)).get_or_fetch('key', lambda: frame)
+
+    value = MetadataCache(path=str(tmp_path)).get_or_fetch('key', _fail)
+
+    assert value.equals(frame)
+    assert list(value.index.names) == ['classificationCode']
+    assert list(value.columns) == ['name', 'level']
@@ -0,0 +1,23 @@
+# MPT statistics
+
+import numpy as np
+import pandas as pd
+
+from pam.analytics import mpt_statistics
+
+def _returns(T, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range('2024-01-01', periods=T)
+    returns = pd.DataFrame(rng.normal(0.0005, 0.01, (T, 2)), index=index, columns=['P1', 'P2'])
+    return returns, pd.Series(rng.normal(0.0004, 0.009, T), index=index)
+
+def test_windows_longer_than_history_are_left_out():
+    returns, benchmark = _returns(100)
+    result = mpt_statistics(returns, benchmark, windows={'1M': 21, '1Y': 252, '3Y': 756, '5Y': 1260})
+
+    assert set(result['window']) == {'1M'}
+    assert (result['observations'] == 21).all()
+
+def test_no_window_fits():
+    returns, benchmark = _returns(100)
+    assert mpt_statistics(returns, benchmark).empty
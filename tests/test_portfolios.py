@@ -0,0 +1,82 @@
+# Portfolios sections and statement lookups
+
+import pandas as pd
+
+from pam.portfolios.portfolios import Portfolios
+
+def _payload():
+    statements = {'P1': ['2024-01-31', '2024-03-31', '2024-02-29'], 'P2': ['2024-02-15']}
+    return {
+        'portfolios': [{'portfolioHeader': {'portfolioId': id, 'name': f'Portfolio {id}'},
+                        'holdingsStatementHeaders': [{'holdingsStatementDate': date, 'holdingsCount': i}
+                                                     for i, date in enumerate(dates)]}
+                       for id, dates in statements.items()],
+        'bulkStatuses': [{'portfolioId': id, 'status': 'Succeeded'} for id in statements]
+    }
+
+def test_sections():
+    result = Portfolios(_payload())
+
+    assert list(result.headers.index) == ['P1', 'P2']
+    assert list(result.headers['name']) == ['Portfolio P1', 'Portfolio P2']
+    assert list(result.statements['portfolioHeader.portfolioId']) == ['P1', 'P1', 'P1', 'P2']
+    assert list(result.bulkStatuses['status']) == ['Succeeded', 'Succeeded']
+
+def test_indexed_statements_are_sorted_by_portfolio_and_date():
+    frame = Portfolios(_payload()).indexed_statements()
+
+    assert frame.index.names == ['portfolioId', 'holdingsStatementDate']
+    assert list(frame.index) == [('P1', pd.Timestamp('2024-01-31')), ('P1', pd.Timestamp('2024-02-29')),
+                                 ('P1', pd.Timestamp('2024-03-31')), ('P2', pd.Timestamp('2024-02-15'))]
+
+def test_latest_statement():
+    result = Portfolios(_payload())
+
+    assert result.latest_statement('P1', '2024-03-15')['holdingsCount'] == 2
+    assert result.latest_statement('P1', '2024-03-31')['holdingsCount'] == 1
+    assert result.latest_statement('P1', '2024-01-01') is None
+    assert result.latest_statement('P2', '2024-01-31') is None
+    assert result.latest_statement('P3', '2024-12-31') is None
+
+def test_latest_statements_match_the_single_lookup():
+    result = Portfolios(_payload())
+    ids = ['P2', 'P1', 'P3', 'P1', 'P2']
+    dates = ['2024-02-15', '2024-02-29', '2024-12-31', '2024-01-15', '2024-02-14']
+
+    frame = result.latest_statements(ids, dates)
+
+    assert list(frame.index) == ids
+    for (id, row), date in zip(frame.iterrows(), dates):
+        single = result.latest_statement(id, date)
+        if single is None:
+            assert row.isna().all()
+        else:
+            assert row['holdingsCount'] == single['holdingsCount']
+            assert row['holdingsStatementDate'] == single.name[1]
+
+    # One date for every ID
+    assert list(result.latest_statements(['P1', 'P2'], '2024-02-29')['holdingsCount']) == [2, 0]
+
+def test_large_id_lists_are_chunked_and_merged_in_order(monkeypatch):
+    from pam.portfolios import portfolios
+
+    chunks = []
+    def fetch(params):
+        ids = params['ids'].split(',')
+        chunks.append(ids)
+        return {'portfolios': [{'portfolioHeader': {'portfolioId': id, 'name': id},
+                                'holdingsStatementHeaders': [{'holdingsStatementDate': '2024-01-31'}]} for id in ids],
+                'bulkStatuses': [{'portfolioId': id, 'status': 'Succeeded'} for id in ids]}
+
+    monkeypatch.setattr(portfolios, '_fetch', fetch)
+    monkeypatch.setattr(portfolios, 'MAX_IDS_PER_REQUEST', 3)
+    monkeypatch.setattr(portfolios, 'MAX_IDS_LENGTH', 12)
+    ids = ['P1', 'P2', 'P3', 'P4', 'LONGER-ID-5', 'P6', 'P7']
+
+    result = portfolios.get_portfolios(ids)
+
+    # Every chunk is bounded by count and by the length of the joined 'ids' parameter
+    assert sorted(chunks) == sorted([['P1', 'P2', 'P3'], ['P4'], ['LONGER-ID-5'], ['P6', 'P7']])
+    assert list(result.headers.index) == ids
+    assert list(result.statements['portfolioHeader.portfolioId']) == ids
+    assert list(result.bulkStatuses['portfolioId']) == ids
@@ -0,0 +1,43 @@
+# Section and column projection
+
+import json
+
+import pytest
+
+from pam.analytics.profiles import Profiles
+
+def _payload():
+    return {
+        'portfolios': [{'portfolioId': 'P1', 'name': 'One', 'currency': 'USD'}],
+        'securities': [{'portfolioId': 'P1', 'securityId': 'S1', 'weight': 1.0, 'detail': {'ric': 'S1.N', 'isin': 'X'}}],
+        'classifications': [{'classificationCode': 'GICS', 'classificationData': [
+            {'portfolioId': 'P1', 'sector': 'Energy', 'weight': 1.0, 'extra': {'level': 1}}]}],
+        'auditSummaries': [{'portfolioId': 'P1', 'numberOfWarnings': 0}]
+    }
+
+def test_sections_drop_other_raw_sections():
+    result = Profiles(_payload(), sections=['securities'])
+
+    assert set(result.data) == {'securities'}
+    assert result.auditSummaries.empty
+    assert list(result.securities['securityId']) == ['S1']
+
+def test_unknown_section_is_rejected():
+    with pytest.raises(ValueError):
+        Profiles(_payload(), sections=['nope'])
+
+def test_columns_per_section():
+    result = Profiles(_payload(), columns={'securities': ['securityId', 'weight'], 'classifications': ['sector', 'extra.level']})
+
+    assert list(result.securities.columns) == ['securityId', 'weight']
+    assert list(result.classifications.columns) == ['sector', 'extra.level']
+    assert list(result.classifications.index) == ['GICS']
+    # Sections not named keep every field
+    assert list(result.portfolios.columns) == ['portfolioId', 'name', 'currency']
+
+def test_streamed_projection_matches():
+    body = json.dumps(_payload()).encode('utf-8')
+    streamed = Profiles.from_stream(body, sections='securities', columns=['securityId'])
+
+    assert list(streamed.securities.columns) == ['securityId']
+    assert streamed.classifications.empty and streamed.portfolios.empty
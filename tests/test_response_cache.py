@@ -0,0 +1,43 @@
+# Analytics response cache
+
+from pam.analytics import ResponseCache
+
+ENDPOINT = 'https://api.refinitiv.com/user-data/portfolio-management/v1/analytics/profiles'
+
+def _request(*ids):
+    return {'portfolios': [{'portfolioId': id, 'benchmark': {'portfolioId': 'BM'}} for id in ids]}
+
+def test_equivalent_requests_share_a_key():
+    assert ResponseCache.key(ENDPOINT, {'a': 1, 'b': [1, 2]}) == ResponseCache.key(ENDPOINT, {'b': [1, 2], 'a': 1})
+    assert ResponseCache.key(ENDPOINT, {'a': 1}) != ResponseCache.key(ENDPOINT + '/other', {'a': 1})
+
+def test_invalidate_drops_entries_referencing_the_portfolio():
+    cache = ResponseCache()
+    requests = {ids: _request(*ids) for ids in [('P1',), ('P1', 'P2'), ('P3',)]}
+    for request in requests.values():
+        cache.put(ResponseCache.key(ENDPOINT, request), {'rows': list(request)}, request)
+
+    assert cache.invalidate('P1') == 2
+    assert cache.get(ResponseCache.key(ENDPOINT, requests['P1',])) is None
+    assert cache.get(ResponseCache.key(ENDPOINT, requests['P1', 'P2'])) is None
+    assert cache.get(ResponseCache.key(ENDPOINT, requests['P3',])) == {'rows': ['portfolios']}
+
+    # P2's only entry went with P1's, and nothing is left referencing P1
+    assert cache.invalidate('P2') == 0
+    assert cache.invalidate('P1') == 0
+
+    # Nested IDs, e.g. of the benchmark, are indexed too
+    assert cache.invalidate('BM') == 1
+    assert cache.stats['entries'] == 0
+    assert cache.stats['bytes'] == 0
+
+def test_responses_larger_than_the_bound_are_not_cached():
+    cache = ResponseCache(max_bytes=100)
+    small, large = _request('P1'), _request('P2')
+    cache.put(ResponseCache.key(ENDPOINT, small), {'rows': 'x' * 40}, small)
+    cache.put(ResponseCache.key(ENDPOINT, large), {'rows': 'x' * 200}, large)
+
+    assert cache.get(ResponseCache.key(ENDPOINT, large)) is None
+    assert cache.get(ResponseCache.key(ENDPOINT, small)) == {'rows': 'x' * 40}
+    assert cache.stats['bytes'] <= 100
+    assert cache.invalidate('P2') == 0
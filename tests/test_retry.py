@@ -0,0 +1,89 @@
+# Re-requesting the portfolios reported as failed in 'bulkStatuses'
+
+from pam.analytics import holdings
+from pam.core.payloads import merge_recovered
+from pam.portfolios import portfolios
+
+class _Result:
+    def __init__(self, data):
+        self.data = data
+
+def _holdings_payload(id, status='Succeeded'):
+    return {'holdingsDetails': [{'securityId': f'{id}-S1', 'weight': 1.0}],
+            'bulkStatuses': [{'portfolioId': id, 'status': status}]}
+
+def test_retry_that_raises_keeps_original_records(monkeypatch):
+    calls = {}
+
+    def get_holdings_statements(id, request, sections=None):
+        calls[id] = calls.get(id, 0) + 1
+        if id == 'P2' and calls[id] > 1:
+            raise RuntimeError('An error occurred: HTTP Error. Code: 500')
+        return _Result(_holdings_payload(id, 'Failed' if id == 'P2' else 'Succeeded'))
+
+    monkeypatch.setattr(holdings, 'get_holdings_statements', get_holdings_statements)
+    result = holdings.get_holdings_statements_many(['P1', 'P2'], {}, retry=True, retries=2)
+
+    assert calls == {'P1': 1, 'P2': 3}
+    assert list(result.holdingsDetails['portfolioId']) == ['P1', 'P2']
+    assert result.bulkStatuses.set_index('portfolioId')['status'].to_dict() == {'P1': 'Succeeded', 'P2': 'Failed'}
+    assert set(result.errors) == {'P2'}
+
+def test_recovered_retry_clears_error(monkeypatch):
+    calls = {}
+
+    def get_holdings_statements(id, request, sections=None):
+        calls[id] = calls.get(id, 0) + 1
+        if calls[id] == 2:
+            raise RuntimeError('An error occurred: HTTP Error. Code: 500')
+        return _Result(_holdings_payload(id, 'Failed' if calls[id] == 1 else 'Succeeded'))
+
+    monkeypatch.setattr(holdings, 'get_holdings_statements', get_holdings_statements)
+    result = holdings.get_holdings_statements_many(['P1'], {}, retry=True, retries=3)
+
+    assert result.errors == {}
+    assert list(result.bulkStatuses['status']) == ['Succeeded']
+    assert len(result.holdingsDetails) == 1
+
+def test_merge_recovered_replaces_returned_ids_only():
+    payload = {'rows': [{'portfolioId': 'A'}, {'portfolioId': 'B'}],
+               'bulkStatuses': [{'portfolioId': 'A', 'status': 'Failed'}, {'portfolioId': 'B', 'status': 'Failed'}]}
+    recovered = {'rows': [{'portfolioId': 'A', 'new': True}], 'bulkStatuses': [{'portfolioId': 'A', 'status': 'Succeeded'}]}
+
+    merged = merge_recovered(payload, recovered, ['A', 'B'], 'portfolioId')
+
+    assert merged['rows'] == [{'portfolioId': 'B'}, {'portfolioId': 'A', 'new': True}]
+    assert merged['bulkStatuses'] == [{'portfolioId': 'B', 'status': 'Failed'}, {'portfolioId': 'A', 'status': 'Succeeded'}]
+
+def _portfolios_payload(ids, status):
+    return {'portfolios': [{'portfolioHeader': {'portfolioId': id, 'name': id},
+                            'holdingsStatementHeaders': [{'holdingsStatementDate': '2024-01-31'}]} for id in ids],
+            'bulkStatuses': [{'portfolioId': id, 'status': status(id)} for id in ids]}
+
+def test_partial_success_retry_does_not_duplicate_portfolios(monkeypatch):
+    def fetch(params):
+        ids = params['ids'].split(',')
+        if ids == ['A', 'B']:
+            return _portfolios_payload(ids, lambda id: 'PartialSuccess' if id == 'B' else 'Succeeded')
+        return _portfolios_payload(ids, lambda id: 'Succeeded')
+
+    monkeypatch.setattr(portfolios, '_fetch', fetch)
+    result = portfolios.get_portfolios(['A', 'B'], retry=True)
+
+    assert list(result.headers.index) == ['A', 'B']
+    assert list(result.statements['portfolioHeader.portfolioId']) == ['A', 'B']
+    assert list(result.bulkStatuses['status']) == ['Succeeded', 'Succeeded']
+
+def test_retry_with_a_single_section_name(monkeypatch):
+    requested = []
+
+    def get_holdings_statements(id, request, sections=None):
+        requested.append(sections)
+        return _Result(_holdings_payload(id))
+
+    monkeypatch.setattr(holdings, 'get_holdings_statements', get_holdings_statements)
+    result = holdings.get_holdings_statements_many(['P1', 'P2'], {}, retry=True, sections='holdingsDetails')
+
+    assert requested == [['holdingsDetails', 'bulkStatuses']] * 2
+    assert result.errors == {}
+    assert list(result.holdingsDetails['portfolioId']) == ['P1', 'P2']
@@ -0,0 +1,24 @@
+# Streaming rolling statistics
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pam.analytics import RollingStatistics
+
+def _history(T=40, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range('2024-01-01', periods=T)
+    returns = pd.DataFrame(rng.normal(0.0005, 0.01, (T, 2)), index=index, columns=['P1', 'P2'])
+    benchmark = pd.DataFrame(rng.normal(0.0004, 0.009, (T, 2)), index=index, columns=['P1', 'P2'])
+    return returns, benchmark
+
+@pytest.mark.parametrize('as_mapping', [dict, pd.Series, lambda b: b.to_numpy()])
+def test_update_with_per_portfolio_benchmark(as_mapping):
+    returns, benchmark = _history()
+    expected = RollingStatistics.from_history(returns, benchmark, window=20).statistics
+
+    stats = RollingStatistics.from_history(returns.iloc[:-1], benchmark.iloc[:-1], window=20)
+    stats.update(returns.iloc[-1].to_dict(), as_mapping(benchmark.iloc[-1]))
+
+    pd.testing.assert_frame_equal(stats.statistics, expected)
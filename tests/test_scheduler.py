@@ -0,0 +1,124 @@
+# Request scheduler - rate limiting, retries, backoff and Retry-After
+
+import pytest
+
+from pam.core import scheduler
+from pam.core.scheduler import RequestError, Scheduler, ThrottledError
+from pam.core.transport import HttpResponse, Transport
+
+URL = 'https://api.refinitiv.com/test/v1/endpoint'
+
+class _Clock:
+    # Stands in for the time module - sleeping only moves the clock on
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    time = perf_counter = monotonic
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+class _Transport(Transport):
+    # Answers with the given responses in turn, raising those that are exceptions
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def send(self, url, method='GET', path_parameters=None, query_parameters=None, body_parameters=None):
+        self.calls += 1
+        response = self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+def _response(status=200, retry_after=None):
+    headers = {'Retry-After': str(retry_after)} if retry_after is not None else {}
+    return HttpResponse(status, 'OK' if status == 200 else 'Error', headers, b'{}', URL)
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(scheduler, 'time', clock)
+    # Backoff delays at the top of their jitter range
+    monkeypatch.setattr(scheduler.random, 'uniform', lambda low, high: high)
+    return clock
+
+def test_no_client_side_limit_by_default(clock):
+    requests = Scheduler(transport=_Transport(_response()))
+    for _ in range(100):
+        requests.request(URL)
+
+    assert clock.sleeps == []
+
+def test_configured_rate_spaces_requests(clock):
+    requests = Scheduler(rate=2.0, burst=1, transport=_Transport(_response()))
+    for _ in range(3):
+        requests.request(URL)
+
+    assert clock.sleeps == pytest.approx([0.5, 0.5])
+
+def test_retries_back_off_exponentially(clock):
+    transport = _Transport(_response(503), _response(502), _response(504), _response())
+    requests = Scheduler(backoff_base=0.5, backoff_max=1.5, transport=transport)
+
+    assert requests.request(URL).is_success
+    assert transport.calls == 4
+    assert clock.sleeps == [0.5, 1.0, 1.5]
+
+def test_backoff_is_full_jitter(monkeypatch):
+    bounds = []
+    monkeypatch.setattr(scheduler.random, 'uniform', lambda low, high: bounds.append((low, high)) or 0.0)
+    requests = Scheduler(backoff_base=0.5, backoff_max=3.0, transport=_Transport(_response()))
+
+    assert [requests.backoff(attempt) for attempt in range(4)] == [0.0] * 4
+    assert bounds == [(0, 0.5), (0, 1.0), (0, 2.0), (0, 3.0)]
+
+def test_retry_after_holds_the_endpoint(clock):
+    transport = _Transport(_response(429, retry_after=3), _response())
+    requests = Scheduler(backoff_base=0.5, transport=transport)
+
+    assert requests.request(URL).is_success
+    assert clock.sleeps == [3.0]
+    assert requests.bucket(URL) is requests.bucket(URL)
+
+def test_retry_after_shorter_than_backoff_waits_for_backoff(clock):
+    requests = Scheduler(backoff_base=2.0, transport=_Transport(_response(429, retry_after=1), _response()))
+
+    requests.request(URL)
+    assert clock.sleeps == [2.0]
+
+def test_throttled_once_retries_run_out(clock):
+    transport = _Transport(_response(429, retry_after=7))
+    requests = Scheduler(max_retries=2, backoff_base=0.5, transport=transport)
+
+    with pytest.raises(ThrottledError) as error:
+        requests.request(URL)
+
+    assert transport.calls == 3
+    assert error.value.retries == 2
+    assert error.value.retry_after == 7.0
+    assert error.value.status_code == 429
+    assert error.value.url == URL
+
+def test_transient_errors_are_retried(clock):
+    transport = _Transport(ConnectionError('reset'), TimeoutError('slow'), _response())
+    requests = Scheduler(backoff_base=0.5, transport=transport)
+
+    assert requests.request(URL).is_success
+    assert clock.sleeps == [0.5, 1.0]
+
+def test_other_failures_are_not_retried(clock):
+    transport = _Transport(_response(400))
+    with pytest.raises(RequestError) as error:
+        Scheduler(transport=transport).request(URL)
+
+    assert not isinstance(error.value, ThrottledError)
+    assert error.value.status_code == 400
+    assert error.value.retries == 0
+    assert transport.calls == 1
+    assert clock.sleeps == []
@@ -0,0 +1,46 @@
+# Paging through portfolio search results
+
+import sys
+
+import pytest
+
+from pam.portfolios import search_iter
+
+# The module - pam.portfolios.search is the search() function
+search_module = sys.modules['pam.portfolios.search']
+
+HEADERS = [{'portfolioId': f'P{i}', 'name': f'Portfolio {i}'} for i in range(7)]
+
+@pytest.fixture
+def pages(monkeypatch):
+    requested = []
+
+    def fetch(params):
+        requested.append((params['offset'], params['maximumCount']))
+        return HEADERS[params['offset']:params['offset'] + params['maximumCount']]
+
+    monkeypatch.setattr(search_module, '_fetch', fetch)
+    return requested
+
+@pytest.mark.parametrize('prefetch', [True, False])
+def test_pages_until_a_short_page(pages, prefetch):
+    result = list(search_iter(page_size=3, prefetch=prefetch))
+
+    assert [list(page['portfolioId']) for page in result] == [['P0', 'P1', 'P2'], ['P3', 'P4', 'P5'], ['P6']]
+    assert pages == [(0, 3), (3, 3), (6, 3)]
+
+def test_max_count_bounds_the_last_page(pages):
+    result = list(search_iter(page_size=3, maxCount=5))
+
+    assert sum(len(page) for page in result) == 5
+    assert pages == [(0, 3), (3, 2)]
+
+def test_exact_multiple_ends_on_an_empty_page(pages):
+    result = list(search_iter(page_size=7))
+    assert [len(page) for page in result] == [7]
+    assert pages == [(0, 7), (7, 7)]
+
+def test_offset_ignored_by_the_server(monkeypatch):
+    monkeypatch.setattr(search_module, '_fetch', lambda params: HEADERS[:params['maximumCount']])
+    with pytest.raises(RuntimeError):
+        list(search_iter(page_size=3))
@@ -0,0 +1,46 @@
+# Arrow / Parquet persistence of result containers
+
+import pandas as pd
+import pytest
+
+from pam.analytics.holdings import Holdings
+
+pytest.importorskip('pyarrow')
+
+def _payload():
+    return {
+        'holdingsDetails': [{'portfolioId': 'P1', 'securityId': 'S1', 'weight': 0.6, 'tags': {'a': 1}},
+                            {'portfolioId': 'P1', 'securityId': 'S2', 'weight': 0.4, 'tags': [2]}],
+        'bulkStatuses': [{'portfolioId': 'P1', 'status': 'Succeeded'}],
+        'currency': 'USD'
+    }
+
+@pytest.mark.parametrize('format', ['arrow', 'parquet'])
+def test_saved_result_reloads_the_same(tmp_path, format):
+    original = Holdings(_payload(), errors={'P2': 'An error occurred'})
+    original.save(str(tmp_path), format=format)
+
+    loaded = Holdings.load(str(tmp_path))
+
+    pd.testing.assert_frame_equal(loaded.holdingsDetails, original.holdingsDetails)
+    pd.testing.assert_frame_equal(loaded.bulkStatuses, original.bulkStatuses)
+    assert loaded.holdingsDetails['tags'].tolist() == [{'a': 1}, [2]]
+    assert loaded.errors == {'P2': 'An error occurred'}
+    assert loaded.data['currency'] == 'USD'
+
+def test_frames_are_read_on_first_access(tmp_path):
+    Holdings(_payload()).save(str(tmp_path))
+    (tmp_path / 'bulkStatuses.arrow').unlink()
+
+    # Reading one section leaves the others untouched
+    loaded = Holdings.load(str(tmp_path))
+    assert len(loaded.holdingsDetails) == 2
+    with pytest.raises(OSError):
+        loaded.bulkStatuses
+
+def test_load_rejects_another_container(tmp_path):
+    from pam.portfolios.portfolios import Portfolios
+
+    Holdings(_payload()).save(str(tmp_path))
+    with pytest.raises(ValueError):
+        Portfolios.load(str(tmp_path))
@@ -0,0 +1,54 @@
+# Holdings store - incremental refreshes
+
+import os
+
+import pytest
+
+from pam.analytics import store
+from pam.analytics.holdings import Holdings
+from pam.analytics.store import HoldingsStore
+
+pytest.importorskip('pyarrow')
+
+# Statements the API has - none for 2024-02-29
+STATEMENTS = {'2024-01-31', '2024-03-31', '2024-04-30'}
+
+@pytest.fixture
+def requests(monkeypatch):
+    requested = []
+
+    def get_holdings_statements(id, request, sections=None):
+        dates = request['holdingsStatementDates']
+        requested.append(dates)
+        found = [date for date in dates if date in STATEMENTS]
+        return Holdings({
+            'holdingsSummaries': [{'portfolioId': id, 'holdingsStatementDate': date, 'count': 1} for date in found],
+            'holdingsDetails': [{'portfolioId': id, 'holdingsStatementDate': date, 'securityId': 'S1'} for date in found]
+        }, sections=sections)
+
+    monkeypatch.setattr(store, 'get_holdings_statements', get_holdings_statements)
+    return requested
+
+def test_updates_fetch_only_the_gap(tmp_path, requests):
+    holdings = HoldingsStore(str(tmp_path))
+
+    holdings.update('P1', {}, ['2024-01-31', '2024-02-29', '2024-03-31'])
+    # 2024-02-29 has no statement - it is not requested again
+    holdings.update('P1', {}, ['2024-01-31', '2024-02-29', '2024-03-31', '2024-04-30'])
+    result = holdings.update('P1', {}, ['2024-01-31', '2024-02-29', '2024-03-31', '2024-04-30'])
+
+    assert requests == [['2024-01-31', '2024-02-29', '2024-03-31'], ['2024-04-30']]
+    assert sorted(result.holdingsSummaries['holdingsStatementDate']) == ['2024-01-31', '2024-03-31', '2024-04-30']
+    assert holdings.dates('P1') == ['2024-01-31', '2024-03-31', '2024-04-30']
+    assert holdings.missing('P1', ['2024-02-29', '2024-05-31']) == ['2024-05-31']
+
+def test_portfolio_ids_stay_within_the_root(tmp_path, requests):
+    root = tmp_path / 'store'
+    holdings = HoldingsStore(str(root))
+
+    for id in ['../escaped', '..', 'a/b', 'P1.new']:
+        holdings.update(id, {}, ['2024-01-31'])
+        assert holdings.dates(id) == ['2024-01-31']
+
+    assert sorted(os.listdir(tmp_path)) == ['store']
+    assert len(os.listdir(root)) == 4
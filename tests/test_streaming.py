@@ -0,0 +1,74 @@
+# Incremental parsing of responses
+
+import json
+
+import pandas as pd
+
+from pam.analytics import ResponseCache, get_holdings_statements, get_profiles
+from pam.analytics import profiles
+from pam.analytics.holdings import Holdings
+from pam.core import HttpTransport, scheduler
+from pam.core.frames import from_records
+from pam.core.streaming import parse_sections
+
+PAYLOAD = {
+    'holdingsDetails': [{'portfolioId': 'P1', 'securityId': f'S{i}', 'weight': i / 10, 'tags': {'a': [i]}} for i in range(7)],
+    'holdingsSummaries': [{'portfolioId': 'P1', 'count': 7}],
+    'auditSummaries': [{'portfolioId': 'P1', 'note': 'skipped'}],
+    'currency': 'USD',
+    'meta': {'nested': [1, {'b': None}]}
+}
+
+def _chunks(body, size=16):
+    return (body[i:i + size] for i in range(0, len(body), size))
+
+def test_parse_sections_in_batches_from_chunks():
+    body = json.dumps(PAYLOAD).encode('utf-8')
+    batches = []
+    def process(records, columns=None):
+        batches.append(len(records))
+        return from_records(records)
+
+    frames, rest = parse_sections(_chunks(body), {'holdingsDetails': process, 'holdingsSummaries': from_records},
+                                  batch_size=3, skip={'auditSummaries'})
+
+    assert batches == [3, 3, 1]
+    pd.testing.assert_frame_equal(frames['holdingsDetails'], from_records(PAYLOAD['holdingsDetails']))
+    pd.testing.assert_frame_equal(frames['holdingsSummaries'], from_records(PAYLOAD['holdingsSummaries']))
+    assert rest == {'currency': 'USD', 'meta': PAYLOAD['meta']}
+
+def test_from_stream_equals_decoded_container():
+    body = json.dumps(PAYLOAD).encode('utf-8')
+    streamed, decoded = Holdings.from_stream(_chunks(body), batch_size=2), Holdings(json.loads(body))
+
+    for section in Holdings._sections:
+        pd.testing.assert_frame_equal(streamed._get(section), decoded._get(section))
+
+def test_streamed_response_is_parsed_off_the_connection(standin):
+    response = scheduler.request(profiles.ENDPOINT, method='POST', body_parameters={'portfolios': [{'portfolioId': 'P1'}]}, stream=True)
+    with response:
+        assert response.stream is not None
+        assert response.raw._content is None
+
+    request = {'portfolios': [{'portfolioId': 'PORT00001'}, {'portfolioId': 'PORT00002'}]}
+    cache = ResponseCache()
+    streamed, direct = get_profiles(request, cache=cache, stream=True), get_profiles(request)
+    for section in ('portfolios', 'classifications', 'securities'):
+        pd.testing.assert_frame_equal(getattr(streamed, section), getattr(direct, section))
+
+    # The raw body was kept for the cache as it was read
+    pd.testing.assert_frame_equal(get_profiles(request, cache=cache).securities, direct.securities)
+    assert cache.stats['hits'] == 1
+
+    holdings = get_holdings_statements('PORT00001', {}, stream=True)
+    pd.testing.assert_frame_equal(holdings.holdingsDetails, get_holdings_statements('PORT00001', {}).holdingsDetails)
+
+def test_transport_without_streaming_uses_decoded_response(monkeypatch):
+    class Decoded(HttpTransport):
+        def send(self, url, method='GET', path_parameters=None, query_parameters=None, body_parameters=None, stream=False):
+            from pam.core.transport import HttpResponse
+            return HttpResponse(200, 'OK', None, json.dumps(PAYLOAD).encode('utf-8'), url)
+
+    monkeypatch.setattr(scheduler.get_scheduler(), 'transport', Decoded('http://unused'))
+    result = get_holdings_statements('P1', {}, stream=True)
+    assert len(result.holdingsDetails) == 7
@@ -0,0 +1,12 @@
+# Transport
+
+import pytest
+
+from pam.core.transport import Transport
+
+def test_transport_without_send_cannot_be_created():
+    class Incomplete(Transport):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()